@@ -3,11 +3,32 @@ import { z } from "zod";
 
 const BASE_URL = process.env.GRAPH_API_BASE || "http://127.0.0.1:8000";
 
+// Largest page the paginated list endpoints serve
+const PAGE_SIZE = 500;
+
 // Helper function to make API calls with error handling
 async function apiCall<T>(request: () => Promise<AxiosResponse<T>>): Promise<T> {
+  return (await apiResponse(request)).data;
+}
+
+// Fetch every page of a paginated list endpoint, following the X-Next-Cursor header
+async function apiCallAllPages<T>(url: string, params: Record<string, unknown> = {}): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await apiResponse(() =>
+      axios.get<T[]>(url, { params: { ...params, limit: PAGE_SIZE, cursor } })
+    );
+    items.push(...response.data);
+    const next = response.headers["x-next-cursor"];
+    cursor = typeof next === "string" && next ? next : undefined;
+  } while (cursor);
+  return items;
+}
+
+async function apiResponse<T>(request: () => Promise<AxiosResponse<T>>): Promise<AxiosResponse<T>> {
   try {
-    const response = await request();
-    return response.data;
+    return await request();
   } catch (error: any) {
     if (error.response) {
       throw new Error(`API Error ${error.response.status}: ${error.response.data?.detail || error.message}`);
@@ -65,7 +86,7 @@ export const getNodeLiterature = {
   }),
   run: async (args: unknown) => {
     const { node_id } = getNodeLiterature.schema.parse(args);
-    return apiCall(() => axios.get(`${BASE_URL}/nodes/${node_id}/literature`));
+    return apiCallAllPages(`${BASE_URL}/nodes/${node_id}/literature`);
   }
 };
 
@@ -89,7 +110,7 @@ export const getAllLiterature = {
   name: "get_all_literature",
   description: "Get all literature references across all nodes, this will not generate new literature, it will only return the literature that has already been added to the graph, use get_suggested_literature to generate new literature. You ONLY need to call this endpoint once. Use when user asks about: all papers, complete literature list, entire bibliography, all references, literature database, paper collection, or wants to see everything we have. Also use for: literature audit, complete reference list, bibliography overview, or when user says 'show me all papers', 'what literature do we have', 'complete bibliography'.",
   schema: z.object({}),
-  run: async () => apiCall(() => axios.get(`${BASE_URL}/literature`))
+  run: async () => apiCallAllPages(`${BASE_URL}/literature`)
 };
 
 export const getContextKeywords = {
@@ -153,6 +174,22 @@ export const deleteNode = {
   }
 };
 
+export const suggestEdges = {
+  name: "suggest_edges",
+  description: "Rank existing experiments that a node most resembles as candidate parents and children, each with a suggested relationship type. Call this right after create_node and BEFORE create_edge to pick which experiments to connect instead of guessing. Use when user asks about: where an experiment fits, what it builds on, related experiments, or wants to connect a new idea to the graph.",
+  schema: z.object({
+    node_id: z.number().describe("ID of the node to find candidate neighbours for"),
+    k: z.number().optional().default(5).describe("Number of candidates per direction"),
+    direction: z.enum(["parents", "children", "both"]).optional().default("both").describe("Which side of the node to suggest")
+  }),
+  run: async (args: unknown) => {
+    const { node_id, k, direction } = suggestEdges.schema.parse(args);
+    return apiCall(() => axios.get(`${BASE_URL}/nodes/${node_id}/suggested-edges`, {
+      params: { k, direction }
+    }));
+  }
+};
+
 // Relationship Management
 export const createEdge = {
   name: "create_edge",
@@ -289,6 +326,7 @@ export const tools = [
   deleteNode,
   
   // Relationship Management
+  suggestEdges,
   createEdge,
   updateEdge,
   deleteEdgeById,
@@ -0,0 +1,143 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ...models.experiment import ExperimentStatus, RelationshipType
+from services import reachability
+
+router = APIRouter()
+
+
+def _parse_types(types: Optional[str]) -> Optional[List[RelationshipType]]:
+    if not types:
+        return None
+    wanted = [t.strip().lower() for t in types.split(",") if t.strip()]
+    allowed = [t.value for t in RelationshipType]
+    unknown = [t for t in wanted if t not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "Invalid relationship type",
+                "message": f"Unknown relationship type(s): {', '.join(unknown)}",
+                "action_required": f"Use one or more of: {', '.join(allowed)}"
+            }
+        )
+    return [RelationshipType(t) for t in wanted]
+
+
+def _parse_statuses(statuses: str) -> List[ExperimentStatus]:
+    wanted = [s.strip().lower() for s in statuses.split(",") if s.strip()]
+    allowed = [s.value for s in ExperimentStatus]
+    unknown = [s for s in wanted if s not in allowed]
+    if unknown or not wanted:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "Invalid status",
+                "message": f"Unknown status(es): {', '.join(unknown) or '(none)'}",
+                "action_required": f"Use one or more of: {', '.join(allowed)}"
+            }
+        )
+    return [ExperimentStatus(s) for s in wanted]
+
+
+def _loaded_node(db: Session, node_id: int):
+    reachability.index.ensure_loaded(db)
+    if not reachability.index.has_node(node_id):
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "Node not found",
+                "message": f"No node exists with ID {node_id}",
+                "action_required": "Please verify the node ID"
+            }
+        )
+
+
+TYPES_DESCRIPTION = "Comma-separated relationship types to follow (default: all)"
+
+
+@router.get("/analytics/nodes/{node_id}/descendants")
+def get_descendants(
+    node_id: int,
+    types: Optional[str] = Query(None, description=TYPES_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
+    """Every node that depends on this one, directly or transitively."""
+    rel_types = _parse_types(types)
+    _loaded_node(db, node_id)
+    ids = reachability.index.descendants(node_id, rel_types)
+    return {"node_id": node_id, "count": len(ids), "ids": ids}
+
+
+@router.get("/analytics/nodes/{node_id}/ancestors")
+def get_ancestors(
+    node_id: int,
+    types: Optional[str] = Query(None, description=TYPES_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
+    """Every node this one depends on, directly or transitively."""
+    rel_types = _parse_types(types)
+    _loaded_node(db, node_id)
+    ids = reachability.index.ancestors(node_id, rel_types)
+    return {"node_id": node_id, "count": len(ids), "ids": ids}
+
+
+@router.get("/analytics/nodes/{node_id}/impact")
+def get_impact(
+    node_id: int,
+    types: Optional[str] = Query(None, description=TYPES_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
+    """
+    Downstream nodes reached through the given relationship types, grouped by
+    status, e.g. what a refuted result invalidates.
+    """
+    rel_types = _parse_types(types)
+    _loaded_node(db, node_id)
+    by_status = reachability.index.impact(node_id, rel_types)
+    return {
+        "node_id": node_id,
+        "types": [t.value for t in rel_types] if rel_types else None,
+        "count": sum(len(ids) for ids in by_status.values()),
+        "by_status": by_status,
+    }
+
+
+@router.get("/analytics/counts")
+def get_reachability_counts(
+    limit: int = Query(20, ge=1, le=1000, description="Number of nodes to return"),
+    sort: str = Query("descendants", description="descendants|ancestors"),
+    types: Optional[str] = Query(None, description=TYPES_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
+    """Nodes with the most descendants (or ancestors), with both counts."""
+    if sort not in ("descendants", "ancestors"):
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "Invalid sort",
+                "message": f"Unknown sort '{sort}'",
+                "action_required": "Use one of: descendants, ancestors"
+            }
+        )
+    rel_types = _parse_types(types)
+    reachability.index.ensure_loaded(db)
+    counts = reachability.index.counts(rel_types)
+    key = 0 if sort == "descendants" else 1
+    top = sorted(counts.items(), key=lambda kv: (-kv[1][key], kv[0]))[:limit]
+    return [{"id": node_id, "descendants": d, "ancestors": a} for node_id, (d, a) in top]
+
+
+@router.get("/analytics/critical-path")
+def get_critical_path(
+    status: str = Query("planned", description="Comma-separated statuses every node on the path must have"),
+    db: Session = Depends(get_db),
+):
+    """Longest chain of connected nodes that all have the given status(es)."""
+    statuses = _parse_statuses(status)
+    reachability.index.ensure_loaded(db)
+    length, path = reachability.index.critical_path(statuses)
+    return {"status": [s.value for s in statuses], "length": length, "path": path}
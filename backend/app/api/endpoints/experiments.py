@@ -1,69 +1,216 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request, Query, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
+import json
 import logging
 from datetime import datetime
 
-from ...database import get_db
+from ...database import get_async_db, SessionLocal
+from ..pagination import parse_fields
+from ..responses import FastJSONResponse
 from ...models.experiment import ExperimentStatus
 from ...models import experiment as models
 from ...schemas import experiment as schemas
+from services import similarity
+from services import cooccurrence
+from services import graph_log
+from services import adjacency
+from services import subgraph
+from services import topo_order
+from services import layout
+from services import reachability
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-async def log_request(request: Request, action: str, data: dict = None):
-    """Log incoming request details"""
-    logger.info(f"[{datetime.now()}] {action} - Request from {request.client.host}")
-    if data:
-        logger.info(f"Request data: {data}")
+GRAPH_VERSION_HEADER = "X-Graph-Version"
 
-async def log_response(action: str, response: dict):
-    """Log outgoing response"""
-    logger.info(f"[{datetime.now()}] {action} - Response: {response}")
+# Columns the graph overview/export can project. Long text columns are cut to a
+# preview by the database (substr), so full texts are never loaded to be sliced.
+NODE_COLUMNS = {
+    "id": models.Experiment.id,
+    "title": models.Experiment.title,
+    "status": models.Experiment.status,
+    "description": models.Experiment.description,
+    "motivation": models.Experiment.motivation,
+    "expectations": models.Experiment.expectations,
+    "hypothesis": models.Experiment.hypothesis,
+    "result": models.Experiment.result,
+    "extra_data": models.Experiment.extra_data,
+    "created_at": models.Experiment.created_at,
+    "updated_at": models.Experiment.updated_at,
+}
+NODE_TEXT_FIELDS = ("description", "motivation", "expectations", "hypothesis", "result")
+NODE_SUMMARY_FIELDS = ["id", "title", "status", "description", "created_at", "updated_at"]
+EDGE_COLUMNS = {
+    "id": models.ExperimentRelationship.id,
+    "from_experiment_id": models.ExperimentRelationship.from_experiment_id,
+    "to_experiment_id": models.ExperimentRelationship.to_experiment_id,
+    "relationship_type": models.ExperimentRelationship.relationship_type,
+    "label": models.ExperimentRelationship.label,
+    "extra_data": models.ExperimentRelationship.extra_data,
+    "created_at": models.ExperimentRelationship.created_at,
+}
+EDGE_SUMMARY_FIELDS = ["id", "from_experiment_id", "to_experiment_id", "relationship_type", "label"]
+DESCRIPTION_PREVIEW = 100
+EXPORT_BATCH = 1000
+
+async def log_request(request: Request, action: str, data=None, body=None):
+    """
+    Log the action and client at INFO, with `data` (ids and counts) as payload.
+    A request `body` is only logged at DEBUG.
+    """
+    extra = {"action": action, "client": request.client.host if request.client else None}
+    if data is not None:
+        extra["payload"] = data
+    logger.info("%s request", action, extra=extra)
+    if body is not None:
+        logger.debug("%s body", action, extra={"action": action, "payload": body})
+
+async def log_response(action: str, response):
+    """Log the response at DEBUG; it is only serialized when DEBUG is enabled."""
+    logger.debug("%s response", action, extra={"action": action, "payload": response})
+
+def _node_summary(exp: models.Experiment) -> dict:
+    return {
+        "id": exp.id,
+        "title": exp.title,
+        "status": exp.status,
+        "type": "experiment",
+        "description": exp.description[:100] if exp.description else None,
+        "created_at": exp.created_at.isoformat() if exp.created_at else None,
+        "updated_at": exp.updated_at.isoformat() if exp.updated_at else None
+    }
+
+def _node_columns(keys: List[str], preview: int = DESCRIPTION_PREVIEW) -> list:
+    """Labelled SELECT columns for node fields; text fields cut to `preview` chars (0 = full)."""
+    columns = []
+    for key in keys:
+        column = NODE_COLUMNS[key]
+        if preview and key in NODE_TEXT_FIELDS:
+            column = func.substr(column, 1, preview)
+        columns.append(column.label(key))
+    return columns
+
+def _edge_columns(keys: List[str]) -> list:
+    return [EDGE_COLUMNS[key].label(key) for key in keys]
+
+def _export_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _export_lines(node_keys: List[str], edge_keys: Optional[List[str]], preview: int):
+    """
+    NDJSON lines for every node, then every edge, read in batches of
+    EXPORT_BATCH rows from a streaming cursor. Uses its own session because
+    the response outlives the request's dependencies.
+    """
+    db = SessionLocal()
+    try:
+        queries = [("experiment", select(*_node_columns(node_keys, preview)).order_by(models.Experiment.id))]
+        if edge_keys is not None:
+            queries.append(("edge", select(*_edge_columns(edge_keys)).order_by(models.ExperimentRelationship.id)))
+        for kind, stmt in queries:
+            result = db.execute(stmt, execution_options={"yield_per": EXPORT_BATCH})
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps({"type": kind, **row._asdict()}, default=_export_default) + "\n"
+                    for row in rows
+                )
+    finally:
+        db.close()
+
+def _node_detail(exp: models.Experiment) -> dict:
+    return {
+        "id": exp.id,
+        "title": exp.title,
+        "description": exp.description,
+        "motivation": exp.motivation,
+        "expectations": exp.expectations,
+        "status": exp.status,
+        "hypothesis": exp.hypothesis,
+        "result": exp.result,
+        "extra_data": exp.extra_data,
+        "created_at": exp.created_at.isoformat() if exp.created_at else None,
+        "updated_at": exp.updated_at.isoformat() if exp.updated_at else None
+    }
+
+def _edge_summary(rel: models.ExperimentRelationship) -> dict:
+    return {
+        "id": rel.id,
+        "from_experiment_id": rel.from_experiment_id,
+        "to_experiment_id": rel.to_experiment_id,
+        "relationship_type": rel.relationship_type,
+        "label": rel.label
+    }
+
+def _cycle_error(e: topo_order.CycleError) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail={
+            "error": "Cycle detected",
+            "message": str(e),
+            "cycle": e.cycle,
+            "action_required": "The experiment graph must stay acyclic; remove an edge on the cycle first"
+        }
+    )
+
+def _node_summary_at(node_id: int, state: dict) -> dict:
+    """_node_summary for a node's state from the graph history."""
+    description = state.get("description")
+    return {
+        "id": node_id,
+        "title": state.get("title"),
+        "status": state.get("status"),
+        "type": "experiment",
+        "description": description[:DESCRIPTION_PREVIEW] if description else None,
+        "created_at": state.get("created_at"),
+        "updated_at": state.get("updated_at")
+    }
+
+def _edge_summary_at(edge_id: int, state: dict) -> dict:
+    return {"id": edge_id, **{key: state.get(key) for key in EDGE_SUMMARY_FIELDS if key != "id"}}
 
 @router.get("/graph/overview", response_model=schemas.GraphOverview)
-async def get_graph_overview(request: Request, db: Session = Depends(get_db)):
+async def get_graph_overview(
+    request: Request,
+    as_of: Optional[datetime] = Query(None, description="Return the graph as it was at this time (ISO 8601, UTC if no offset)"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Get a concise representation of the entire experiment graph.
     Returns all nodes (experiments) and their connections.
+    The ETag is the graph version; a matching If-None-Match returns 304.
+    With `as_of`, the graph is rebuilt from the nearest history snapshot.
     """
-    await log_request(request, "GET_GRAPH_OVERVIEW")
+    await log_request(request, "GET_GRAPH_OVERVIEW", {"as_of": as_of} if as_of else None)
+    if as_of is not None:
+        return await _graph_overview_at(request, as_of, db)
     try:
-        experiments = db.query(models.Experiment).all()
-        relationships = db.query(models.ExperimentRelationship).all()
-
-        nodes = [
-            {
-                "id": exp.id,
-                "title": exp.title,
-                "status": exp.status,
-                "type": "experiment",
-                "description": exp.description[:100] if exp.description else None,
-                "created_at": exp.created_at.isoformat() if exp.created_at else None,
-                "updated_at": exp.updated_at.isoformat() if exp.updated_at else None
-            }
-            for exp in experiments
-        ]
-
-        edges = [
-            {
-                "id": rel.id,
-                "from_experiment_id": rel.from_experiment_id,
-                "to_experiment_id": rel.to_experiment_id,
-                "relationship_type": rel.relationship_type,
-                "label": rel.label
-            }
-            for rel in relationships
-        ]
+        # Read the version before the data: if a write lands in between, the
+        # tag is older than the body and the next poll simply refetches.
+        version = await db.run_sync(graph_log.current_version)
+        tag = graph_log.etag(version)
+        version_headers = {"ETag": tag, GRAPH_VERSION_HEADER: str(version)}
+        if request.headers.get("if-none-match") == tag:
+            return Response(status_code=304, headers=version_headers)
 
-        response = {"nodes": nodes, "edges": edges}
-        await log_response("GET_GRAPH_OVERVIEW", response)
-        return response
+        # Only the summary columns; the description preview is cut by the database
+        experiments = (await db.execute(select(*_node_columns(NODE_SUMMARY_FIELDS)))).all()
+        relationships = (await db.execute(select(*_edge_columns(EDGE_SUMMARY_FIELDS)))).all()
+
+        nodes = [_node_summary(exp) for exp in experiments]
+        edges = [_edge_summary(rel) for rel in relationships]
+
+        overview = {"nodes": nodes, "edges": edges}
+        await log_response("GET_GRAPH_OVERVIEW", overview)
+        return FastJSONResponse(overview, headers=version_headers)
     except Exception as e:
         logger.error(f"Error in get_graph_overview: {str(e)}")
         raise HTTPException(
@@ -75,20 +222,274 @@ async def get_graph_overview(request: Request, db: Session = Depends(get_db)):
             }
         )
 
+async def _graph_overview_at(request: Request, as_of: datetime, db: AsyncSession):
+    try:
+        version, state = await db.run_sync(graph_log.state_at, as_of)
+    except graph_log.HistoryUnavailable as e:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "History not available",
+                "message": str(e),
+                "earliest": e.earliest.isoformat() if e.earliest else None,
+                "action_required": "Use an as_of time after the start of the recorded history"
+            }
+        )
+    except Exception as e:
+        logger.error(f"Error in get_graph_overview (as_of): {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Failed to retrieve graph history",
+                "message": str(e),
+                "action_required": "Please try again or check input parameters"
+            }
+        )
+    # The graph at a given version never changes, so the usual tag applies
+    tag = graph_log.etag(version)
+    version_headers = {"ETag": tag, GRAPH_VERSION_HEADER: str(version)}
+    if request.headers.get("if-none-match") == tag:
+        return Response(status_code=304, headers=version_headers)
+    return FastJSONResponse({
+        "nodes": [_node_summary_at(i, s) for i, s in sorted(state[graph_log.NODE].items())],
+        "edges": [_edge_summary_at(i, s) for i, s in sorted(state[graph_log.EDGE].items())],
+    }, headers=version_headers)
+
+@router.get("/graph/export")
+async def export_graph(
+    request: Request,
+    fields: Optional[str] = Query(None, description=f"Comma-separated node fields: {', '.join(NODE_COLUMNS)}"),
+    edge_fields: Optional[str] = Query(None, description=f"Comma-separated edge fields: {', '.join(EDGE_COLUMNS)}"),
+    edges: bool = Query(True, description="Include edges after the nodes"),
+    preview: int = Query(DESCRIPTION_PREVIEW, ge=0, description="Cut long text fields to this many characters; 0 = full text"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream the whole graph as NDJSON: one {"type": "experiment", ...} line per
+    node, then one {"type": "edge", ...} line per edge. Only the requested
+    columns are read and rows are streamed as they are fetched, so memory stays
+    flat however large the graph is. X-Graph-Version is the version when the
+    export started.
+    """
+    await log_request(request, "EXPORT_GRAPH", {"fields": fields, "edge_fields": edge_fields, "edges": edges})
+    node_keys = parse_fields(fields, NODE_COLUMNS, NODE_SUMMARY_FIELDS)
+    edge_keys = parse_fields(edge_fields, EDGE_COLUMNS, EDGE_SUMMARY_FIELDS) if edges else None
+    return StreamingResponse(
+        _export_lines(node_keys, edge_keys, preview),
+        media_type="application/x-ndjson",
+        headers={GRAPH_VERSION_HEADER: str(await db.run_sync(graph_log.current_version))},
+    )
+
+@router.get("/graph/layout", response_model=schemas.GraphLayout)
+async def get_graph_layout(
+    request: Request,
+    direction: str = Query("TB", description="TB (top to bottom) | LR (left to right)"),
+    node_width: int = Query(layout.NODE_WIDTH, ge=1, le=2000),
+    node_height: int = Query(layout.NODE_HEIGHT, ge=1, le=2000),
+    rank_sep: int = Query(layout.RANK_SEP, ge=0, le=2000, description="Gap between layers"),
+    node_sep: int = Query(layout.NODE_SEP, ge=0, le=2000, description="Gap between nodes of a layer"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a layered layout of the whole graph: node positions (top-left corners)
+    and edge routes. Computed on the server and cached per graph version; edits
+    that leave the structure unchanged reuse the cached layout. The ETag is the
+    graph version plus the layout options; a matching If-None-Match returns 304.
+    """
+    await log_request(request, "GET_GRAPH_LAYOUT", {"direction": direction})
+    if direction not in layout.DIRECTIONS:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "Invalid direction",
+                "message": f"Unknown direction '{direction}'",
+                "action_required": f"Use one of: {', '.join(layout.DIRECTIONS)}"
+            }
+        )
+    options = {
+        "direction": direction,
+        "node_width": node_width,
+        "node_height": node_height,
+        "rank_sep": rank_sep,
+        "node_sep": node_sep,
+    }
+    try:
+        version = await db.run_sync(graph_log.current_version)
+        tag = graph_log.etag(version, layout.options_digest(options))
+        version_headers = {"ETag": tag, GRAPH_VERSION_HEADER: str(version)}
+        if request.headers.get("if-none-match") == tag:
+            return Response(status_code=304, headers=version_headers)
+
+        result = layout.cache.get(version, options)
+        if result is None:
+            await db.run_sync(topo_order.index.ensure_loaded)
+            # CPU-bound on a cache miss; keep it off the event loop
+            computed = await run_in_threadpool(layout.cache.layout, options, topo_order.index.snapshot)
+            result = {**computed, "version": version}
+            # A write that committed meanwhile may be in the snapshot; don't file its layout under the older version
+            if await db.run_sync(graph_log.current_version) == version:
+                layout.cache.put(version, options, result)
+        return FastJSONResponse(result, headers=version_headers)
+    except Exception as e:
+        logger.error(f"Error in get_graph_layout: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Failed to compute graph layout",
+                "message": str(e),
+                "action_required": "Please try again"
+            }
+        )
+
+@router.get("/graph/changes", response_model=schemas.GraphChanges)
+async def get_graph_changes(
+    request: Request,
+    since: int = Query(..., ge=0, description="Graph version the client already has (X-Graph-Version / ETag of the overview)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Nodes and edges created, updated or deleted after version `since`.
+    Upserted entities are returned in the same shape as /graph/overview;
+    deleted ones as ids only.
+    """
+    await log_request(request, "GET_GRAPH_CHANGES", {"since": since})
+    try:
+        version, changes = await db.run_sync(graph_log.changes_since, since)
+        node_ids = changes[graph_log.NODE]["upserted"]
+        edge_ids = changes[graph_log.EDGE]["upserted"]
+        nodes = (await db.scalars(
+            select(models.Experiment).where(models.Experiment.id.in_(node_ids))
+        )).all() if node_ids else []
+        edges = (await db.scalars(
+            select(models.ExperimentRelationship).where(models.ExperimentRelationship.id.in_(edge_ids))
+        )).all() if edge_ids else []
+        return FastJSONResponse({
+            "since": since,
+            "version": version,
+            "nodes": [_node_summary(exp) for exp in nodes],
+            "edges": [_edge_summary(rel) for rel in edges],
+            "deleted_nodes": changes[graph_log.NODE]["deleted"],
+            "deleted_edges": changes[graph_log.EDGE]["deleted"],
+        })
+    except Exception as e:
+        logger.error(f"Error in get_graph_changes: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Failed to retrieve graph changes",
+                "message": str(e),
+                "action_required": "Reload /graph/overview and poll again with its version"
+            }
+        )
+
+@router.get("/graph/order", response_model=schemas.GraphOrder)
+async def get_graph_order(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get the nodes in topological order (parents before children) with their
+    level: the length of the longest path reaching them from a root.
+    """
+    await log_request(request, "GET_GRAPH_ORDER")
+    await db.run_sync(topo_order.index.ensure_loaded)
+    levels = topo_order.index.levels()
+    return FastJSONResponse({
+        "version": await db.run_sync(graph_log.current_version),
+        "nodes": [{"id": node_id, "level": levels[node_id]} for node_id in topo_order.index.order()],
+        "cyclic_edges": topo_order.index.cyclic_edges(),
+    })
+
+MAX_BATCH_NODES = 500
+
+@router.get("/nodes", response_model=schemas.NodeInfoBatch)
+async def get_nodes_info(
+    request: Request,
+    ids: str = Query(..., description=f"Comma-separated node IDs (at most {MAX_BATCH_NODES})"),
+    with_parents: bool = True,
+    with_children: bool = True,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the same information as GET /nodes/{node_id} for many nodes at once,
+    keyed by id. Uses three queries whatever the number of nodes: the nodes,
+    their parent edges joined to the parents, and their child edges joined to
+    the children. Unknown ids are listed in `missing`.
+    """
+    try:
+        node_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        node_ids = None
+    if not node_ids or len(node_ids) > MAX_BATCH_NODES:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "Invalid ids",
+                "message": f"ids must be 1 to {MAX_BATCH_NODES} comma-separated integers",
+                "action_required": "Please provide node IDs like ids=1,2,3"
+            }
+        )
+    await log_request(request, "GET_NODES_INFO", {"count": len(node_ids)})
+    try:
+        nodes = (await db.scalars(select(models.Experiment).where(models.Experiment.id.in_(node_ids)))).all()
+        result = {
+            node.id: {"node": _node_detail(node), "parents": [], "children": []}
+            for node in nodes
+        }
+        found = list(result)
+        rel = models.ExperimentRelationship
+        # (edges into the requested nodes, joined to their source), (edges out, joined to their target)
+        sides = []
+        if with_parents:
+            sides.append(("parents", rel.to_experiment_id, rel.from_experiment_id))
+        if with_children:
+            sides.append(("children", rel.from_experiment_id, rel.to_experiment_id))
+        for key, own_end, other_end in sides:
+            if not found:
+                break
+            rows = (await db.execute(
+                select(
+                    rel.id, own_end, rel.relationship_type,
+                    models.Experiment.id, models.Experiment.title,
+                    func.substr(models.Experiment.description, 1, DESCRIPTION_PREVIEW),
+                ).join(models.Experiment, models.Experiment.id == other_end).where(
+                    own_end.in_(found)
+                ).order_by(rel.id)
+            )).all()
+            for edge_id, own_id, rel_type, other_id, title, description in rows:
+                result[own_id][key].append({
+                    "id": other_id,
+                    "title": title,
+                    "description": description,
+                    "relationship_type": rel_type,
+                    "relationship_id": edge_id
+                })
+        return FastJSONResponse({
+            "nodes": result,
+            "missing": [i for i in node_ids if i not in result]
+        })
+    except Exception as e:
+        logger.error(f"Error in get_nodes_info: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Failed to retrieve node information",
+                "message": str(e),
+                "action_required": "Please try again or check input parameters"
+            }
+        )
+
 @router.get("/nodes/{node_id}", response_model=schemas.NodeInfo)
 async def get_node_info(
     node_id: int,
     request: Request,
     with_parents: bool = True,
     with_children: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get detailed information about a specific node (experiment).
     """
     await log_request(request, "GET_NODE_INFO", {"node_id": node_id})
     try:
-        node = db.query(models.Experiment).filter(models.Experiment.id == node_id).first()
+        node = await db.get(models.Experiment, node_id)
         if not node:
             raise HTTPException(
                 status_code=404,
@@ -99,75 +500,42 @@ async def get_node_info(
                 }
             )
 
-        # Get relationships if requested
-        parent_nodes = []
-        child_nodes = []
-        
-        if with_parents:
-            # Get parent relationships and nodes in one query
-            parent_rels = db.query(
-                models.ExperimentRelationship,
-                models.Experiment
-            ).join(
-                models.Experiment,
-                models.ExperimentRelationship.from_experiment_id == models.Experiment.id
-            ).filter(
-                models.ExperimentRelationship.to_experiment_id == node_id
-            ).all()
-            
-            parent_nodes = [
-                schemas.RelatedNode(
-                    id=parent.id,
-                    title=parent.title,
-                    description=parent.description[:100] if parent.description else None,
-                    relationship_type=rel.relationship_type,
-                    relationship_id=rel.id
-                )
-                for rel, parent in parent_rels
-            ]
+        # Parents/children come from the adjacency index; their rows in one query
+        await db.run_sync(adjacency.index.ensure_loaded)
+        parent_links = adjacency.index.parents(node_id) if with_parents else []
+        child_links = adjacency.index.children(node_id) if with_children else []
+        neighbour_ids = {other for _, other, _ in parent_links + child_links}
+        neighbours = {
+            exp_id: (title, description)
+            for exp_id, title, description in (await db.execute(
+                select(models.Experiment.id, models.Experiment.title, models.Experiment.description)
+                .where(models.Experiment.id.in_(neighbour_ids))
+            )).all()
+        } if neighbour_ids else {}
 
-        if with_children:
-            # Get child relationships and nodes in one query
-            child_rels = db.query(
-                models.ExperimentRelationship,
-                models.Experiment
-            ).join(
-                models.Experiment,
-                models.ExperimentRelationship.to_experiment_id == models.Experiment.id
-            ).filter(
-                models.ExperimentRelationship.from_experiment_id == node_id
-            ).all()
-            
-            child_nodes = [
-                schemas.RelatedNode(
-                    id=child.id,
-                    title=child.title,
-                    description=child.description[:100] if child.description else None,
-                    relationship_type=rel.relationship_type,
-                    relationship_id=rel.id
-                )
-                for rel, child in child_rels
+        def _related(links):
+            return [
+                {
+                    "id": other,
+                    "title": neighbours[other][0],
+                    "description": neighbours[other][1][:100] if neighbours[other][1] else None,
+                    "relationship_type": rel_type,
+                    "relationship_id": edge_id
+                }
+                for edge_id, other, rel_type in links
+                if other in neighbours
             ]
 
+        parent_nodes = _related(parent_links)
+        child_nodes = _related(child_links)
+
         response = {
-            "node": {
-                "id": node.id,
-                "title": node.title,
-                "description": node.description,
-                "motivation": node.motivation,
-                "expectations": node.expectations,
-                "status": node.status,
-                "hypothesis": node.hypothesis,
-                "result": node.result,
-                "extra_data": node.extra_data,
-                "created_at": node.created_at.isoformat() if node.created_at else None,
-                "updated_at": node.updated_at.isoformat() if node.updated_at else None
-            },
+            "node": _node_detail(node),
             "parents": parent_nodes,
             "children": child_nodes
         }
         await log_response("GET_NODE_INFO", response)
-        return response
+        return FastJSONResponse(response)
     except HTTPException:
         raise
     except Exception as e:
@@ -181,55 +549,159 @@ async def get_node_info(
             }
         )
 
+@router.get("/nodes/{node_id}/suggested-edges", response_model=schemas.EdgeSuggestions)
+async def get_suggested_edges(
+    node_id: int,
+    request: Request,
+    k: int = Query(5, ge=1, le=50, description="Number of candidates per direction"),
+    direction: str = Query("both", description="parents|children|both"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Suggest the experiments a node most resembles as candidate parents/children.
+    Ranking comes from the in-memory similarity index (text + shared literature),
+    so no LLM call is made per comparison.
+    """
+    await log_request(request, "GET_SUGGESTED_EDGES", {"node_id": node_id, "k": k, "direction": direction})
+    if direction not in ("parents", "children", "both"):
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "Invalid direction",
+                "message": f"Unknown direction '{direction}'",
+                "action_required": "Use one of: parents, children, both"
+            }
+        )
+    try:
+        return await db.run_sync(lambda session: similarity.suggest_edges(node_id, session, k=k, direction=direction))
+    except ValueError:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "Node not found",
+                "message": f"No node exists with ID {node_id}",
+                "action_required": "Please verify the node ID"
+            }
+        )
+    except Exception as e:
+        logger.error(f"Error in get_suggested_edges: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Failed to suggest edges",
+                "message": str(e),
+                "action_required": "Please try again or check input parameters"
+            }
+        )
+
+@router.get("/nodes/{node_id}/subgraph", response_model=schemas.Subgraph)
+async def get_subgraph(
+    node_id: int,
+    request: Request,
+    depth: int = Query(2, ge=1, le=100, description="Max hops from the node"),
+    direction: str = Query("descendants", description="descendants|ancestors|both"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the nodes within `depth` hops of a node and the edges among them.
+    Traversal is a single recursive query; each node carries its hop count.
+    """
+    await log_request(request, "GET_SUBGRAPH", {"node_id": node_id, "depth": depth, "direction": direction})
+    if direction not in subgraph.DIRECTIONS:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "Invalid direction",
+                "message": f"Unknown direction '{direction}'",
+                "action_required": f"Use one of: {', '.join(subgraph.DIRECTIONS)}"
+            }
+        )
+    try:
+        nodes, edges = await db.run_sync(subgraph.fetch, node_id, depth, direction)
+        if not nodes:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "error": "Node not found",
+                    "message": f"No node exists with ID {node_id}",
+                    "action_required": "Please verify the node ID"
+                }
+            )
+        return FastJSONResponse({
+            "root_id": node_id,
+            "depth": depth,
+            "direction": direction,
+            "nodes": [{**_node_summary(exp), "depth": hops} for exp, hops in nodes],
+            "edges": [_edge_summary(rel) for rel in edges],
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_subgraph: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Failed to retrieve subgraph",
+                "message": str(e),
+                "action_required": "Please try again or check input parameters"
+            }
+        )
+
+def _node_validation_errors(experiment: schemas.ExperimentCreate) -> dict:
+    """Field checks for a new node; empty missing_fields/invalid_fields means valid."""
+    validation_errors = {
+        "missing_fields": [],
+        "invalid_fields": {},
+        "suggestions": {}
+    }
+
+    # Check required fields
+    if not experiment.title:
+        validation_errors["missing_fields"].append("title")
+        validation_errors["suggestions"]["title"] = "Provide a clear, descriptive title for the experiment"
+    elif len(experiment.title.strip()) < 5:
+        validation_errors["invalid_fields"]["title"] = "Title is too short"
+        validation_errors["suggestions"]["title"] = "Title should be at least 5 characters long and descriptive"
+
+    if experiment.status is None:
+        validation_errors["missing_fields"].append("status")
+        validation_errors["suggestions"]["status"] = f"Must be one of: {', '.join([s.value for s in ExperimentStatus])}"
+
+    # Validate content quality
+    if experiment.description and len(experiment.description.strip()) < 20:
+        validation_errors["invalid_fields"]["description"] = "Description is too brief"
+        validation_errors["suggestions"]["description"] = "Provide a more detailed description (at least 20 characters)"
+
+    if experiment.motivation and len(experiment.motivation.strip()) < 20:
+        validation_errors["invalid_fields"]["motivation"] = "Motivation is too brief"
+        validation_errors["suggestions"]["motivation"] = "Explain the motivation more thoroughly"
+
+    # Check for logical consistency
+    if experiment.result and experiment.status != ExperimentStatus.COMPLETED:
+        validation_errors["invalid_fields"]["status"] = "Experiment has results but status is not COMPLETED"
+        validation_errors["suggestions"]["status"] = "Set status to COMPLETED or remove results"
+
+    return validation_errors
+
 @router.post("/nodes", response_model=schemas.Experiment)
 async def create_node(
     experiment: schemas.ExperimentCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new node (experiment).
     Validates input and provides specific guidance for AI agent reprompting.
     """
-    await log_request(request, "CREATE_NODE", experiment.model_dump())
+    await log_request(request, "CREATE_NODE", {"fields": sorted(experiment.model_fields_set)}, body=experiment)
     try:
         # Comprehensive input validation
-        validation_errors = {
-            "missing_fields": [],
-            "invalid_fields": {},
-            "suggestions": {}
-        }
-
-        # Check required fields
-        if not experiment.title:
-            validation_errors["missing_fields"].append("title")
-            validation_errors["suggestions"]["title"] = "Provide a clear, descriptive title for the experiment"
-        elif len(experiment.title.strip()) < 5:
-            validation_errors["invalid_fields"]["title"] = "Title is too short"
-            validation_errors["suggestions"]["title"] = "Title should be at least 5 characters long and descriptive"
-
-        if experiment.status is None:
-            validation_errors["missing_fields"].append("status")
-            validation_errors["suggestions"]["status"] = f"Must be one of: {', '.join([s.value for s in ExperimentStatus])}"
-
-        # Validate content quality
-        if experiment.description and len(experiment.description.strip()) < 20:
-            validation_errors["invalid_fields"]["description"] = "Description is too brief"
-            validation_errors["suggestions"]["description"] = "Provide a more detailed description (at least 20 characters)"
-
-        if experiment.motivation and len(experiment.motivation.strip()) < 20:
-            validation_errors["invalid_fields"]["motivation"] = "Motivation is too brief"
-            validation_errors["suggestions"]["motivation"] = "Explain the motivation more thoroughly"
-
-        # Check for logical consistency
-        if experiment.result and experiment.status != ExperimentStatus.COMPLETED:
-            validation_errors["invalid_fields"]["status"] = "Experiment has results but status is not COMPLETED"
-            validation_errors["suggestions"]["status"] = "Set status to COMPLETED or remove results"
+        validation_errors = _node_validation_errors(experiment)
 
         # Check for existing node with the same title
-        existing_node = db.query(models.Experiment).filter(
-            models.Experiment.title == experiment.title
-        ).first()
+        existing_node = (await db.scalars(
+            select(models.Experiment).where(models.Experiment.title == experiment.title).limit(1)
+        )).first()
 
         if existing_node:
             raise HTTPException(
@@ -266,14 +738,19 @@ async def create_node(
 
         db_experiment = models.Experiment(**experiment.model_dump())
         db.add(db_experiment)
-        db.commit()
-        db.refresh(db_experiment)
+        await db.flush()
+        graph_log.record_upserts(db.sync_session, graph_log.NODE, [db_experiment])
+        await db.commit()
+        await db.refresh(db_experiment)
+        similarity.index.upsert(db_experiment)
+        topo_order.index.add_node(db_experiment.id)
+        reachability.index.add_node(db_experiment.id, db_experiment.status)
         
         response = schemas.Experiment.model_validate(db_experiment)
-        await log_response("CREATE_NODE", response.model_dump())
+        await log_response("CREATE_NODE", response)
         return response
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database integrity error in create_node: {str(e)}")
         
         # Extract specific constraint violation details
@@ -310,7 +787,7 @@ async def create_node(
                 }
             )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error in create_node: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -326,31 +803,16 @@ async def update_node(
     node_id: int,
     update_data: schemas.ExperimentCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update an existing node (experiment).
     """
-    # Print the raw data before any processing
-    print("\n[DEBUG] Raw update_data:", update_data)
-    
-    # Print with and without exclude_unset to see the difference
-    full_dict = update_data.model_dump(exclude_unset=False)
     update_dict = update_data.model_dump(exclude_unset=True)
-    
-    print("\n[DEBUG] Full data dictionary (including unset fields):", full_dict)
-    print("[DEBUG] Update dictionary (only set fields):", update_dict)
-    
-    print(f"\n[UPDATE NODE] Received request - Node ID: {node_id}")
-    print(f"[UPDATE NODE] Update data received: {update_dict}")
-    
-    await log_request(request, "UPDATE_NODE", {"node_id": node_id, "data": update_dict})
+    await log_request(request, "UPDATE_NODE", {"node_id": node_id, "fields": sorted(update_dict)}, body=update_dict)
     try:
-        experiment = db.query(models.Experiment).filter(models.Experiment.id == node_id).first()
-        print(f"[UPDATE NODE] Found experiment: {experiment.title if experiment else 'Not found'}")
-        
+        experiment = await db.get(models.Experiment, node_id)
         if not experiment:
-            print(f"[UPDATE NODE ERROR] Node {node_id} not found")
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -375,27 +837,17 @@ async def update_node(
             )
 
         # Validate specific fields
-        print("\n[VALIDATION] Starting field validation...")
         invalid_fields = []
         if 'status' in update_dict:
-            print(f"[VALIDATION] Checking status field: {update_dict['status']}")
             # Convert status to lowercase for case-insensitive comparison
             status_value = update_dict['status'].lower() if isinstance(update_dict['status'], str) else update_dict['status']
             valid_statuses = [s.value for s in ExperimentStatus]
-            print(f"[VALIDATION] Valid status values: {valid_statuses}")
-            print(f"[VALIDATION] Received status (lowercase): {status_value}")
-            
-            print(f"[DEBUG] Comparing '{status_value}' with valid statuses: {valid_statuses}")
             if status_value not in valid_statuses:
-                print(f"[VALIDATION ERROR] Invalid status value: {status_value}")
                 invalid_fields.append(('status', f"Must be one of: {', '.join(valid_statuses)}"))
             else:
                 # Ensure correct case is used
-                print(f"[DEBUG] Finding matching status enum for value: {status_value}")
                 matching_status = next(s for s in ExperimentStatus if s.value == status_value)
                 update_dict['status'] = matching_status
-                print(f"[DEBUG] Set status to enum value: {matching_status}")
-                print(f"[VALIDATION] Status value accepted and normalized to: {update_dict['status']}")
 
         if 'title' in update_dict and not update_dict['title'].strip():
             invalid_fields.append(('title', "Cannot be empty"))
@@ -412,31 +864,30 @@ async def update_node(
                     "validation_errors": invalid_fields
                 }
             }
-            logger.error(f"Validation error in update_node: {error_response}")
+            logger.warning("UPDATE_NODE validation failed", extra={"action": "UPDATE_NODE", "payload": error_response})
             raise HTTPException(
                 status_code=422,
                 detail=error_response
             )
 
         # Apply updates
-        print("\n[UPDATE] Applying field updates...")
         for field, value in update_dict.items():
-            print(f"[UPDATE] Setting field '{field}' to value: {value}")
             if field == 'extra_data' and value and experiment.extra_data:
-                print(f"[UPDATE] Merging extra_data: {value}")
                 experiment.extra_data.update(value)
             else:
-                print(f"[UPDATE] Setting attribute {field}={value}")
                 setattr(experiment, field, value)
 
         try:
-            db.commit()
-            db.refresh(experiment)
+            graph_log.record_upserts(db.sync_session, graph_log.NODE, [experiment])
+            await db.commit()
+            await db.refresh(experiment)
+            similarity.index.upsert(experiment)
+            reachability.index.set_status(experiment.id, experiment.status)
             response = schemas.Experiment.model_validate(experiment)
-            await log_response("UPDATE_NODE", response.model_dump())
+            await log_response("UPDATE_NODE", response)
             return response
         except IntegrityError as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=400,
                 detail={
@@ -448,7 +899,7 @@ async def update_node(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error in update_node: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -464,7 +915,7 @@ async def delete_node(
     node_id: int,
     request: Request,
     force_delete: bool = False,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a node and optionally its subgraph.
@@ -472,7 +923,7 @@ async def delete_node(
     await log_request(request, "DELETE_NODE", {"node_id": node_id, "force_delete": force_delete})
     try:
         # Check if node exists
-        node = db.query(models.Experiment).filter(models.Experiment.id == node_id).first()
+        node = await db.get(models.Experiment, node_id)
         if not node:
             raise HTTPException(
                 status_code=404,
@@ -484,9 +935,8 @@ async def delete_node(
             )
 
         # Check for children
-        has_children = db.query(models.ExperimentRelationship).filter(
-            models.ExperimentRelationship.from_experiment_id == node_id
-        ).first() is not None
+        await db.run_sync(adjacency.index.ensure_loaded)
+        has_children = bool(adjacency.index.children(node_id))
 
         if has_children and not force_delete:
             raise HTTPException(
@@ -498,48 +948,25 @@ async def delete_node(
                 }
             )
 
-        if force_delete:
-            # Get all descendant nodes
-            nodes_to_delete = set()
-            to_visit = {node_id}
-            
-            while to_visit:
-                current = to_visit.pop()
-                if current not in nodes_to_delete:
-                    nodes_to_delete.add(current)
-                    children = db.query(models.ExperimentRelationship.to_experiment_id).filter(
-                        models.ExperimentRelationship.from_experiment_id == current
-                    ).all()
-                    to_visit.update(child[0] for child in children)
-
-            # Delete relationships
-            db.query(models.ExperimentRelationship).filter(
-                (models.ExperimentRelationship.from_experiment_id.in_(nodes_to_delete)) |
-                (models.ExperimentRelationship.to_experiment_id.in_(nodes_to_delete))
-            ).delete(synchronize_session=False)
-
-            # Delete nodes
-            db.query(models.Experiment).filter(
-                models.Experiment.id.in_(nodes_to_delete)
-            ).delete(synchronize_session=False)
-        else:
-            # Delete relationships for this node
-            db.query(models.ExperimentRelationship).filter(
-                (models.ExperimentRelationship.from_experiment_id == node_id) |
-                (models.ExperimentRelationship.to_experiment_id == node_id)
-            ).delete(synchronize_session=False)
-            
-            # Delete the node
-            db.query(models.Experiment).filter(models.Experiment.id == node_id).delete()
+        # One recursive query finds the branch; its edges and literature go in the same transaction
+        deleted_nodes, deleted_edges = await db.run_sync(subgraph.delete_branch, node_id, cascade=force_delete)
+        nodes_to_delete = set(deleted_nodes)
 
-        db.commit()
+        graph_log.record(db.sync_session, graph_log.EDGE, deleted_edges, graph_log.DELETE)
+        graph_log.record(db.sync_session, graph_log.NODE, sorted(nodes_to_delete), graph_log.DELETE)
+        await db.commit()
+        similarity.index.remove(nodes_to_delete)
+        cooccurrence.index.remove_nodes(nodes_to_delete)
+        adjacency.index.remove_nodes(nodes_to_delete)
+        topo_order.index.remove_nodes(nodes_to_delete)
+        reachability.index.remove_nodes(nodes_to_delete)
         response = {"success": True, "deleted_node_id": node_id}
         await log_response("DELETE_NODE", response)
         return response
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error in delete_node: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -554,14 +981,24 @@ async def delete_node(
 async def create_edge(
     edge: schemas.ExperimentRelationshipCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new edge between experiments"""
-    await log_request(request, "CREATE_EDGE", edge.model_dump())
+    await log_request(request, "CREATE_EDGE", {
+        "from_experiment_id": edge.from_experiment_id,
+        "to_experiment_id": edge.to_experiment_id,
+    }, body=edge)
+    # The topological order is updated before commit; take the edge back out if the commit fails
+    added_to_order = None
+
+    def undo_topo_order():
+        if added_to_order is not None:
+            topo_order.index.remove_edges([added_to_order])
+
     try:
         # Verify both nodes exist
-        from_node = db.query(models.Experiment).filter(models.Experiment.id == edge.from_experiment_id).first()
-        to_node = db.query(models.Experiment).filter(models.Experiment.id == edge.to_experiment_id).first()
+        from_node = await db.get(models.Experiment, edge.from_experiment_id)
+        to_node = await db.get(models.Experiment, edge.to_experiment_id)
 
         if not from_node or not to_node:
             missing_nodes = []
@@ -591,10 +1028,12 @@ async def create_edge(
             )
 
         # Check for existing edge between these nodes
-        existing_edge = db.query(models.ExperimentRelationship).filter(
-            models.ExperimentRelationship.from_experiment_id == edge.from_experiment_id,
-            models.ExperimentRelationship.to_experiment_id == edge.to_experiment_id
-        ).first()
+        existing_edge = (await db.scalars(
+            select(models.ExperimentRelationship).where(
+                models.ExperimentRelationship.from_experiment_id == edge.from_experiment_id,
+                models.ExperimentRelationship.to_experiment_id == edge.to_experiment_id
+            ).limit(1)
+        )).first()
 
         if existing_edge:
             raise HTTPException(
@@ -611,18 +1050,31 @@ async def create_edge(
         edge_data = edge.model_dump()
         edge_data['relationship_type'] = models.RelationshipType.normalize(edge_data['relationship_type'])
         
-        # Create edge
+        # Create edge; the topological order rejects it if it would close a cycle
+        await db.run_sync(topo_order.index.ensure_loaded)
         db_edge = models.ExperimentRelationship(**edge_data)
         db.add(db_edge)
-        db.commit()
-        db.refresh(db_edge)
+        await db.flush()
+        try:
+            topo_order.index.add_edge(db_edge.id, db_edge.from_experiment_id, db_edge.to_experiment_id)
+        except topo_order.CycleError as e:
+            await db.rollback()
+            raise _cycle_error(e)
+        added_to_order = db_edge.id
+        graph_log.record_upserts(db.sync_session, graph_log.EDGE, [db_edge])
+        await db.commit()
+        added_to_order = None
+        await db.refresh(db_edge)
+        adjacency.index.upsert_edge(db_edge.id, db_edge.from_experiment_id, db_edge.to_experiment_id, db_edge.relationship_type)
+        reachability.index.upsert_edge(db_edge.id, db_edge.from_experiment_id, db_edge.to_experiment_id, db_edge.relationship_type)
         
         response = schemas.ExperimentRelationship.model_validate(db_edge)
-        await log_response("CREATE_EDGE", response.model_dump())
+        await log_response("CREATE_EDGE", response)
         return response
 
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
+        undo_topo_order()
         raise HTTPException(
             status_code=400,
             detail={
@@ -634,7 +1086,8 @@ async def create_edge(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        undo_topo_order()
         logger.error(f"Error in create_edge: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -650,14 +1103,19 @@ async def update_edge(
     edge_id: int,
     edge_update: schemas.ExperimentRelationshipCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an edge's properties"""
-    await log_request(request, "UPDATE_EDGE", {"edge_id": edge_id, "data": edge_update.model_dump()})
+    await log_request(request, "UPDATE_EDGE", {"edge_id": edge_id}, body=edge_update)
+    # The topological order is updated before commit; if the commit fails, rebuild it from the database
+    order_changed = False
+
+    def undo_topo_order():
+        if order_changed:
+            topo_order.index.invalidate()
+
     try:
-        edge = db.query(models.ExperimentRelationship).filter(
-            models.ExperimentRelationship.id == edge_id
-        ).first()
+        edge = await db.get(models.ExperimentRelationship, edge_id)
         
         if not edge:
             raise HTTPException(
@@ -676,10 +1134,9 @@ async def update_edge(
             to_id = update_data.get('to_experiment_id', edge.to_experiment_id)
             
             # Check nodes exist
-            nodes = db.query(models.Experiment).filter(
-                models.Experiment.id.in_([from_id, to_id])
-            ).all()
-            existing_ids = {node.id for node in nodes}
+            existing_ids = set((await db.scalars(
+                select(models.Experiment.id).where(models.Experiment.id.in_([from_id, to_id]))
+            )).all())
             
             missing_nodes = []
             if from_id not in existing_ids:
@@ -714,15 +1171,27 @@ async def update_edge(
                 value = models.RelationshipType.normalize(value)
             setattr(edge, field, value)
 
-        db.commit()
-        db.refresh(edge)
+        await db.run_sync(topo_order.index.ensure_loaded)
+        try:
+            topo_order.index.replace_edge(edge.id, edge.from_experiment_id, edge.to_experiment_id)
+        except topo_order.CycleError as e:
+            await db.rollback()
+            raise _cycle_error(e)
+        order_changed = True
+        graph_log.record_upserts(db.sync_session, graph_log.EDGE, [edge])
+        await db.commit()
+        order_changed = False
+        await db.refresh(edge)
+        adjacency.index.upsert_edge(edge.id, edge.from_experiment_id, edge.to_experiment_id, edge.relationship_type)
+        reachability.index.upsert_edge(edge.id, edge.from_experiment_id, edge.to_experiment_id, edge.relationship_type)
         
         response = schemas.ExperimentRelationship.model_validate(edge)
-        await log_response("UPDATE_EDGE", response.model_dump())
+        await log_response("UPDATE_EDGE", response)
         return response
 
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
+        undo_topo_order()
         raise HTTPException(
             status_code=400,
             detail={
@@ -734,7 +1203,8 @@ async def update_edge(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        undo_topo_order()
         logger.error(f"Error in update_edge: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -749,14 +1219,14 @@ async def update_edge(
 async def delete_edge(
     edge_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an edge between experiments"""
     await log_request(request, "DELETE_EDGE", {"edge_id": edge_id})
     try:
-        result = db.query(models.ExperimentRelationship).filter(
-            models.ExperimentRelationship.id == edge_id
-        ).delete()
+        result = (await db.execute(
+            delete(models.ExperimentRelationship).where(models.ExperimentRelationship.id == edge_id)
+        )).rowcount
         
         if not result:
             raise HTTPException(
@@ -768,13 +1238,17 @@ async def delete_edge(
                 }
             )
         
-        db.commit()
+        graph_log.record(db.sync_session, graph_log.EDGE, [edge_id], graph_log.DELETE)
+        await db.commit()
+        adjacency.index.remove_edges([edge_id])
+        topo_order.index.remove_edges([edge_id])
+        reachability.index.remove_edges([edge_id])
         return {"success": True, "deleted_edge_id": edge_id}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error in delete_edge: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -783,4 +1257,202 @@ async def delete_edge(
                 "message": str(e),
                 "action_required": "Please try again"
             }
-        )
\ No newline at end of file
+        )
+
+@router.post("/graph/batch", response_model=schemas.GraphBatchResult)
+async def apply_graph_batch(
+    batch: schemas.GraphBatch,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create many nodes and edges in one transaction: all of them or none.
+    Edges may refer to nodes of the same batch by `temp_id`. Validation covers
+    the whole batch with a few set-based queries and reports every problem.
+    """
+    await log_request(request, "GRAPH_BATCH", {"nodes": len(batch.nodes), "edges": len(batch.edges)})
+    errors = []
+
+    def fail(path: str, error: str, message: str, **extra):
+        errors.append({"path": path, "error": error, "message": message, **extra})
+
+    # Nodes: field checks, unique temp ids, unique titles within the batch and against the DB
+    temp_index = {}
+    titles = {}
+    for i, node in enumerate(batch.nodes):
+        validation_errors = _node_validation_errors(node)
+        if validation_errors["missing_fields"] or validation_errors["invalid_fields"]:
+            fail(f"nodes[{i}]", "Invalid experiment data", "The provided experiment data needs improvement",
+                 validation_errors=validation_errors)
+        if node.temp_id is not None:
+            if node.temp_id in temp_index:
+                fail(f"nodes[{i}].temp_id", "Duplicate temp_id",
+                     f"temp_id '{node.temp_id}' is already used by nodes[{temp_index[node.temp_id]}]")
+            else:
+                temp_index[node.temp_id] = i
+        if node.title:
+            if node.title in titles:
+                fail(f"nodes[{i}].title", "Duplicate node", f"Same title as nodes[{titles[node.title]}]")
+            else:
+                titles[node.title] = i
+    if titles:
+        existing = await db.execute(
+            select(models.Experiment.id, models.Experiment.title).where(models.Experiment.title.in_(list(titles)))
+        )
+        for existing_id, title in existing:
+            fail(f"nodes[{titles[title]}].title", "Duplicate node", "An experiment with this title already exists",
+                 existing_node_id=existing_id)
+
+    # Edges: endpoints resolve, no self-loops, no duplicates within the batch or against the DB
+    ref_ids = {
+        ref for edge in batch.edges
+        for ref in (edge.from_experiment_id, edge.to_experiment_id) if isinstance(ref, int)
+    }
+    found_ids = set((await db.scalars(
+        select(models.Experiment.id).where(models.Experiment.id.in_(ref_ids))
+    )).all()) if ref_ids else set()
+    pairs = {}
+    for j, edge in enumerate(batch.edges):
+        resolvable = True
+        for end in ("from_experiment_id", "to_experiment_id"):
+            ref = getattr(edge, end)
+            if isinstance(ref, str) and ref not in temp_index:
+                fail(f"edges[{j}].{end}", "Node(s) not found", f"No node in this batch has temp_id '{ref}'")
+                resolvable = False
+            elif isinstance(ref, int) and ref not in found_ids:
+                fail(f"edges[{j}].{end}", "Node(s) not found", f"No node exists with ID {ref}")
+                resolvable = False
+        if not resolvable:
+            continue
+        pair = (edge.from_experiment_id, edge.to_experiment_id)
+        if pair[0] == pair[1]:
+            fail(f"edges[{j}]", "Invalid edge", "Cannot create an edge from a node to itself")
+        elif pair in pairs:
+            fail(f"edges[{j}]", "Duplicate edge", f"Same endpoints as edges[{pairs[pair]}]")
+        else:
+            pairs[pair] = j
+    stored = [pair for pair in pairs if isinstance(pair[0], int) and isinstance(pair[1], int)]
+    if stored:
+        rel = models.ExperimentRelationship
+        candidates = await db.execute(
+            select(rel.id, rel.from_experiment_id, rel.to_experiment_id).where(
+                rel.from_experiment_id.in_({a for a, _ in stored}),
+                rel.to_experiment_id.in_({b for _, b in stored})
+            )
+        )
+        for existing_id, a, b in candidates:
+            if (a, b) in pairs:
+                fail(f"edges[{pairs[(a, b)]}]", "Duplicate edge", "An edge already exists between these nodes",
+                     existing_edge_id=existing_id)
+
+    if errors:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "Invalid batch",
+                "message": f"{len(errors)} problem(s) found; nothing was applied",
+                "errors": errors,
+                "action_required": "Fix the listed items and resubmit the whole batch"
+            }
+        )
+
+    await db.run_sync(topo_order.index.ensure_loaded)
+    db_nodes = []
+    db_edges = []
+
+    def undo_topo_order():
+        topo_order.index.remove_edges([e.id for e in db_edges])
+        topo_order.index.remove_nodes([n.id for n in db_nodes])
+
+    try:
+        db_nodes = [models.Experiment(**node.model_dump(exclude={"temp_id"})) for node in batch.nodes]
+        db.add_all(db_nodes)
+        await db.flush()
+        id_map = {temp_id: db_nodes[i].id for temp_id, i in temp_index.items()}
+
+        def resolve(ref):
+            return id_map[ref] if isinstance(ref, str) else ref
+
+        for edge in batch.edges:
+            edge_data = edge.model_dump()
+            edge_data["from_experiment_id"] = resolve(edge.from_experiment_id)
+            edge_data["to_experiment_id"] = resolve(edge.to_experiment_id)
+            edge_data["relationship_type"] = models.RelationshipType.normalize(edge_data["relationship_type"])
+            db_edges.append(models.ExperimentRelationship(**edge_data))
+        db.add_all(db_edges)
+        await db.flush()
+
+        # Every edge goes through the topological order; one cycle undoes the whole batch
+        for n in db_nodes:
+            topo_order.index.add_node(n.id)
+        for e in db_edges:
+            topo_order.index.add_edge(e.id, e.from_experiment_id, e.to_experiment_id)
+
+        node_ids = [n.id for n in db_nodes]
+        edge_ids = [e.id for e in db_edges]
+        graph_log.record_upserts(db.sync_session, graph_log.NODE, db_nodes)
+        graph_log.record_upserts(db.sync_session, graph_log.EDGE, db_edges)
+        await db.commit()
+    except topo_order.CycleError as e:
+        undo_topo_order()
+        await db.rollback()
+        # Report the cycle in the client's terms: temp ids for nodes of this batch
+        temp_of = {db_nodes[i].id: temp_id for temp_id, i in temp_index.items()}
+        cycle = [temp_of.get(n, n) for n in e.cycle]
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Cycle detected",
+                "message": f"The batch would create a cycle: {' -> '.join(str(n) for n in cycle)}",
+                "cycle": cycle,
+                "action_required": "The experiment graph must stay acyclic; remove an edge on the cycle first"
+            }
+        )
+    except IntegrityError as e:
+        undo_topo_order()
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Invalid batch data",
+                "message": str(e),
+                "action_required": "Please check node fields, node IDs and relationship types"
+            }
+        )
+    except Exception as e:
+        undo_topo_order()
+        await db.rollback()
+        logger.error(f"Error in apply_graph_batch: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Failed to apply batch",
+                "message": str(e),
+                "action_required": "Please try again; nothing was applied"
+            }
+        )
+
+    # Reload the committed rows in two queries rather than one refresh per object
+    nodes = (await db.scalars(
+        select(models.Experiment).where(models.Experiment.id.in_(node_ids)).order_by(models.Experiment.id)
+        .execution_options(populate_existing=True)
+    )).all()
+    edges = (await db.scalars(
+        select(models.ExperimentRelationship).where(models.ExperimentRelationship.id.in_(edge_ids))
+        .order_by(models.ExperimentRelationship.id).execution_options(populate_existing=True)
+    )).all() if edge_ids else []
+    for n in nodes:
+        similarity.index.upsert(n)
+        reachability.index.add_node(n.id, n.status)
+    for e in edges:
+        adjacency.index.upsert_edge(e.id, e.from_experiment_id, e.to_experiment_id, e.relationship_type)
+        reachability.index.upsert_edge(e.id, e.from_experiment_id, e.to_experiment_id, e.relationship_type)
+
+    response = {
+        "version": await db.run_sync(graph_log.current_version),
+        "id_map": id_map,
+        "nodes": nodes,
+        "edges": edges,
+    }
+    await log_response("GRAPH_BATCH", {"nodes": len(nodes), "edges": len(edges), "version": response["version"]})
+    return response
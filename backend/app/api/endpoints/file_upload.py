@@ -7,8 +7,6 @@ import logging
 
 router = APIRouter()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create uploads directory if it doesn't exist
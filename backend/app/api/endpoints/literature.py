@@ -1,79 +1,95 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks, UploadFile, File
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...database import get_db
+from ...database import get_async_db
 from ...models.literature import Literature
 from ...models.experiment import Experiment
+from ...schemas.literature import REL_TYPES
+from ..pagination import (
+    NEXT_CURSOR_HEADER,
+    apply_keyset,
+    created_key,
+    encode_cursor,
+    parse_fields,
+)
+from ..responses import FastJSONResponse
 from services import orchestrator
 from services import openalex as openalex_svc
 from services import llm_gemini as llm
+from services import similarity
+from services import cooccurrence
+from services import abstracts
+from services import enrichment
+from services import bib_import
+from services import literature_store
+import io
+import logging
 import re
 import traceback
+from datetime import datetime, timezone
 from fastapi.responses import JSONResponse
 
 from urllib.parse import unquote
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+NODE_LITERATURE_FIELDS = [
+    "id", "title", "year", "venue", "doi", "url",
+    "relationship", "confidence", "verified", "summary",
+]
+
 @router.get("/nodes/{node_id}/literature", response_model=List[dict])
-async def get_node_literature(node_id: int, db: Session = Depends(get_db)):
+async def get_node_literature(
+    node_id: int,
+    background_tasks: BackgroundTasks,
+    enrich: str = Query("async", description="sync: refresh stale rows before responding | async: respond from DB, refresh in background | none: DB only"),
+    limit: int = Query(100, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    rel_type: Optional[str] = Query(None, description="Filter by relationship: similar|builds_on|prior|contrast"),
+    year: Optional[int] = Query(None, description="Filter by publication year"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of item fields"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Get all literature for a node, enriched similarly to get_literature_of_node.
+    Get one page of literature for a node, newest first.
+    Stored fields are served directly; rows on the page that are missing display
+    fields or are older than the TTL are refreshed concurrently according to `enrich`.
+    When more rows exist, the next page's cursor is returned in X-Next-Cursor.
     """
+    if enrich not in ("sync", "async", "none"):
+        raise HTTPException(status_code=422, detail="enrich must be one of: sync, async, none")
+    keys = parse_fields(fields, NODE_LITERATURE_FIELDS, NODE_LITERATURE_FIELDS)
+
     # Check if node exists
-    node = db.query(Experiment).filter(Experiment.id == node_id).first()
-    if not node:
+    if await db.scalar(select(Experiment.id).where(Experiment.id == node_id)) is None:
         raise HTTPException(status_code=404, detail="Node not found")
 
-    rows = (
-        db.query(Literature)
-        .filter(Literature.experiment_id == node_id)
-        .order_by(Literature.created_at.desc())
-        .all()
-    )
+    q = select(Literature, created_key(Literature.created_at)).where(Literature.experiment_id == node_id)
+    if rel_type:
+        q = q.where(Literature.rel_type == rel_type)
+    if year is not None:
+        q = q.where(Literature.year == year)
+    page = (await db.execute(apply_keyset(q, Literature.created_at, Literature.id, cursor, limit))).all()
+    headers = {}
+    if len(page) > limit:
+        last_row, last_key = page[limit - 1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last_key, last_row.id)
+    rows = [row for row, _ in page[:limit]]
 
-    out: List[dict] = []
-    for row in rows:
-        try:
-            oa_id = row.openalex_id or _parse_openalex_id(row.link or "")
-            work = await openalex_svc.get_work(oa_id) if oa_id else None
-            if not work:
-                # Try DOI parse and resolve if not an OpenAlex link
-                doi = row.doi
-                if not doi and row.link and "doi.org/" in row.link:
-                    doi = row.link.split("doi.org/")[-1].strip()
-                if doi:
-                    work = await openalex_svc.resolve_by_doi_or_title(doi, row.link)
-            summary = await llm.summarize_one_liner_cn(work.get("abstract", "") if work else "")
-            out.append({
-                "id": (work or {}).get("id") or oa_id or row.link,
-                "title": (work or {}).get("title") or row.title,
-                "year": (work or {}).get("year") or row.year,
-                "venue": (work or {}).get("venue") or row.venue,
-                "doi": (work or {}).get("doi") or row.doi,
-                "url": (work or {}).get("url") or row.link,
-                "relationship": row.rel_type,
-                "confidence": round(row.confidence, 4) if row.confidence is not None else None,
-                "verified": row.evidence or {},
-                "summary": summary,
-            })
-        except Exception as e:
-            out.append({
-                "id": row.openalex_id or row.link,
-                "title": row.title,
-                "year": row.year,
-                "venue": row.venue,
-                "doi": row.doi,
-                "url": row.link,
-                "relationship": row.rel_type,
-                "confidence": round(row.confidence, 4) if row.confidence is not None else None,
-                "verified": row.evidence or {},
-                "summary": "",
-                "_error": str(e),
-            })
+    stale = [row for row in rows if enrichment.is_stale(row)]
+    if stale and enrich == "sync":
+        await enrichment.refresh_rows(db, stale)
+    elif stale and enrich == "async":
+        background_tasks.add_task(enrichment.refresh_in_background, [row.id for row in stale])
 
-    return out
+    return FastJSONResponse([{k: item[k] for k in keys} for item in map(enrichment.row_out, rows)], headers=headers)
+
+# Refreshed when a paper that is already cached for the node is suggested again
+SUGGESTION_FIELDS = ("title", "venue", "year", "confidence", "evidence", "summary", "enriched_at")
 
 def _parse_openalex_id(link: str) -> Optional[str]:
     m = re.search(r"openalex\.org/(W\d+)", link or "")
@@ -85,7 +101,7 @@ async def get_literature_of_node(
     ignore_cache: bool = Query(False, description="Bypass cache and recompute suggestion"),
     relationship: str = Query("auto", description="Relationship type: similar|builds_on|prior|contrast|auto"),
     exclude_ids: str = Query("", description="Comma-separated list of paper IDs to exclude"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Return one literature item for the node.
@@ -94,7 +110,7 @@ async def get_literature_of_node(
     """
     try:
         # Ensure node exists
-        node = db.query(Experiment).filter(Experiment.id == node_id).first()
+        node = await db.get(Experiment, node_id)
         if not node:
             raise HTTPException(status_code=404, detail="Node not found")
 
@@ -106,13 +122,31 @@ async def get_literature_of_node(
         exclude_list = [id.strip() for id in exclude_ids.split(",") if id.strip()] if exclude_ids else []
 
         if not ignore_cache:
-            q = db.query(Literature).filter(Literature.experiment_id == node_id)
+            q = select(Literature).where(Literature.experiment_id == node_id)
             if rel != "auto":
-                q = q.filter(Literature.rel_type == rel)
-            row = q.order_by(Literature.created_at.desc()).first()
+                q = q.where(Literature.rel_type == rel)
+            row = (await db.scalars(q.order_by(Literature.created_at.desc()).limit(1))).first()
             if row:
                 oa_id = row.openalex_id or _parse_openalex_id(row.link or "")
+                abstract = await db.run_sync(abstracts.get, oa_id) if oa_id else None
+                if abstract is not None and row.title:
+                    # Served entirely from the cached row and the local abstract store
+                    return {
+                        "id": f"https://openalex.org/{abstracts.work_key(oa_id)}",
+                        "title": row.title,
+                        "year": row.year,
+                        "venue": row.venue,
+                        "doi": row.doi,
+                        "url": row.link,
+                        "relationship": row.rel_type,
+                        "confidence": round(row.confidence, 4) if row.confidence is not None else None,
+                        "verified": row.evidence or {},
+                        "summary": row.summary or await llm.summarize_one_liner_cn(abstract),
+                    }
                 work = await openalex_svc.get_work(oa_id) if oa_id else None
+                if work:
+                    await db.run_sync(abstracts.remember, [work])
+                    await db.commit()
                 summary = await llm.summarize_one_liner_cn(work.get("abstract", "") if work else "")
                 if work:
                     return {
@@ -152,7 +186,7 @@ async def get_literature_of_node(
         except Exception as e:
             # If suggestion fails (e.g., no candidates), try without exclusions
             if exclude_list:
-                print(f"[api] Suggestion failed with exclusions, trying without: {e}")
+                logger.info("suggestion failed with exclusions, trying without: %s", e)
                 paper = await orchestrator.suggest_one(
                     node_id=str(node_id),
                     relationship=rel,
@@ -166,21 +200,27 @@ async def get_literature_of_node(
         try:
             oa_id = _parse_openalex_id(paper.get("id", "")) or _parse_openalex_id(paper.get("url", ""))
             link = paper.get("id") or paper.get("url")
-            row = Literature(
-                experiment_id=node_id,
-                openalex_id=oa_id,
-                link=link,
-                rel_type=paper.get("relationship", rel if rel != "auto" else "similar"),
-                title=paper.get("title"),
-                venue=paper.get("venue"),
-                year=paper.get("year"),
-                confidence=paper.get("confidence"),
-                evidence=paper.get("verified"),
-            )
-            db.add(row)
-            db.commit()
+            persisted = await db.run_sync(literature_store.upsert, [{
+                "experiment_id": node_id,
+                "openalex_id": oa_id,
+                "doi": openalex_svc.normalize_doi(paper.get("doi")),
+                "link": link,
+                "rel_type": paper.get("relationship", rel if rel != "auto" else "similar"),
+                "title": paper.get("title"),
+                "venue": paper.get("venue"),
+                "year": paper.get("year"),
+                "confidence": paper.get("confidence"),
+                "evidence": paper.get("verified"),
+                "summary": paper.get("summary"),
+                "enriched_at": datetime.now(timezone.utc),
+            }], update=SUGGESTION_FIELDS)
+            await db.commit()
+            for _, key in persisted:
+                similarity.index.add_literature(node_id, key)
+                cooccurrence.index.add(node_id, key)
         except Exception as e:
-            print(f"[api] failed to cache suggested paper for node {node_id}: {e}")
+            await db.rollback()
+            logger.warning("failed to cache suggested paper for node %s: %s", node_id, e)
 
         return paper
     except Exception as e:
@@ -190,73 +230,196 @@ async def get_literature_of_node(
         )
 
 @router.post("/nodes/{node_id}/literature")
-def add_literature(
+async def add_literature(
     node_id: int,
     link: str = Query(..., description="Paper link, e.g. https://openalex.org/W2741809807 or https://doi.org/10.xxxx/yyy"),
     relationship: str = Query("similar", description="Relationship to node"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Add a literature reference to a node
     """
     # Check if node exists
-    node = db.query(Experiment).filter(Experiment.id == node_id).first()
+    node = await db.get(Experiment, node_id)
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
     
-    # Check if literature already exists
-    existing = db.query(Literature).filter(
-        Literature.experiment_id == node_id,
-        Literature.link == link
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Literature reference already exists for this node")
-    
+    if relationship not in REL_TYPES:
+        raise HTTPException(status_code=422, detail=f"relationship must be one of: {', '.join(REL_TYPES)}")
+
     # Derive identifiers
+    link = link.strip()
     oa_id = _parse_openalex_id(link)
     doi = None
-    if "doi.org/" in (link or ""):
-        doi = link.split("doi.org/")[-1].strip()
+    if "doi.org/" in link:
+        doi = openalex_svc.normalize_doi(link.split("doi.org/")[-1])
 
-    # Add new literature (cache minimal fields; others can be enriched later)
-    literature = Literature(
-        experiment_id=node_id,
-        openalex_id=oa_id,
-        doi=doi,
-        link=link.strip(),
-        rel_type=relationship,
-    )
-    db.add(literature)
-    db.commit()
-    db.refresh(literature)
-    return {"success": True, "id": literature.id, "openalex_id": literature.openalex_id}
+    # Add new literature (cache minimal fields; others can be enriched later).
+    # The unique (experiment_id, canonical_key) index rejects the same paper under another link.
+    inserted = await db.run_sync(literature_store.upsert, [{
+        "experiment_id": node_id,
+        "openalex_id": oa_id,
+        "doi": doi,
+        "link": link,
+        "rel_type": relationship,
+    }])
+    if not inserted:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Literature reference already exists for this node")
+    await db.commit()
+    lit_id, key = inserted[0]
+    similarity.index.add_literature(node_id, key)
+    cooccurrence.index.add(node_id, key)
+    return {"success": True, "id": lit_id, "openalex_id": oa_id, "canonical_key": key}
+
+@router.post("/nodes/{node_id}/literature/import")
+async def import_literature(
+    node_id: int,
+    file: UploadFile = File(..., description="BibTeX, RIS, CSV or a DOI / OpenAlex-id list"),
+    fmt: str = Query("auto", alias="format", description="auto|bibtex|ris|csv|doi"),
+    relationship: str = Query("similar", description="Relationship to node for entries that don't specify one"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Bulk-import a bibliography into a node.
+    DOIs / W-ids are resolved against OpenAlex in batched requests, duplicates of
+    existing rows are skipped and new rows are inserted one chunk per transaction.
+    """
+    if await db.scalar(select(Experiment.id).where(Experiment.id == node_id)) is None:
+        raise HTTPException(status_code=404, detail="Node not found")
+    if relationship not in REL_TYPES:
+        raise HTTPException(status_code=422, detail=f"relationship must be one of: {', '.join(REL_TYPES)}")
+
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", errors="replace")
+    try:
+        entries = bib_import.parse(lines, fmt, file.filename)
+        stats = await bib_import.import_entries(db, node_id, entries, relationship)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"success": True, "node_id": node_id, **stats}
 
 @router.delete("/nodes/{node_id}/literature/{link:path}")
-def delete_literature(node_id: int, link: str, db: Session = Depends(get_db)):
+async def delete_literature(node_id: int, link: str, db: AsyncSession = Depends(get_async_db)):
     link = unquote(link)
 
     """
     Delete a literature reference from a node
     """
-    result = db.query(Literature).filter(
-        Literature.experiment_id == node_id,
-        Literature.link == link
-    ).delete()
+    match = (Literature.experiment_id == node_id, Literature.link == link)
+    keys = [similarity.literature_key(row) for row in (await db.scalars(select(Literature).where(*match))).all()]
+    result = (await db.execute(delete(Literature).where(*match))).rowcount
     
     if not result:
         raise HTTPException(status_code=404, detail="Literature reference not found")
     
-    db.commit()
+    await db.commit()
+    for key in keys:
+        similarity.index.remove_literature(node_id, key)
+        cooccurrence.index.remove(node_id, key)
     return {"success": True}
 
+@router.get("/nodes/{node_id}/literature/shared")
+async def get_nodes_sharing_literature(
+    node_id: int,
+    limit: int = Query(10, ge=1, le=100, description="Max nodes to return"),
+    with_papers: bool = Query(False, description="Include the shared paper keys"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Nodes that cite the same papers as this node, most shared papers first.
+    Served from the in-memory co-occurrence index.
+    """
+    if await db.scalar(select(Experiment.id).where(Experiment.id == node_id)) is None:
+        raise HTTPException(status_code=404, detail="Node not found")
+    await db.run_sync(cooccurrence.index.ensure_loaded)
+    top = cooccurrence.index.shared_with(node_id, k=limit)
+    titles = dict((await db.execute(
+        select(Experiment.id, Experiment.title).where(Experiment.id.in_([other for other, _, _ in top]))
+    )).all()) if top else {}
+    out = []
+    for other, shared, jaccard in top:
+        item = {"node_id": other, "title": titles.get(other), "shared": shared, "jaccard": round(jaccard, 4)}
+        if with_papers:
+            item["papers"] = sorted(cooccurrence.index.shared_papers(node_id, other))
+        out.append(item)
+    return {"node_id": node_id, "nodes": out}
+
+@router.get("/literature/top")
+async def get_most_cited_literature(
+    limit: int = Query(10, ge=1, le=100, description="Max papers to return"),
+    min_nodes: int = Query(2, ge=1, description="Only papers cited by at least this many nodes"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Papers cited by the most nodes across the lab, with the citing node ids.
+    Counts come from the in-memory co-occurrence index; display fields are
+    read for the returned papers only.
+    """
+    await db.run_sync(cooccurrence.index.ensure_loaded)
+    top = cooccurrence.index.top_papers(k=limit, min_nodes=min_nodes)
+    meta = {}
+    if top:
+        rows = (await db.execute(
+            select(Literature.canonical_key, Literature.title, Literature.year, Literature.doi, Literature.link)
+            .where(Literature.canonical_key.in_([key for key, _ in top]))
+        )).all()
+        for key, title, year, doi, link in rows:
+            if key not in meta or (title and not meta[key]["title"]):
+                meta[key] = {"title": title, "year": year, "doi": doi, "link": link}
+    return [
+        {"key": key, **meta.get(key, {"title": None, "year": None, "doi": None, "link": None}), "nodes": nodes, "count": len(nodes)}
+        for key, nodes in top
+    ]
+
+# Projectable columns of GET /literature
+LITERATURE_COLUMNS = {
+    "id": Literature.id,
+    "node_id": Literature.experiment_id,
+    "node_title": Experiment.title,
+    "link": Literature.link,
+    "openalex_id": Literature.openalex_id,
+    "doi": Literature.doi,
+    "title": Literature.title,
+    "venue": Literature.venue,
+    "year": Literature.year,
+    "relationship": Literature.rel_type,
+    "confidence": Literature.confidence,
+    "created_at": Literature.created_at,
+}
+
 @router.get("/literature", response_model=List[dict])
-def get_all_literature(db: Session = Depends(get_db)):
+async def get_all_literature(
+    limit: int = Query(100, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    node_id: Optional[int] = Query(None, description="Only literature of this node"),
+    rel_type: Optional[str] = Query(None, description="Filter by relationship: similar|builds_on|prior|contrast"),
+    year: Optional[int] = Query(None, description="Filter by publication year"),
+    fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(LITERATURE_COLUMNS)}"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Get all literature references across all nodes
+    Get one page of literature references across all nodes, newest first.
+    Only the requested columns are selected; the experiment join happens only
+    when node_title is requested. The next page's cursor is returned in X-Next-Cursor.
     """
-    literature = db.query(Literature, Experiment.title).join(Experiment).all()
-    return [{
-        "node_id": lit.Literature.experiment_id,
-        "node_title": lit.title,
-        "link": lit.Literature.link
-    } for lit in literature]
\ No newline at end of file
+    keys = parse_fields(fields, LITERATURE_COLUMNS, ["node_id", "node_title", "link"])
+    q = select(
+        Literature.id.label("_id"),
+        created_key(Literature.created_at),
+        *(LITERATURE_COLUMNS[k].label(k) for k in keys),
+    )
+    if "node_title" in keys:
+        q = q.join(Experiment, Experiment.id == Literature.experiment_id)
+    if node_id is not None:
+        q = q.where(Literature.experiment_id == node_id)
+    if rel_type:
+        q = q.where(Literature.rel_type == rel_type)
+    if year is not None:
+        q = q.where(Literature.year == year)
+
+    page = (await db.execute(apply_keyset(q, Literature.created_at, Literature.id, cursor, limit))).all()
+    headers = {}
+    if len(page) > limit:
+        last = page[limit - 1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_key, last._id)
+    return FastJSONResponse([{k: getattr(row, k) for k in keys} for row in page[:limit]], headers=headers)
@@ -0,0 +1,37 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from services import search as search_svc
+
+router = APIRouter()
+
+SEARCH_TYPES = ("experiments", "literature")
+
+@router.get("/search")
+def search(
+    q: str = Query(..., min_length=1, description="Search text; words are ANDed"),
+    types: Optional[str] = Query(None, description="Comma-separated subset of: experiments, literature"),
+    limit: int = Query(20, ge=1, le=100, description="Max results per type"),
+    prefix: bool = Query(True, description="Prefix-match every word (typeahead)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Ranked full-text search over experiments (title, description, hypothesis,
+    result, motivation) and literature (title, venue). `title_highlight` and
+    `snippet` are HTML-escaped text with matches wrapped in <mark>.
+    """
+    wanted = [t.strip() for t in (types or ",".join(SEARCH_TYPES)).split(",") if t.strip()]
+    unknown = [t for t in wanted if t not in SEARCH_TYPES]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "Invalid search type",
+                "message": f"Unknown type(s): {', '.join(unknown)}",
+                "action_required": f"Use one or more of: {', '.join(SEARCH_TYPES)}"
+            }
+        )
+    results = search_svc.search(db, q, wanted, limit=limit, prefix=prefix)
+    return {"query": q, **results}
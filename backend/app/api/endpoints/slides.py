@@ -7,8 +7,10 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 from pathlib import Path
 
-from ...database import get_db
-from sqlalchemy.orm import Session
+from ...database import get_async_db
+from ..responses import FastJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...models.experiment import Experiment
 from ...models.literature import Literature
@@ -35,39 +37,45 @@ class SlidePlanAllReq(BaseModel):
 class SlideGenerateAllReq(BaseModel):
     filename: Optional[str] = None
 
+async def _context(db: AsyncSession, node_id: int) -> Dict[str, Any]:
+    """build_context_json reads through a sync Session; run it on the async session's."""
+    return await db.run_sync(lambda session: build_context_json(node_id, session))
+
+async def _all_nodes(db: AsyncSession):
+    return (await db.execute(select(Experiment.id, Experiment.title))).all()
+
 @router.get("/slides/context/{node_id}")
-def get_context(node_id: int, db: Session = Depends(get_db)):
+async def get_context(node_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Return a compact 'Research Context JSON' assembled from DB for the given node.
     This is the exact object you later inject into the LLM prompt template.
     """
-    return build_context_json(node_id, db)
+    return FastJSONResponse(await _context(db, node_id))
 
 @router.get("/slides/context")
-def get_context_all(db: Session = Depends(get_db)):
+async def get_context_all(db: AsyncSession = Depends(get_async_db)):
     """
     Return a list of compact Research Context JSONs for the entire DB (all nodes).
     Useful when you want to generate slides for the whole project.
     """
-    nodes = db.query(Experiment).all()
-    contexts = [build_context_json(n.id, db) for n in nodes]
-    return {
+    contexts = [await _context(db, n.id) for n in await _all_nodes(db)]
+    return FastJSONResponse({
         "generated_at": datetime.utcnow().isoformat(),
         "node_count": len(contexts),
         "contexts": contexts,
-    }
+    })
 
 @router.post("/slides/plan")
-async def make_slide_plan(req: SlidePlanReq, db: Session = Depends(get_db)):
+async def make_slide_plan(req: SlidePlanReq, db: AsyncSession = Depends(get_async_db)):
     """
     Produce {SLIDE_PLAN, SPEAKER_NOTES} via LLM (or stub if you haven't wired LLM yet).
     """
     # Ensure node exists
-    node = db.query(Experiment).filter(Experiment.id == req.node_id).first()
+    node = await db.get(Experiment, req.node_id)
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
 
-    ctx = build_context_json(req.node_id, db)
+    ctx = await _context(db, req.node_id)
 
     # === Call LLM (or stub) ===
     # This returns a dict with keys 'SLIDE_PLAN' and 'SPEAKER_NOTES'
@@ -77,7 +85,7 @@ async def make_slide_plan(req: SlidePlanReq, db: Session = Depends(get_db)):
     return result
 
 @router.post("/slides/generate")
-async def generate_pptx(req: SlideGenerateReq | None = None, db: Session = Depends(get_db)):
+async def generate_pptx(req: SlideGenerateReq | None = None, db: AsyncSession = Depends(get_async_db)):
     """
     Create a PPTX file.
     - If body absent: auto-generate a combined deck for ALL nodes (no params needed).
@@ -86,10 +94,9 @@ async def generate_pptx(req: SlideGenerateReq | None = None, db: Session = Depen
     """
     # Combined mode (no body): generate one deck for all nodes
     if req is None:
-        nodes = db.query(Experiment).all()
         plan_items: List[Dict[str, Any]] = []
-        for n in nodes:
-            ctx = build_context_json(n.id, db)
+        for n in await _all_nodes(db):
+            ctx = await _context(db, n.id)
             plan = await llm_client.generate_slide_plan(context=ctx, prompt_template=SLIDES_PROMPT_EN)
             plan_items.append({"node_id": n.id, "title": n.title, "plan": plan})
 
@@ -111,12 +118,12 @@ async def generate_pptx(req: SlideGenerateReq | None = None, db: Session = Depen
         return {"file_url": f"/download/{filename}"}
 
     # Single-node mode (body present)
-    node = db.query(Experiment).filter(Experiment.id == req.node_id).first()
+    node = await db.get(Experiment, req.node_id)
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
 
     # Always generate plan from DB context (ignore any client-provided plan)
-    ctx = build_context_json(req.node_id, db)
+    ctx = await _context(db, req.node_id)
     plan = await llm_client.generate_slide_plan(context=ctx, prompt_template=SLIDES_PROMPT_EN)
     if not isinstance(plan, dict) or "SLIDE_PLAN" not in plan:
         raise HTTPException(status_code=500, detail="Failed to generate slide plan")
@@ -140,15 +147,14 @@ async def generate_pptx(req: SlideGenerateReq | None = None, db: Session = Depen
 
 
 @router.post("/slides/plan_all")
-async def make_slide_plan_all(_: SlidePlanAllReq | None = None, db: Session = Depends(get_db)):
+async def make_slide_plan_all(_: SlidePlanAllReq | None = None, db: AsyncSession = Depends(get_async_db)):
     """
     Generate slide plans for ALL nodes in the DB.
     Returns: { generated_at, count, items: [{node_id, title, plan, notes}] }
     """
-    nodes = db.query(Experiment).all()
     items: List[Dict[str, Any]] = []
-    for n in nodes:
-        ctx = build_context_json(n.id, db)
+    for n in await _all_nodes(db):
+        ctx = await _context(db, n.id)
         plan = await llm_client.generate_slide_plan(context=ctx, prompt_template=SLIDES_PROMPT_EN)
         notes = plan.get("SPEAKER_NOTES") if isinstance(plan, dict) else None
         items.append({
@@ -218,17 +224,16 @@ def _combine_plans(plans: List[Dict[str, Any]]) -> Dict[str, Any]:
 
 
 @router.post("/slides/generate_all")
-async def generate_pptx_all(req: SlideGenerateAllReq | None = None, db: Session = Depends(get_db)):
+async def generate_pptx_all(req: SlideGenerateAllReq | None = None, db: AsyncSession = Depends(get_async_db)):
     """
     Generate a single PPTX that covers ALL nodes by concatenating per-node plans.
     If `plans` are provided in the request, uses them; otherwise calls LLM per node.
     Returns: { file_url }
     """
-    nodes = db.query(Experiment).all()
     plan_items: List[Dict[str, Any]] = []
     # Always compute plans from DB context; ignore any client-provided plans
-    for n in nodes:
-        ctx = build_context_json(n.id, db)
+    for n in await _all_nodes(db):
+        ctx = await _context(db, n.id)
         plan = await llm_client.generate_slide_plan(context=ctx, prompt_template=SLIDES_PROMPT_EN)
         plan_items.append({"node_id": n.id, "title": n.title, "plan": plan})
 
@@ -0,0 +1,61 @@
+"""
+Keyset (cursor) pagination and field projection helpers for list endpoints.
+
+Pages are ordered by (created_at DESC, id DESC). The cursor is an opaque,
+URL-safe token holding the last row's created_at (as the DB stores it) and id,
+so each page is one index range scan no matter how deep the client pages.
+"""
+import base64
+import json
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import String, cast, tuple_, type_coerce
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_key: str, row_id: int) -> str:
+    raw = json.dumps([created_key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_key, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(created_key), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+
+def created_key(created_col):
+    """Column expression to SELECT for the cursor: created_at rendered as stored text."""
+    return cast(created_col, String).label("created_key")
+
+
+def apply_keyset(query, created_col, id_col, cursor: Optional[str], limit: int):
+    """
+    Order by (created_at, id) descending, seek past the cursor and fetch one
+    extra row so the caller can tell whether another page exists.
+    """
+    if cursor:
+        c_key, c_id = decode_cursor(cursor)
+        # Compare as the DB stores it (SQLite keeps timestamps as text), keeping the index usable
+        query = query.filter(tuple_(type_coerce(created_col, String), id_col) < tuple_(c_key, c_id))
+    return query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], default: Iterable[str]) -> List[str]:
+    """Validate a comma-separated `fields=` projection against the allowed keys."""
+    allowed = list(allowed)
+    if not fields:
+        return list(default)
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+        )
+    return wanted
@@ -1,9 +1,119 @@
-from sqlalchemy import create_engine
+"""
+Database engine and sessions.
+
+DATABASE_URL selects the backend; the default is the local SQLite file.
+
+SQLite connections are tuned when they are opened: WAL lets readers run
+alongside the single writer, synchronous=NORMAL skips the per-commit fsync
+(safe under WAL), busy_timeout makes a writer wait for the lock instead of
+failing, and mmap_size / cache_size keep hot pages in memory.
+
+Other backends (PostgreSQL via psycopg2) get a QueuePool sized by
+DB_POOL_SIZE / DB_MAX_OVERFLOW, with pre-ping and periodic recycling so
+connections dropped by the server are replaced transparently.
+
+Async endpoints use get_async_db: an AsyncSession on the same database
+through its asyncio driver (aiosqlite, asyncpg), so queries are awaited
+instead of blocking the event loop. Sync helpers that take a Session run
+inside it via `await db.run_sync(fn, ...)`. Startup, CLIs and threadpool
+code keep using SessionLocal.
+"""
+import os
+
+import dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+dotenv.load_dotenv()
+
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./research_assistant.db")
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "65536")),  # negative: size in KiB
+    "temp_store": "MEMORY",
+}
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# asyncio driver per backend, for the AsyncSession engine
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./research_assistant.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL, tuned: bool = True, **kwargs) -> Engine:
+    """
+    Engine for `url` with the profile of its backend. tuned=False gives the
+    library defaults (used by the benchmark as a baseline).
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        connect_args = {"check_same_thread": False}
+        if tuned:
+            connect_args["timeout"] = SQLITE_BUSY_TIMEOUT_MS / 1000
+        engine = create_engine(url, connect_args=connect_args, **kwargs)
+        if tuned:
+            event.listen(engine, "connect", _apply_sqlite_pragmas)
+        return engine
+    if not tuned:
+        return create_engine(url, **kwargs)
+    return create_engine(url, **{**_pool_options(), **kwargs})
+
+
+def async_url(url: str) -> URL:
+    """`url` with the backend's asyncio driver, e.g. sqlite:///x.db -> sqlite+aiosqlite:///x.db."""
+    parsed = make_url(url)
+    if parsed.get_dialect().is_async:
+        return parsed
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_db_engine(url: str = SQLALCHEMY_DATABASE_URL, **kwargs) -> AsyncEngine:
+    """AsyncEngine for `url` with the same profile as create_db_engine."""
+    target = async_url(url)
+    if target.get_backend_name() == "sqlite":
+        options = {"connect_args": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+        if target.database and target.database != ":memory:":
+            # aiosqlite defaults to opening a connection (and thread) per checkout
+            options.update(poolclass=AsyncAdaptedQueuePool, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+        engine = create_async_engine(target, **{**options, **kwargs})
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        return engine
+    return create_async_engine(target, **{**_pool_options(), **kwargs})
+
+
+def _apply_sqlite_pragmas(dbapi_connection, _record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -14,3 +124,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async_engine = create_async_db_engine()
+# Rows stay loaded after commit: touching an expired attribute outside
+# run_sync would need a lazy load, which AsyncSession cannot do implicitly.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,172 @@
+"""
+Logging for the whole backend, configured in one place.
+
+Request handlers only put the record on an in-process queue; a single listener
+thread formats it and writes it to stderr (and LOG_FILE), so neither
+formatting nor disk I/O happens on the request path. Structured fields are
+passed with `extra=`; a `payload` field (dict, list, pydantic model or string)
+is snapshotted when the record is enqueued (containers copied, models
+dumped) so later changes by the request don't leak into the log, then
+serialized on the listener thread and cut to LOG_MAX_PAYLOAD chars.
+
+Environment:
+  LOG_LEVEL        root level (default INFO)
+  LOG_LEVELS       per-logger overrides, e.g. "services.orchestrator=DEBUG,httpx=WARNING"
+  LOG_SAMPLE_RATE  fraction of records below WARNING that are kept (default 1.0)
+  LOG_MAX_PAYLOAD  max characters of a payload (default 500)
+  LOG_FORMAT       text | json (default text)
+  LOG_FILE         also append records to this file
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+# Per-module defaults; LOG_LEVELS overrides them
+DEFAULT_LEVELS = {
+    "httpx": "WARNING",
+    "httpcore": "WARNING",
+    "sqlalchemy.engine": "WARNING",
+    "services.llm_gemini": "INFO",
+    "services.orchestrator": "INFO",
+}
+
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+_listener = None
+
+
+def _parse_levels(spec: str) -> dict:
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _json_default(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+def _render(value) -> str:
+    if isinstance(value, str):
+        return value
+    try:
+        return json.dumps(value, default=_json_default, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def truncate(text: str, limit: int) -> str:
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return f"{text[:limit]}...(+{len(text) - limit} chars)"
+
+
+class StructuredFormatter(logging.Formatter):
+    """One line per record, as `time level logger: message key=value ...` or as a JSON object."""
+
+    def __init__(self, fmt: str = "text", max_payload: int = 500):
+        super().__init__()
+        self.json = fmt == "json"
+        self.max_payload = max_payload
+
+    def _fields(self, record: logging.LogRecord) -> dict:
+        fields = {k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRS}
+        if "payload" in fields:
+            fields["payload"] = truncate(_render(fields["payload"]), self.max_payload)
+        return fields
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+        fields = self._fields(record)
+        exc = self.formatException(record.exc_info) if record.exc_info else None
+        if self.json:
+            entry = {"ts": ts, "level": record.levelname, "logger": record.name, "msg": record.getMessage()}
+            entry.update(fields)
+            if exc:
+                entry["exc"] = exc
+            return json.dumps(entry, default=_json_default, ensure_ascii=False)
+        line = f"{ts} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if exc:
+            line += "\n" + exc
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a `rate` fraction of records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.rate >= 1 or record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def snapshot(value):
+    """Copy of a payload as it is now: models dumped, dicts and lists copied, other values shared."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, dict):
+        return {k: snapshot(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [snapshot(v) for v in value]
+    return value
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues the record with its payload snapshotted. The stock handler formats
+    the message on the caller's thread so records can be pickled; the queue
+    here is in-process, so formatting is left to the listener. Only the payload
+    is copied here, since the request may mutate it before the listener runs.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if "payload" in record.__dict__:
+            record.payload = snapshot(record.payload)
+        return record
+
+
+def setup_logging():
+    """Install the queue handler on the root logger and start the listener. Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = StructuredFormatter(
+        os.getenv("LOG_FORMAT", "text").lower(),
+        int(os.getenv("LOG_MAX_PAYLOAD", "500")),
+    )
+    outputs = [logging.StreamHandler(sys.stderr)]
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        outputs.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for handler in outputs:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    handler = _QueueHandler(records)
+    handler.addFilter(SamplingFilter(float(os.getenv("LOG_SAMPLE_RATE", "1.0"))))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for name, level in {**DEFAULT_LEVELS, **_parse_levels(os.getenv("LOG_LEVELS", ""))}.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, *outputs)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -2,6 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+from .logging_config import setup_logging
+
+setup_logging()
+
 from .api.endpoints import (
     experiments,
     context_keywords,
@@ -10,14 +14,29 @@ from .api.endpoints import (
     discussion,
     feedback,
     file_upload,
+    search,
+    analytics,
 )
 from .api.endpoints import slides as slides_endpoints
-from .database import engine, Base
+from .api.responses import FastJSONResponse, ContentNegotiationMiddleware
+from .database import engine, Base, SessionLocal
+from . import schema
+from services import search as search_svc
+from services import graph_log
+from services import adjacency
+from services import topo_order
+from services import reachability
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+# Columns and indexes on existing tables (Alembic, migrations/versions)
+schema.upgrade(engine)
+# Full-text search tables + sync triggers (SQLite)
+search_svc.install(engine)
+# Baseline graph snapshot that history starts from
+graph_log.install(engine)
 
-app = FastAPI(title="Research Lab API")
+app = FastAPI(title="Research Lab API", default_response_class=FastJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -26,7 +45,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor", "ETag", "X-Graph-Version"],  # Pagination cursor, graph version
 )
+# Accept: application/msgpack -> MessagePack bodies (see api/responses.py)
+app.add_middleware(ContentNegotiationMiddleware)
 
 # Include routers
 app.include_router(experiments.router, tags=["experiments"])
@@ -36,6 +58,8 @@ app.include_router(notes.router, tags=["notes"])
 app.include_router(discussion.router, tags=["discussion"])
 app.include_router(feedback.router, tags=["feedback"])
 app.include_router(slides_endpoints.router, tags=["slides"])
+app.include_router(search.router, tags=["search"])
+app.include_router(analytics.router, tags=["analytics"])
 app.include_router(file_upload.router, prefix="/files", tags=["files"])
 
 BASE_DIR = Path(__file__).resolve().parents[1]       
@@ -43,6 +67,17 @@ GENERATED_DIR = BASE_DIR / "generated"
 GENERATED_DIR.mkdir(exist_ok=True)
 app.mount("/download", StaticFiles(directory=GENERATED_DIR), name="download")
 
+@app.on_event("startup")
+def load_graph_indexes():
+    """Build the in-memory graph adjacency, topological order and reachability before serving requests."""
+    db = SessionLocal()
+    try:
+        adjacency.index.load(db)
+        topo_order.index.load(db)
+        reachability.index.load(db)
+    finally:
+        db.close()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Research Assistant"}
\ No newline at end of file
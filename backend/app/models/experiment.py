@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Enum, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Enum, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 from .base import TimestampMixin
@@ -162,6 +162,11 @@ class ExperimentRelationship(Base, TimestampMixin):
     Each relationship has a type that describes how experiments are connected.
     """
     __tablename__ = "experiment_relationships"
+    __table_args__ = (
+        # Children / duplicate-edge checks go from the source, parents from the target
+        Index("ix_relationships_from_to", "from_experiment_id", "to_experiment_id"),
+        Index("ix_relationships_to_from", "to_experiment_id", "from_experiment_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, LargeBinary, func
+from ..database import Base
+
+class GraphChange(Base):
+    """
+    Append-only log of node/edge mutations.
+    The autoincrement id doubles as the graph version: every write to the
+    graph adds rows here in the same transaction, so max(version) changes
+    exactly when the graph does. Deletes are kept as tombstones; upserts carry
+    the entity's fields after the change in `data`, so the log can be replayed.
+    """
+    __tablename__ = "graph_changes"
+    __table_args__ = {"sqlite_autoincrement": True}  # never reuse versions
+
+    version = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(8), nullable=False)        # "node" | "edge"
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(8), nullable=False)            # "upsert" | "delete"
+    data = Column(JSON, nullable=True)                # state after an upsert
+
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+class GraphSnapshot(Base):
+    """
+    Compacted state of the whole graph as of a version: every node and edge
+    with its fields, as zlib-compressed JSON. Historical reads start from the
+    nearest snapshot and replay only the changes after it.
+    """
+    __tablename__ = "graph_snapshots"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)  # graph version it reflects
+    node_count = Column(Integer, nullable=False)
+    edge_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    taken_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Float, DateTime, LargeBinary, Index, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import JSON
 from ..database import Base
@@ -9,6 +9,16 @@ class Literature(Base):
     Rich fields are kept to cache verification and display info.
     """
     __tablename__ = "literature"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), globally and per node / relationship
+        Index("ix_literature_created_id", "created_at", "id"),
+        Index("ix_literature_experiment_created_id", "experiment_id", "created_at", "id"),
+        Index("ix_literature_rel_created_id", "rel_type", "created_at", "id"),
+        # Cached suggestion lookup: latest row for a node and relationship
+        Index("ix_literature_experiment_rel_created", "experiment_id", "rel_type", "created_at"),
+        # One row per paper per node (see services/literature_store.canonical_key)
+        Index("uq_literature_experiment_canonical", "experiment_id", "canonical_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     experiment_id = Column(Integer, ForeignKey('experiments.id', ondelete='CASCADE'), nullable=False)
@@ -17,6 +27,7 @@ class Literature(Base):
     openalex_id = Column(String, nullable=True, index=True)     # e.g. "W123456789"
     doi         = Column(String, nullable=True, index=True)     # e.g. "10.1145/xxxx"
     link        = Column(String, nullable=False)                # canonical URL (OpenAlex/DOI/arXiv)
+    canonical_key = Column(String, nullable=True)               # "W123..." | "doi:10.1145/xxxx" | normalized URL
 
     # Display fields (optional but useful for UI without extra calls)
     title = Column(String, nullable=True)
@@ -31,7 +42,57 @@ class Literature(Base):
     evidence   = Column(JSON, nullable=True)                    # store verify evidence, prompt_version, etc.
     why        = Column(String, nullable=True)                  # short reason why relevant
 
+    # Enrichment cache (filled from OpenAlex + LLM; refreshed when stale)
+    summary     = Column(Text, nullable=True)                   # one-liner summary of the abstract
+    enriched_at = Column(DateTime(timezone=True), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationship to the experiment
     experiment = relationship("Experiment", back_populates="literature")
+
+
+class StanceVerdict(Base):
+    """
+    Cached LLM stance of a candidate abstract vs a seed (node or base) abstract.
+    Keyed by the content hashes of both texts, so a verdict is reused whenever
+    the same pair of abstracts comes up again.
+    """
+    __tablename__ = "stance_verdicts"
+    __table_args__ = (UniqueConstraint("seed_hash", "cand_hash", name="uq_stance_pair"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    seed_hash = Column(String(64), nullable=False)
+    cand_hash = Column(String(64), nullable=False)
+    verdict = Column(String, nullable=False)                    # "support" | "neutral" | "contradict"
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class AbstractBlob(Base):
+    """
+    Content-addressed, compressed abstract text.
+    The primary key is the hash of the normalized abstract, so identical
+    abstracts (e.g. a preprint and its published version) are stored once.
+    """
+    __tablename__ = "abstract_blobs"
+
+    hash = Column(String(64), primary_key=True)
+    codec = Column(String(8), nullable=False)                   # "zstd" | "zlib"
+    data = Column(LargeBinary, nullable=False)
+    length = Column(Integer, nullable=False)                    # uncompressed size in chars
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class WorkAbstract(Base):
+    """
+    Maps a resolved OpenAlex work to its stored abstract.
+    """
+    __tablename__ = "work_abstracts"
+
+    openalex_id = Column(String, primary_key=True)              # e.g. "W123456789"
+    doi = Column(String, nullable=True, index=True)             # e.g. "10.1145/xxxx"
+    abstract_hash = Column(String(64), ForeignKey('abstract_blobs.hash'), nullable=False)
+
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
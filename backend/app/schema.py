@@ -0,0 +1,22 @@
+"""
+Schema upgrades applied at startup.
+
+Base.metadata.create_all creates missing tables but never changes existing
+ones, so new columns and indexes on older databases come from the Alembic
+migrations in migrations/versions. upgrade() runs them to head on the app's
+engine; each revision skips what create_all already made on a fresh database.
+"""
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.engine import Engine
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def upgrade(engine: Engine, revision: str = "head") -> None:
+    config = Config(str(ALEMBIC_INI))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
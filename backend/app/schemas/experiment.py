@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
 
@@ -64,6 +64,35 @@ class ExperimentRelationship(ExperimentRelationshipBase):
     class Config:
         from_attributes = True
 
+class BatchNode(ExperimentCreate):
+    """
+    A node to create in a batch; temp_id lets edges of the same batch refer to it
+    """
+    temp_id: Optional[str] = None
+
+class BatchEdge(ExperimentRelationshipBase):
+    """
+    An edge to create in a batch; endpoints are existing node ids (int) or temp_ids (str)
+    """
+    from_experiment_id: Union[int, str]
+    to_experiment_id: Union[int, str]
+
+class GraphBatch(BaseModel):
+    """
+    Schema for creating nodes and edges in one transaction
+    """
+    nodes: List[BatchNode] = []
+    edges: List[BatchEdge] = []
+
+class GraphBatchResult(BaseModel):
+    """
+    Schema for the outcome of a batch: created rows and temp_id -> id mapping
+    """
+    version: int
+    id_map: Dict[str, int]
+    nodes: List[Experiment]
+    edges: List[ExperimentRelationship]
+
 class GraphOverview(BaseModel):
     """
     Schema for returning a graph overview
@@ -71,6 +100,47 @@ class GraphOverview(BaseModel):
     nodes: List[Dict[str, Any]]
     edges: List[Dict[str, Any]]
 
+class GraphChanges(BaseModel):
+    """
+    Schema for the nodes and edges changed since a graph version
+    """
+    since: int
+    version: int
+    nodes: List[Dict[str, Any]]
+    edges: List[Dict[str, Any]]
+    deleted_nodes: List[int]
+    deleted_edges: List[int]
+
+class GraphLayout(BaseModel):
+    """
+    Schema for a computed graph layout: node boxes and edge polylines
+    """
+    version: int
+    direction: str
+    width: float
+    height: float
+    crossings: int
+    nodes: List[Dict[str, Any]]
+    edges: List[Dict[str, Any]]
+
+class GraphOrder(BaseModel):
+    """
+    Schema for the topological order of the graph and each node's level
+    """
+    version: int
+    nodes: List[Dict[str, int]]
+    cyclic_edges: List[int]
+
+class Subgraph(BaseModel):
+    """
+    Schema for the neighbourhood of a node, up to a number of hops
+    """
+    root_id: int
+    depth: int
+    direction: str
+    nodes: List[Dict[str, Any]]
+    edges: List[Dict[str, Any]]
+
 class RelatedNode(BaseModel):
     """
     Schema for a node summary with its relationship to another node
@@ -87,4 +157,31 @@ class NodeInfo(BaseModel):
     """
     node: Experiment
     parents: List[RelatedNode] = []
-    children: List[RelatedNode] = []
\ No newline at end of file
+    children: List[RelatedNode] = []
+
+class NodeInfoBatch(BaseModel):
+    """
+    Schema for node information of several nodes, keyed by node id
+    """
+    nodes: Dict[int, NodeInfo]
+    missing: List[int] = []
+
+class EdgeSuggestion(BaseModel):
+    """
+    Schema for a candidate neighbour suggested by the similarity index
+    """
+    id: int
+    title: str
+    score: float
+    text_similarity: float
+    literature_overlap: float
+    precedence: float  # 1.0: the suggested parent clearly comes before the child; 0.5: no signal
+    relationship_type: RelationshipType
+
+class EdgeSuggestions(BaseModel):
+    """
+    Schema for returning candidate parents and children of a node
+    """
+    node_id: int
+    parents: Optional[List[EdgeSuggestion]] = None
+    children: Optional[List[EdgeSuggestion]] = None
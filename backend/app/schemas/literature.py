@@ -1,8 +1,9 @@
 # backend/schemas/literature.py
 from pydantic import BaseModel, AnyHttpUrl
-from typing import Optional, Literal, Dict, Any, List
+from typing import Optional, Literal, Dict, Any, List, get_args
 
 Rel = Literal["similar", "builds_on", "prior", "contrast"]
+REL_TYPES = get_args(Rel)
 
 class LiteratureCreate(BaseModel):
     # client can send any identifiers; backend will canonicalize
@@ -0,0 +1,68 @@
+# backend/migrations/env.py
+"""
+Alembic environment.
+
+Runs against the app's engine (DATABASE_URL), or against the connection
+handed over in config.attributes["connection"] when migrations are applied
+at startup by app.schema.upgrade(). Autogenerate compares with the models'
+metadata. SQLite uses batch mode, since it cannot ALTER most constraints
+in place.
+"""
+import os
+import sys
+
+from alembic import context
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.database import Base, create_db_engine, SQLALCHEMY_DATABASE_URL
+from app.logging_config import setup_logging
+from app.models import experiment, literature, graph_change, context_keywords  # noqa: F401  (register tables)
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def _include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Leave out the FTS5 tables (and their shadow tables) that services/search.py manages."""
+    return not (type_ == "table" and reflected and compare_to is None and "_fts" in name)
+
+
+def _configure(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=_include_object,
+        render_as_batch=connection.dialect.name == "sqlite",
+        compare_type=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection)
+        return
+    setup_logging()
+    engine = create_db_engine()
+    with engine.connect() as connection:
+        _configure(connection)
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,27 @@
+"""baseline: schema as created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 10:00:00
+
+Databases created before migrations existed were built by create_all at
+startup with the first release's tables (experiments, experiment_relationships,
+literature, context_keywords). This revision marks that starting point;
+later revisions add the tables, columns and indexes introduced since.
+"""
+from typing import Sequence, Union
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,46 @@
+"""graph history: graph_changes.data, changed_at index, graph_snapshots
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:05:00
+
+Replayable graph log (services/graph_log.py). Skips whatever create_all
+already made on a fresh database.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    if "graph_changes" in tables:
+        if "data" not in {c["name"] for c in inspector.get_columns("graph_changes")}:
+            op.add_column("graph_changes", sa.Column("data", sa.JSON(), nullable=True))
+        if "ix_graph_changes_changed_at" not in {i["name"] for i in inspector.get_indexes("graph_changes")}:
+            op.create_index("ix_graph_changes_changed_at", "graph_changes", ["changed_at"])
+    if "graph_snapshots" not in tables:
+        op.create_table(
+            "graph_snapshots",
+            sa.Column("version", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("node_count", sa.Integer(), nullable=False),
+            sa.Column("edge_count", sa.Integer(), nullable=False),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+            sa.Column("taken_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("graph_snapshots")
+    op.drop_index("ix_graph_changes_changed_at", table_name="graph_changes")
+    with op.batch_alter_table("graph_changes") as batch:
+        batch.drop_column("data")
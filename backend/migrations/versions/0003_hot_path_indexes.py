@@ -0,0 +1,40 @@
+"""hot-path indexes on experiment_relationships and literature
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 10:10:00
+
+Parent/child lookups, duplicate-edge checks and branch deletes filter edges
+by one endpoint (and often the other); the cached suggestion lookup filters
+literature by node and relationship and takes the newest row.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_relationships_from_to", "experiment_relationships", ["from_experiment_id", "to_experiment_id"]),
+    ("ix_relationships_to_from", "experiment_relationships", ["to_experiment_id", "from_experiment_id"]),
+    ("ix_literature_experiment_rel_created", "literature", ["experiment_id", "rel_type", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in INDEXES:
+        if table in tables and name not in {i["name"] for i in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
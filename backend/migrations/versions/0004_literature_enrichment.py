@@ -0,0 +1,42 @@
+"""literature enrichment cache: summary, enriched_at
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 10:15:00
+
+Display fields served straight from the row (services/enrichment.py).
+Rows from before this revision have no enriched_at and are refreshed on
+first read. Skips whatever create_all already made on a fresh database.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = {
+    "summary": sa.Text,
+    "enriched_at": lambda: sa.DateTime(timezone=True),
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "literature" not in inspector.get_table_names():
+        return
+    existing = {c["name"] for c in inspector.get_columns("literature")}
+    for name, type_ in COLUMNS.items():
+        if name not in existing:
+            op.add_column("literature", sa.Column(name, type_(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("literature") as batch:
+        for name in reversed(list(COLUMNS)):
+            batch.drop_column(name)
@@ -0,0 +1,82 @@
+"""literature.canonical_key with a unique (experiment_id, canonical_key) index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 10:20:00
+
+Keys existing rows with services.literature_store.canonical_key, the same
+normalizer the inserts use. Rows that turn out to be the same paper on the
+same node are collapsed onto the oldest one: its empty fields are filled
+from the newer copies, which are then deleted. Only then is the unique
+index created, so ON CONFLICT sees every stored paper.
+"""
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from services import literature_store
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "uq_literature_experiment_canonical"
+
+# Filled on the surviving row from its duplicates when it has no value of its own
+MERGED_COLUMNS = ["openalex_id", "doi", "title", "venue", "year", "confidence", "evidence", "why", "summary", "enriched_at"]
+
+
+def _doi_to_wid(bind, inspector) -> Dict[str, str]:
+    if "work_abstracts" not in inspector.get_table_names():
+        return {}
+    rows = bind.execute(sa.text("SELECT doi, openalex_id FROM work_abstracts WHERE doi IS NOT NULL"))
+    return {doi: wid for doi, wid in rows}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "literature" not in inspector.get_table_names():
+        return
+    columns = {c["name"] for c in inspector.get_columns("literature")}
+    if "canonical_key" not in columns:
+        op.add_column("literature", sa.Column("canonical_key", sa.String(), nullable=True))
+    if INDEX in {i["name"] for i in inspector.get_indexes("literature")} | {
+        u["name"] for u in inspector.get_unique_constraints("literature")
+    }:
+        return
+
+    merged = [c for c in MERGED_COLUMNS if c in columns]
+    literature = sa.table(
+        "literature",
+        sa.column("id"), sa.column("experiment_id"), sa.column("link"), sa.column("canonical_key"),
+        sa.column("created_at"), *(sa.column(c) for c in merged),
+    )
+    doi_to_wid = _doi_to_wid(bind, inspector)
+    rows = bind.execute(sa.select(literature).order_by(literature.c.created_at, literature.c.id)).mappings().all()
+
+    groups: Dict[Tuple[int, str], List[Any]] = {}
+    for row in rows:
+        key = literature_store.canonical_key(row["openalex_id"], row["doi"], row["link"], doi_to_wid)
+        groups.setdefault((row["experiment_id"], key), []).append(row)
+
+    for (_, key), (keep, *duplicates) in groups.items():
+        values: Dict[str, Any] = {"canonical_key": key}
+        for column in merged:
+            if keep[column] is None:
+                values[column] = next((d[column] for d in duplicates if d[column] is not None), None)
+        bind.execute(literature.update().where(literature.c.id == keep["id"]).values(**values))
+        if duplicates:
+            bind.execute(literature.delete().where(literature.c.id.in_([d["id"] for d in duplicates])))
+
+    op.create_index(INDEX, "literature", ["experiment_id", "canonical_key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX, table_name="literature")
+    with op.batch_alter_table("literature") as batch:
+        batch.drop_column("canonical_key")
@@ -0,0 +1,96 @@
+"""tables added since the baseline, literature keyset indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 10:25:00
+
+At startup create_all makes new tables before the migrations run, but
+`alembic upgrade head` on its own should also bring a baseline database to
+the current schema. This creates the graph log, stance cache and abstract
+store tables when they are missing, and the (created_at, id) indexes the
+literature lists page on.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LITERATURE_INDEXES = [
+    ("ix_literature_created_id", ["created_at", "id"]),
+    ("ix_literature_experiment_created_id", ["experiment_id", "created_at", "id"]),
+    ("ix_literature_rel_created_id", ["rel_type", "created_at", "id"]),
+]
+
+
+def _create_tables(tables: set) -> None:
+    if "graph_changes" not in tables:
+        op.create_table(
+            "graph_changes",
+            sa.Column("version", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("entity", sa.String(8), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=False),
+            sa.Column("op", sa.String(8), nullable=False),
+            sa.Column("data", sa.JSON(), nullable=True),
+            sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sqlite_autoincrement=True,
+        )
+        op.create_index("ix_graph_changes_changed_at", "graph_changes", ["changed_at"])
+    if "stance_verdicts" not in tables:
+        op.create_table(
+            "stance_verdicts",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("seed_hash", sa.String(64), nullable=False),
+            sa.Column("cand_hash", sa.String(64), nullable=False),
+            sa.Column("verdict", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.UniqueConstraint("seed_hash", "cand_hash", name="uq_stance_pair"),
+        )
+        op.create_index("ix_stance_verdicts_id", "stance_verdicts", ["id"])
+    if "abstract_blobs" not in tables:
+        op.create_table(
+            "abstract_blobs",
+            sa.Column("hash", sa.String(64), primary_key=True),
+            sa.Column("codec", sa.String(8), nullable=False),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+            sa.Column("length", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+    if "work_abstracts" not in tables:
+        op.create_table(
+            "work_abstracts",
+            sa.Column("openalex_id", sa.String(), primary_key=True),
+            sa.Column("doi", sa.String(), nullable=True),
+            sa.Column("abstract_hash", sa.String(64), sa.ForeignKey("abstract_blobs.hash"), nullable=False),
+            sa.Column("fetched_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index("ix_work_abstracts_doi", "work_abstracts", ["doi"])
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    _create_tables(tables)
+    if "literature" in tables:
+        existing = {i["name"] for i in inspector.get_indexes("literature")}
+        for name, columns in LITERATURE_INDEXES:
+            if name not in existing:
+                op.create_index(name, "literature", columns)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(LITERATURE_INDEXES):
+        op.drop_index(name, table_name="literature")
+    op.drop_index("ix_work_abstracts_doi", table_name="work_abstracts")
+    op.drop_table("work_abstracts")
+    op.drop_table("abstract_blobs")
+    op.drop_index("ix_stance_verdicts_id", table_name="stance_verdicts")
+    op.drop_table("stance_verdicts")
+    op.drop_index("ix_graph_changes_changed_at", table_name="graph_changes")
+    op.drop_table("graph_changes")
@@ -0,0 +1,127 @@
+# backend/services/abstracts.py
+"""
+Local, compressed abstract store for resolved OpenAlex works.
+
+Abstracts are rebuilt from OpenAlex's inverted index once, compressed (zstd
+when the optional `zstandard` package is installed, zlib otherwise) and stored
+content-addressed in the DB. Enrichment and the cached suggestion path read
+them from here and only fall back to OpenAlex (then remember()) on a miss.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from . import openalex
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.literature import AbstractBlob, WorkAbstract
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    _ZSTD_C = zstandard.ZstdCompressor(level=10)
+    _ZSTD_D = zstandard.ZstdDecompressor()
+except ImportError:
+    zstandard = None
+
+
+def abstract_hash(text: str) -> str:
+    """Content hash of an abstract, insensitive to whitespace differences."""
+    norm = " ".join((text or "").split())
+    return hashlib.sha256(norm.encode("utf-8")).hexdigest()
+
+
+def work_key(work_id_or_url: Optional[str]) -> Optional[str]:
+    """'https://openalex.org/W123' -> 'W123'."""
+    m = re.search(r"(W\d+)$", (work_id_or_url or "").strip().rstrip("/"))
+    return m.group(1) if m else None
+
+
+def _compress(text: str) -> tuple[str, bytes]:
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", _ZSTD_C.compress(raw)
+    return "zlib", zlib.compress(raw, 9)
+
+
+def _decompress(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("abstract stored with zstd but the zstandard package is not installed")
+        return _ZSTD_D.decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def remember(db: Session, works: Iterable[Dict[str, Any]]) -> int:
+    """
+    Store the abstracts of normalized OpenAlex works (see openalex._norm_work).
+    Existing blobs are reused by hash; works without an abstract are skipped.
+    Writes in a savepoint and flushes; committing is left to the caller. A
+    failed write only rolls back the savepoint. Returns the number of works written.
+    """
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for w in works:
+        wid = work_key((w or {}).get("id"))
+        if wid and (w.get("abstract") or "").strip():
+            by_id[wid] = w
+    if db is None or not by_id:
+        return 0
+    try:
+        with db.begin_nested():
+            _store(db, by_id)
+    except Exception as e:
+        logger.error("failed to store %d abstracts: %s", len(by_id), e)
+        return 0
+    return len(by_id)
+
+
+def _store(db: Session, by_id: Dict[str, Dict[str, Any]]) -> None:
+    hashes = {wid: abstract_hash(w["abstract"]) for wid, w in by_id.items()}
+    have_blobs = {
+        h for (h,) in db.query(AbstractBlob.hash).filter(AbstractBlob.hash.in_(set(hashes.values()))).all()
+    }
+    mapped = {
+        r.openalex_id: r for r in db.query(WorkAbstract).filter(WorkAbstract.openalex_id.in_(list(by_id))).all()
+    }
+
+    for wid, w in by_id.items():
+        h = hashes[wid]
+        if h not in have_blobs:
+            codec, data = _compress(w["abstract"])
+            db.add(AbstractBlob(hash=h, codec=codec, data=data, length=len(w["abstract"])))
+            have_blobs.add(h)
+        doi = openalex.normalize_doi(w.get("doi"))
+        row = mapped.get(wid)
+        if row is None:
+            db.add(WorkAbstract(openalex_id=wid, doi=doi, abstract_hash=h))
+        else:
+            row.abstract_hash = h
+            row.doi = doi or row.doi
+    db.flush()
+
+
+def get_many(db: Session, work_ids: Iterable[str]) -> Dict[str, str]:
+    """Return {W-id: abstract} for the works found in the store (one query)."""
+    keys = {work_key(w) for w in work_ids if w}
+    keys.discard(None)
+    if db is None or not keys:
+        return {}
+    rows = (
+        db.query(WorkAbstract.openalex_id, AbstractBlob.codec, AbstractBlob.data)
+        .join(AbstractBlob, AbstractBlob.hash == WorkAbstract.abstract_hash)
+        .filter(WorkAbstract.openalex_id.in_(keys))
+        .all()
+    )
+    return {wid: _decompress(codec, data) for wid, codec, data in rows}
+
+
+def get(db: Session, work_id: str) -> Optional[str]:
+    return get_many(db, [work_id]).get(work_key(work_id))
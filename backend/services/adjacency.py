@@ -0,0 +1,184 @@
+# backend/services/adjacency.py
+"""
+In-process adjacency index over experiment relationships.
+
+Edges are kept in CSR form: for each node, a contiguous slice of out-edges
+(targets, edge ids, relationship types) and a mirror slice of in-edges. The
+edge table is loaded once at startup. Edge writes do not touch the arrays:
+they go to per-node delta maps (added edges, plus the ids of CSR edges that
+were removed or changed), and reads merge a node's CSR slice with its delta.
+Once the delta grows past COMPACT_MIN edges or COMPACT_RATIO of the edge
+count, the next read folds it in with one full rebuild (an argsort over all
+edges), so that O(E) cost is paid once per many writes, not per request.
+Parents and children are then array slices instead of per-node queries.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.experiment import ExperimentRelationship, RelationshipType
+
+REL_TYPES: List[RelationshipType] = list(RelationshipType)
+_REL_CODE = {t: i for i, t in enumerate(REL_TYPES)}
+
+# (edge id, neighbour node id, relationship type)
+Neighbour = Tuple[int, int, RelationshipType]
+
+# Pending edge writes that trigger a rebuild on the next read
+COMPACT_MIN = 256
+COMPACT_RATIO = 0.1
+
+
+class _CSR:
+    """One direction of the adjacency: row slices of (neighbour, edge id, type code)."""
+
+    def __init__(self, n: int, src: np.ndarray, dst: np.ndarray, eid: np.ndarray, rel: np.ndarray):
+        order = np.argsort(src, kind="stable")
+        self.ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.ptr[1:])
+        self.nbr = dst[order]
+        self.eid = eid[order]
+        self.rel = rel[order]
+
+    def row(self, r: int) -> slice:
+        return slice(self.ptr[r], self.ptr[r + 1])
+
+
+class AdjacencyIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._edges: Dict[int, Tuple[int, int, int]] = {}   # edge id -> (from, to, type code)
+        self._dirty = True
+        self._ids = np.empty(0, dtype=np.int64)             # row -> node id
+        self._row: Dict[int, int] = {}                      # node id -> row
+        self._out: Optional[_CSR] = None
+        self._in: Optional[_CSR] = None
+        # Writes since the last build
+        self._built: Set[int] = set()                       # edge ids in the CSR arrays
+        self._stale: Set[int] = set()                       # CSR edges removed or changed since
+        self._add_out: Dict[int, Dict[int, Tuple[int, int]]] = {}  # node -> {edge id: (child, code)}
+        self._add_in: Dict[int, Dict[int, Tuple[int, int]]] = {}   # node -> {edge id: (parent, code)}
+        self._pending = 0
+
+    # ----------------- building / incremental updates -----------------
+    def load(self, db: Session):
+        with self._lock:
+            self._edges = {
+                eid: (src, dst, _REL_CODE[rel])
+                for eid, src, dst, rel in db.query(
+                    ExperimentRelationship.id,
+                    ExperimentRelationship.from_experiment_id,
+                    ExperimentRelationship.to_experiment_id,
+                    ExperimentRelationship.relationship_type,
+                ).all()
+            }
+            self._dirty = True
+            self._loaded = True
+
+    def ensure_loaded(self, db: Session):
+        if not self._loaded:
+            self.load(db)
+
+    def _drop(self, edge_id: int):
+        """Take an edge out of the delta and hide its CSR entry, if it has one."""
+        old = self._edges.pop(edge_id, None)
+        if old is None:
+            return
+        src, dst, _ = old
+        self._add_out.get(src, {}).pop(edge_id, None)
+        self._add_in.get(dst, {}).pop(edge_id, None)
+        if edge_id in self._built:
+            self._stale.add(edge_id)
+        self._pending += 1
+
+    def upsert_edge(self, edge_id: int, from_id: int, to_id: int, rel_type: RelationshipType):
+        if not self._loaded:
+            return
+        code = _REL_CODE[RelationshipType(rel_type)]
+        with self._lock:
+            self._drop(edge_id)
+            self._edges[edge_id] = (from_id, to_id, code)
+            self._add_out.setdefault(from_id, {})[edge_id] = (to_id, code)
+            self._add_in.setdefault(to_id, {})[edge_id] = (from_id, code)
+            self._pending += 1
+
+    def remove_edges(self, edge_ids: Iterable[int]):
+        if not self._loaded:
+            return
+        with self._lock:
+            for eid in edge_ids:
+                self._drop(eid)
+
+    def remove_nodes(self, node_ids: Iterable[int]):
+        """Drop every edge touching the given nodes."""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._build()
+            for node_id in set(node_ids):
+                for eid, _, _ in self._merged(node_id, True) + self._merged(node_id, False):
+                    self._drop(eid)
+
+    def _build(self):
+        if not self._dirty and self._pending <= max(COMPACT_MIN, COMPACT_RATIO * len(self._edges)):
+            return
+        if self._edges:
+            eids = np.fromiter(self._edges.keys(), dtype=np.int64, count=len(self._edges))
+            triples = np.array(list(self._edges.values()), dtype=np.int64)
+            src_ids, dst_ids, rel = triples[:, 0], triples[:, 1], triples[:, 2].astype(np.int8)
+        else:
+            eids = src_ids = dst_ids = np.empty(0, dtype=np.int64)
+            rel = np.empty(0, dtype=np.int8)
+        self._ids = np.unique(np.concatenate([src_ids, dst_ids]))
+        self._row = {int(i): r for r, i in enumerate(self._ids)}
+        src = np.searchsorted(self._ids, src_ids)
+        dst = np.searchsorted(self._ids, dst_ids)
+        n = len(self._ids)
+        self._out = _CSR(n, src, dst, eids, rel)
+        self._in = _CSR(n, dst, src, eids, rel)
+        self._built = set(self._edges)
+        self._stale.clear()
+        self._add_out.clear()
+        self._add_in.clear()
+        self._pending = 0
+        self._dirty = False
+
+    def _merged(self, node_id: int, outgoing: bool) -> List[Neighbour]:
+        """A node's CSR slice minus stale edges, plus its delta. Caller holds the lock."""
+        out: List[Neighbour] = []
+        r = self._row.get(node_id)
+        csr = self._out if outgoing else self._in
+        if r is not None and csr is not None:
+            s = csr.row(r)
+            out = [
+                (int(e), int(self._ids[v]), REL_TYPES[c])
+                for e, v, c in zip(csr.eid[s], csr.nbr[s], csr.rel[s])
+                if int(e) not in self._stale
+            ]
+        added = (self._add_out if outgoing else self._add_in).get(node_id, {})
+        out.extend((eid, other, REL_TYPES[c]) for eid, (other, c) in added.items())
+        return out
+
+    # ----------------- queries -----------------
+    def _neighbours(self, node_id: int, outgoing: bool) -> List[Neighbour]:
+        with self._lock:
+            self._build()
+            return self._merged(node_id, outgoing)
+
+    def children(self, node_id: int) -> List[Neighbour]:
+        return self._neighbours(node_id, outgoing=True)
+
+    def parents(self, node_id: int) -> List[Neighbour]:
+        return self._neighbours(node_id, outgoing=False)
+
+
+index = AdjacencyIndex()
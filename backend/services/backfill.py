@@ -0,0 +1,237 @@
+# backend/services/backfill.py
+"""
+Backfill display fields for stored Literature rows.
+
+Rows added by link only (title/venue/year empty, or no stored abstract) are
+resolved against OpenAlex in batched filter requests (50 ids per call), run
+concurrently under a semaphore and a requests-per-second limit. Resolved rows
+also get their one-liner summary and enriched_at, so reads serve them from the
+DB without another refresh. Each chunk of rows is written back in its own
+transaction and the last processed id is saved to a state file, so an
+interrupted run picks up where it stopped.
+
+CLI (from backend/):
+    python -m services.backfill [--chunk 200] [--concurrency 4] [--rps 8] [--restart]
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from . import openalex, abstracts, literature_store, llm_gemini as llm
+from .enrichment import ENRICH_CONCURRENCY, doi_from_row
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.literature import Literature, WorkAbstract
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNK = int(os.getenv("BACKFILL_CHUNK", "200"))
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", "4"))
+OPENALEX_RPS = float(os.getenv("OPENALEX_RPS", "8"))
+STATE_FILE = os.getenv("BACKFILL_STATE_FILE", ".literature_backfill.json")
+MAX_RETRIES = 3
+
+
+class _RateLimiter:
+    """Spaces request starts at least 1/rps seconds apart across all tasks."""
+
+    def __init__(self, rps: float):
+        self._interval = 1.0 / rps if rps > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def load_state(path: str = STATE_FILE) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return {"last_id": 0, "updated": 0}
+
+
+def save_state(state: Dict[str, Any], path: str = STATE_FILE) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+    os.replace(tmp, path)
+
+
+def pending_rows(db: Session, after_id: int, limit: int) -> List[Literature]:
+    """Next rows (by id) missing a display field or a stored abstract, or never enriched."""
+    return (
+        db.query(Literature)
+        .outerjoin(WorkAbstract, WorkAbstract.openalex_id == Literature.openalex_id)
+        .filter(
+            Literature.id > after_id,
+            or_(
+                Literature.title.is_(None),
+                Literature.venue.is_(None),
+                Literature.year.is_(None),
+                Literature.enriched_at.is_(None),
+                WorkAbstract.openalex_id.is_(None),
+            ),
+        )
+        .order_by(Literature.id)
+        .limit(limit)
+        .all()
+    )
+
+
+async def _fetch_batches(fetch, keys: List[str], sem: asyncio.Semaphore, limiter: _RateLimiter) -> Dict[str, Dict[str, Any]]:
+    """Run fetch() over FILTER_BATCH-sized slices of keys concurrently; merge the results."""
+
+    async def _one(batch: List[str]) -> Dict[str, Dict[str, Any]]:
+        async with sem:
+            for attempt in range(MAX_RETRIES + 1):
+                await limiter.wait()
+                try:
+                    return await fetch(batch)
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code != 429 or attempt == MAX_RETRIES:
+                        logger.warning("batch of %d failed: %s", len(batch), e)
+                        return {}
+                    await asyncio.sleep(2 ** attempt)
+                except Exception as e:
+                    logger.warning("batch of %d failed: %s", len(batch), e)
+                    return {}
+        return {}
+
+    step = openalex.FILTER_BATCH
+    results = await asyncio.gather(*(_one(keys[i:i + step]) for i in range(0, len(keys), step)))
+    merged: Dict[str, Dict[str, Any]] = {}
+    for r in results:
+        merged.update(r)
+    return merged
+
+
+async def _summaries(abstract_texts: List[Optional[str]]) -> List[Optional[str]]:
+    """One-liner per abstract (None where there is none or the LLM call fails), ENRICH_CONCURRENCY at a time."""
+    sem = asyncio.Semaphore(ENRICH_CONCURRENCY)
+
+    async def _one(text: Optional[str]) -> Optional[str]:
+        if not text:
+            return None
+        async with sem:
+            try:
+                return await llm.summarize_one_liner_cn(text)
+            except Exception as e:
+                logger.warning("summary failed: %s", e)
+                return None
+
+    return list(await asyncio.gather(*(_one(t) for t in abstract_texts)))
+
+
+async def backfill_chunk(db: Session, rows: List[Literature], sem: asyncio.Semaphore, limiter: _RateLimiter) -> int:
+    """Resolve one chunk of rows and write the fields back in one commit. Returns rows updated."""
+    keyed = [(row, abstracts.work_key(row.openalex_id or row.link), doi_from_row(row)) for row in rows]
+    wids = sorted({wid for _, wid, _ in keyed if wid})
+    dois = sorted({openalex.normalize_doi(doi) for _, wid, doi in keyed if not wid and doi})
+
+    by_id, by_doi = await asyncio.gather(
+        _fetch_batches(openalex.get_works_by_ids, wids, sem, limiter),
+        _fetch_batches(openalex.get_works_by_dois, dois, sem, limiter),
+    )
+
+    resolved = []
+    for row, wid, doi in keyed:
+        w = by_id.get(wid) if wid else by_doi.get(openalex.normalize_doi(doi))
+        if w:
+            resolved.append((row, w))
+    summaries = await _summaries([w.get("abstract") if not row.summary else None for row, w in resolved])
+
+    now = datetime.now(timezone.utc)
+    works = []
+    updated = 0
+    for (row, w), summary in zip(resolved, summaries):
+        works.append(w)
+        row.openalex_id = row.openalex_id or abstracts.work_key(w.get("id"))
+        row.title = row.title or w.get("title")
+        row.venue = row.venue or w.get("venue")
+        row.year = row.year or w.get("year")
+        row.doi = row.doi or openalex.normalize_doi(w.get("doi"))
+        row.summary = row.summary or summary
+        row.enriched_at = now
+        updated += 1
+    try:
+        abstracts.remember(db, works)
+        literature_store.rekey(db, [row for row, _ in resolved])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return updated
+
+
+async def run(
+    db: Session,
+    chunk: int = BACKFILL_CHUNK,
+    concurrency: int = BACKFILL_CONCURRENCY,
+    rps: float = OPENALEX_RPS,
+    state_file: Optional[str] = STATE_FILE,
+    restart: bool = False,
+) -> Dict[str, Any]:
+    """
+    Walk all pending rows in id order, chunk by chunk.
+    Progress is saved after every committed chunk; pass state_file=None to run without one.
+    """
+    state = {"last_id": 0, "updated": 0} if restart or not state_file else load_state(state_file)
+    sem = asyncio.Semaphore(concurrency)
+    limiter = _RateLimiter(rps)
+    scanned = 0
+    while True:
+        rows = pending_rows(db, state["last_id"], chunk)
+        if not rows:
+            break
+        last_id = rows[-1].id
+        n = await backfill_chunk(db, rows, sem, limiter)
+        scanned += len(rows)
+        state["last_id"] = last_id
+        state["updated"] = state.get("updated", 0) + n
+        if state_file:
+            save_state(state, state_file)
+        logger.info("rows up to id %d: %d/%d updated", last_id, n, len(rows))
+    return {"scanned": scanned, "updated": state["updated"], "last_id": state["last_id"]}
+
+
+def _main():
+    import argparse
+    from app.database import SessionLocal
+    from app.logging_config import setup_logging
+
+    setup_logging()
+    ap = argparse.ArgumentParser(description="Fill missing Literature fields and abstracts from OpenAlex.")
+    ap.add_argument("--chunk", type=int, default=BACKFILL_CHUNK, help="Rows per transaction")
+    ap.add_argument("--concurrency", type=int, default=BACKFILL_CONCURRENCY, help="Concurrent OpenAlex requests")
+    ap.add_argument("--rps", type=float, default=OPENALEX_RPS, help="Max OpenAlex requests per second")
+    ap.add_argument("--state-file", default=STATE_FILE, help="Where progress (last processed id) is kept")
+    ap.add_argument("--restart", action="store_true", help="Ignore saved progress and rescan from the first row")
+    args = ap.parse_args()
+
+    db = SessionLocal()
+    try:
+        stats = asyncio.run(run(db, args.chunk, args.concurrency, args.rps, args.state_file, args.restart))
+        print(stats)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,391 @@
+# backend/services/bib_import.py
+"""
+Bulk literature import: BibTeX, RIS, CSV or a plain DOI / OpenAlex-id list.
+
+Parsers are generators over lines, and import_entries consumes them
+IMPORT_CHUNK entries at a time, so large files are never held in memory as
+parsed records. Each chunk's DOIs and W-ids are resolved against OpenAlex in
+batched filter requests, LOOKUP_CONCURRENCY at a time; a failed batch only
+leaves its entries unresolved.
+The chunk's rows are then upserted in one transaction, and the
+(experiment_id, canonical_key) index drops papers the node already has.
+
+CLI:
+    python -m services.bib_import --node 3 refs.bib [--format bibtex] [--relationship prior]
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import logging
+import re
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import openalex, abstracts, similarity, cooccurrence, literature_store
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.schemas.literature import REL_TYPES
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("bibtex", "ris", "csv", "doi")
+TITLE_SEARCH_CONCURRENCY = 5
+LOOKUP_CONCURRENCY = int(os.getenv("IMPORT_LOOKUP_CONCURRENCY", "4"))
+IMPORT_CHUNK = int(os.getenv("IMPORT_CHUNK", "500"))
+
+_DOI_RE = re.compile(r"10\.\d{4,9}/[^\s\"'<>,;{}]+", re.IGNORECASE)
+_WID_RE = re.compile(r"(?:openalex\.org/)?(W\d{4,})\b")
+
+
+def _entry(doi=None, openalex_id=None, title=None, year=None, venue=None, link=None, relationship=None) -> Dict[str, Any]:
+    doi = openalex.normalize_doi(doi)
+    if doi:
+        m = _DOI_RE.search(doi)
+        doi = m.group(0).rstrip(".").lower() if m else None
+    try:
+        year = int(str(year).strip()[:4]) if year else None
+    except ValueError:
+        year = None
+    return {
+        "doi": doi,
+        "openalex_id": openalex_id,
+        "title": (title or "").strip() or None,
+        "year": year,
+        "venue": (venue or "").strip() or None,
+        "link": (link or "").strip() or None,
+        "relationship": relationship,
+    }
+
+
+# ----------------- parsers -----------------
+def _bibtex_fields(body: str) -> Dict[str, str]:
+    """Parse `key = {value}` / `key = "value"` / `key = 123` pairs, honouring nested braces."""
+    fields: Dict[str, str] = {}
+    i, n = 0, len(body)
+    while i < n:
+        m = re.compile(r"\s*,?\s*([A-Za-z][\w-]*)\s*=\s*").match(body, i)
+        if not m:
+            break
+        name, i = m.group(1).lower(), m.end()
+        if i < n and body[i] == "{":
+            depth, start = 0, i + 1
+            while i < n:
+                if body[i] == "{":
+                    depth += 1
+                elif body[i] == "}":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                i += 1
+            value = body[start:i]
+            i += 1
+        elif i < n and body[i] == '"':
+            end = body.find('"', i + 1)
+            end = n if end == -1 else end
+            value, i = body[i + 1:end], end + 1
+        else:
+            m2 = re.compile(r"[^,}\s]+").match(body, i)
+            value, i = (m2.group(0), m2.end()) if m2 else ("", i + 1)
+        fields[name] = " ".join(value.replace("{", "").replace("}", "").split())
+    return fields
+
+
+def parse_bibtex(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    buf: List[str] = []
+    depth = 0
+    for line in lines:
+        if not buf:
+            at = line.find("@")
+            if at == -1:
+                continue
+            line = line[at:]
+        buf.append(line)
+        depth += line.count("{") - line.count("}")
+        if depth <= 0 and "{" in "".join(buf):
+            text = "".join(buf)
+            buf, depth = [], 0
+            head = re.match(r"@(\w+)\s*\{\s*[^,]*,", text)
+            if not head or head.group(1).lower() in ("comment", "string", "preamble"):
+                continue
+            f = _bibtex_fields(text[head.end():text.rfind("}")])
+            yield _entry(
+                doi=f.get("doi"),
+                title=f.get("title"),
+                year=f.get("year"),
+                venue=f.get("journal") or f.get("booktitle"),
+                link=f.get("url"),
+            )
+
+
+_RIS_TAG = re.compile(r"^([A-Z][A-Z0-9])  -\s?(.*)$")
+
+
+def parse_ris(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    rec: Dict[str, str] = {}
+    for line in lines:
+        m = _RIS_TAG.match(line.rstrip("\r\n"))
+        if not m:
+            continue
+        tag, value = m.group(1), m.group(2).strip()
+        if tag == "ER":
+            if rec:
+                yield _entry(
+                    doi=rec.get("DO"),
+                    title=rec.get("TI") or rec.get("T1"),
+                    year=rec.get("PY") or rec.get("Y1"),
+                    venue=rec.get("JO") or rec.get("JF") or rec.get("T2"),
+                    link=rec.get("UR"),
+                )
+            rec = {}
+        elif tag not in rec:
+            rec[tag] = value
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    reader = csv.DictReader(lines)
+    for row in reader:
+        r = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+        link = r.get("link") or r.get("url")
+        wid = _WID_RE.search(r.get("openalex_id") or link or "")
+        yield _entry(
+            doi=r.get("doi"),
+            openalex_id=wid.group(1) if wid else None,
+            title=r.get("title"),
+            year=r.get("year"),
+            venue=r.get("venue") or r.get("journal"),
+            link=link,
+            relationship=(r.get("relationship") or r.get("rel_type") or "").lower() or None,
+        )
+
+
+def parse_doi_list(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        doi = _DOI_RE.search(line)
+        wid = _WID_RE.search(line)
+        if doi and "openalex.org" not in line:
+            yield _entry(doi=doi.group(0))
+        elif wid:
+            yield _entry(openalex_id=wid.group(1), link=line if line.startswith("http") else None)
+
+
+PARSERS = {"bibtex": parse_bibtex, "ris": parse_ris, "csv": parse_csv, "doi": parse_doi_list}
+
+
+def detect_format(filename: Optional[str], first_line: str) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    by_ext = {".bib": "bibtex", ".bibtex": "bibtex", ".ris": "ris", ".csv": "csv", ".txt": "doi"}
+    if ext in by_ext:
+        return by_ext[ext]
+    head = first_line.lstrip()
+    if head.startswith("@"):
+        return "bibtex"
+    if _RIS_TAG.match(head):
+        return "ris"
+    if "," in head and "doi" in head.lower():
+        return "csv"
+    return "doi"
+
+
+# ----------------- resolution + insert -----------------
+async def _fetch_batches(
+    fetch: Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]],
+    keys: List[str],
+    failed: List[str],
+    sem: asyncio.Semaphore,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    fetch() over FILTER_BATCH-sized slices, concurrently behind `sem`; keys of
+    a slice whose request fails go to `failed`.
+    """
+    async def _one(batch: List[str]) -> Dict[str, Dict[str, Any]]:
+        async with sem:
+            try:
+                return await fetch(batch)
+            except Exception as e:
+                logger.warning("OpenAlex lookup of %d ids failed: %s", len(batch), e)
+                failed.extend(batch)
+                return {}
+
+    batches = [keys[start:start + openalex.FILTER_BATCH] for start in range(0, len(keys), openalex.FILTER_BATCH)]
+    merged: Dict[str, Dict[str, Any]] = {}
+    for found in await asyncio.gather(*(_one(b) for b in batches)):
+        merged.update(found)
+    return merged
+
+
+async def _resolve(entries: List[Dict[str, Any]], failed: List[str]) -> None:
+    """Attach an OpenAlex work (or None) to each entry in place: batched by DOI / W-id, then title search."""
+    sem = asyncio.Semaphore(LOOKUP_CONCURRENCY)
+    by_doi, by_id = await asyncio.gather(
+        _fetch_batches(openalex.get_works_by_dois, [e["doi"] for e in entries if e["doi"]], failed, sem),
+        _fetch_batches(
+            openalex.get_works_by_ids, [e["openalex_id"] for e in entries if e["openalex_id"] and not e["doi"]],
+            failed, sem,
+        ),
+    )
+    for e in entries:
+        e["work"] = by_doi.get(e["doi"]) if e["doi"] else by_id.get(e["openalex_id"] or "")
+
+    sem = asyncio.Semaphore(TITLE_SEARCH_CONCURRENCY)
+
+    async def _by_title(e):
+        async with sem:
+            try:
+                e["work"] = await openalex.resolve_by_doi_or_title(None, e["title"])
+            except Exception as exc:
+                logger.warning("title lookup failed for %r: %s", e["title"][:80], exc)
+
+    await asyncio.gather(*(_by_title(e) for e in entries if not e["work"] and e["title"] and not e["doi"] and not e["link"]))
+
+
+def _row(e: Dict[str, Any], node_id: int, relationship: str) -> Optional[Dict[str, Any]]:
+    w = e.get("work") or {}
+    oa_id = abstracts.work_key(w.get("id")) or e["openalex_id"]
+    doi = openalex.normalize_doi(w.get("doi")) or e["doi"]
+    link = w.get("id") or (f"https://doi.org/{doi}" if doi else None) or e["link"]
+    if not link:
+        return None
+    return {
+        "experiment_id": node_id,
+        "openalex_id": oa_id,
+        "doi": doi,
+        "link": link,
+        "title": w.get("title") or e["title"],
+        "venue": w.get("venue") or e["venue"],
+        "year": w.get("year") or e["year"],
+        "rel_type": e.get("relationship") or relationship,
+    }
+
+
+async def _import_chunk(
+    db: AsyncSession,
+    node_id: int,
+    entries: List[Dict[str, Any]],
+    relationship: str,
+    stats: Dict[str, Any],
+) -> None:
+    """Resolve one chunk of entries and insert its rows in one transaction, adding to `stats`."""
+    stats["total"] += len(entries)
+    valid = [e for e in entries if not e.get("relationship") or e["relationship"] in REL_TYPES]
+    stats["invalid_relationship"] += len(entries) - len(valid)
+    failed: List[str] = []
+    await _resolve(valid, failed)
+    stats["lookup_failed"] += len(failed)
+
+    rows, works = [], {}
+    for e in valid:
+        row = _row(e, node_id, relationship)
+        if row is None:
+            stats["skipped"] += 1
+            continue
+        rows.append(row)
+        works[id(row)] = e.get("work")
+    if not rows:
+        return
+
+    try:
+        # Duplicates (of existing rows or within the file) are dropped by the unique index
+        inserted = await db.run_sync(literature_store.upsert, rows)
+        await db.run_sync(abstracts.remember, [w for w in works.values() if w])
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    new_keys = {key for _, key in inserted}
+    kept = []
+    for row in rows:
+        if row["canonical_key"] in new_keys:
+            new_keys.discard(row["canonical_key"])
+            kept.append(row)
+    stats["imported"] += len(kept)
+    stats["duplicates"] += len(rows) - len(kept)
+    unresolved = [row for row in kept if not works[id(row)]]
+    stats["unresolved"] += len(unresolved)
+    stats["unresolved_dois"].extend(row["doi"] for row in unresolved if row["doi"])
+    for row in kept:
+        similarity.index.add_literature(node_id, row["canonical_key"])
+        cooccurrence.index.add(node_id, row["canonical_key"])
+
+
+async def import_entries(
+    db: AsyncSession,
+    node_id: int,
+    entries: Iterable[Dict[str, Any]],
+    relationship: str = "similar",
+    chunk: int = IMPORT_CHUNK,
+) -> Dict[str, Any]:
+    """
+    Resolve and insert parsed entries for one node, `chunk` entries per
+    transaction; papers the node already has are skipped by the canonical-key
+    index. Chunks committed before an error stay imported.
+    Returns counts (total, imported, duplicates, unresolved, skipped,
+    invalid_relationship, lookup_failed) and unresolved_dois: DOIs imported
+    without an OpenAlex match, e.g. because their lookup failed (a later
+    backfill can fill them). Entries whose own relationship is not one of
+    REL_TYPES are not imported.
+    """
+    stats: Dict[str, Any] = {
+        "total": 0, "imported": 0, "duplicates": 0, "unresolved": 0, "skipped": 0,
+        "invalid_relationship": 0, "lookup_failed": 0, "unresolved_dois": [],
+    }
+    it = iter(entries)
+    while True:
+        batch = list(islice(it, chunk))
+        if not batch:
+            return stats
+        await _import_chunk(db, node_id, batch, relationship, stats)
+
+
+def parse(lines: Iterable[str], fmt: str = "auto", filename: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Dispatch to a parser; 'auto' sniffs the extension or the first non-blank line."""
+    it = iter(lines)
+    if fmt == "auto":
+        head: List[str] = []
+        for line in it:
+            head.append(line)
+            if line.strip():
+                break
+        fmt = detect_format(filename, head[-1] if head else "")
+        it = _chain(head, it)
+    if fmt not in PARSERS:
+        raise ValueError(f"Unknown format '{fmt}'. Use one of: auto, {', '.join(FORMATS)}")
+    return PARSERS[fmt](it)
+
+
+def _chain(head: List[str], rest: Iterator[str]) -> Iterator[str]:
+    yield from head
+    yield from rest
+
+
+def _main():
+    import argparse
+    from app.database import AsyncSessionLocal, async_engine
+
+    ap = argparse.ArgumentParser(description="Bulk-import literature into an experiment node.")
+    ap.add_argument("path", help="BibTeX / RIS / CSV file or a DOI list (one per line)")
+    ap.add_argument("--node", type=int, required=True, help="Experiment node id")
+    ap.add_argument("--format", default="auto", choices=("auto",) + FORMATS)
+    ap.add_argument("--relationship", default="similar", choices=REL_TYPES)
+    args = ap.parse_args()
+
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                with open(args.path, encoding="utf-8") as fh:
+                    entries = parse(fh, args.format, args.path)
+                    return await import_entries(db, args.node, entries, args.relationship)
+        finally:
+            await async_engine.dispose()
+
+    print(asyncio.run(run()))
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,143 @@
+# backend/services/cooccurrence.py
+"""
+In-memory literature co-occurrence index.
+
+Keeps a paper -> nodes inverted index and sparse, symmetric node-pair counts of
+shared papers. Both are built lazily from the DB (one column-only query) and
+kept current by the literature insert/delete paths, so "which nodes share
+papers with X" and "most-cited papers across the lab" are dictionary lookups
+instead of a scan and group-by over the Literature table.
+"""
+from __future__ import annotations
+
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import literature_store
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.experiment import Experiment
+from app.models.literature import Literature
+
+
+class CooccurrenceIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._nodes_of: Dict[str, Set[int]] = {}        # paper key -> nodes citing it
+        self._papers_of: Dict[int, Set[str]] = {}       # node -> paper keys
+        self._pairs: Dict[int, Dict[int, int]] = {}     # node -> {other node: shared papers}
+
+    # ----------------- building / incremental updates -----------------
+    def ensure_loaded(self, db: Session):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._reset()
+            rows = db.query(
+                Literature.experiment_id,
+                Literature.canonical_key,
+                Literature.openalex_id,
+                Literature.doi,
+                Literature.link,
+            ).join(Experiment, Experiment.id == Literature.experiment_id).all()
+            for node_id, key, oa_id, doi, link in rows:
+                self._add(node_id, key or literature_store.canonical_key(oa_id, doi, link))
+            self._loaded = True
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+
+    def add(self, node_id: int, key: Optional[str]):
+        if not self._loaded or not key:
+            return
+        with self._lock:
+            self._add(node_id, key)
+
+    def _add(self, node_id: int, key: Optional[str]):
+        if not key:
+            return
+        nodes = self._nodes_of.setdefault(key, set())
+        if node_id in nodes:
+            return
+        mine = self._pairs.setdefault(node_id, {})
+        for other in nodes:
+            mine[other] = mine.get(other, 0) + 1
+            theirs = self._pairs.setdefault(other, {})
+            theirs[node_id] = theirs.get(node_id, 0) + 1
+        nodes.add(node_id)
+        self._papers_of.setdefault(node_id, set()).add(key)
+
+    def remove(self, node_id: int, key: Optional[str]):
+        if not self._loaded or not key:
+            return
+        with self._lock:
+            self._remove(node_id, key)
+
+    def _remove(self, node_id: int, key: str):
+        nodes = self._nodes_of.get(key)
+        if not nodes or node_id not in nodes:
+            return
+        nodes.discard(node_id)
+        for other in nodes:
+            for a, b in ((node_id, other), (other, node_id)):
+                counts = self._pairs.get(a, {})
+                n = counts.get(b, 0) - 1
+                if n > 0:
+                    counts[b] = n
+                else:
+                    counts.pop(b, None)
+        if not nodes:
+            del self._nodes_of[key]
+        self._papers_of.get(node_id, set()).discard(key)
+
+    def remove_nodes(self, node_ids: Iterable[int]):
+        if not self._loaded:
+            return
+        with self._lock:
+            for node_id in node_ids:
+                for key in list(self._papers_of.get(node_id, ())):
+                    self._remove(node_id, key)
+                self._papers_of.pop(node_id, None)
+                self._pairs.pop(node_id, None)
+
+    # ----------------- queries -----------------
+    def shared_with(self, node_id: int, k: int = 10) -> List[Tuple[int, int, float]]:
+        """Top-k (other node, shared papers, Jaccard) by shared-paper count."""
+        with self._lock:
+            counts = self._pairs.get(node_id, {})
+            top = heapq.nlargest(k, counts.items(), key=lambda kv: (kv[1], -kv[0]))
+            own = len(self._papers_of.get(node_id, ()))
+            out = []
+            for other, shared in top:
+                union = own + len(self._papers_of.get(other, ())) - shared
+                out.append((other, shared, shared / union if union else 0.0))
+            return out
+
+    def shared_papers(self, node_id: int, other_id: int) -> Set[str]:
+        with self._lock:
+            return self._papers_of.get(node_id, set()) & self._papers_of.get(other_id, set())
+
+    def top_papers(self, k: int = 10, min_nodes: int = 1) -> List[Tuple[str, List[int]]]:
+        """Top-k papers by number of citing nodes, with the node ids."""
+        with self._lock:
+            top = heapq.nlargest(
+                k,
+                ((key, nodes) for key, nodes in self._nodes_of.items() if len(nodes) >= min_nodes),
+                key=lambda kv: (len(kv[1]), kv[0]),
+            )
+            return [(key, sorted(nodes)) for key, nodes in top]
+
+
+index = CooccurrenceIndex()
@@ -0,0 +1,182 @@
+# backend/services/enrichment.py
+"""
+Concurrent enrichment of stored Literature rows.
+
+Rows keep their display fields (title, venue, year, doi) and a one-liner
+summary in the DB. Rows never enriched or enriched longer than
+LITERATURE_TTL_HOURS ago are refreshed from OpenAlex + the LLM concurrently
+(bounded by ENRICH_CONCURRENCY) and written back in one commit. Every
+attempt stamps enriched_at, including ones that could not resolve the
+paper; those are retried after LITERATURE_RETRY_HOURS instead. A row whose
+summary was written for the same abstract (by content hash) keeps it, so an
+expired TTL costs no LLM call unless the abstract changed.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import openalex, abstracts, literature_store, llm_gemini as llm
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.database import AsyncSessionLocal
+from app.models.literature import Literature
+
+logger = logging.getLogger(__name__)
+
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "8"))
+LITERATURE_TTL = timedelta(hours=float(os.getenv("LITERATURE_TTL_HOURS", "168")))
+# Rows the last attempt could not resolve (no title) are retried sooner
+LITERATURE_RETRY = timedelta(hours=float(os.getenv("LITERATURE_RETRY_HOURS", "24")))
+
+# Row ids with a background refresh in flight, so repeated polls don't pile up work
+_in_flight: Set[int] = set()
+
+
+def doi_from_row(row: Literature) -> Optional[str]:
+    if row.doi:
+        return row.doi
+    if row.link and "doi.org/" in row.link:
+        return row.link.split("doi.org/")[-1].strip()
+    return None
+
+
+def is_stale(row: Literature, now: Optional[datetime] = None) -> bool:
+    if row.enriched_at is None:
+        return True
+    now = now or datetime.now(timezone.utc)
+    enriched_at = row.enriched_at
+    if enriched_at.tzinfo is None:
+        # SQLite drops tzinfo; timestamps are written in UTC
+        enriched_at = enriched_at.replace(tzinfo=timezone.utc)
+    return now - enriched_at > (LITERATURE_TTL if row.title else LITERATURE_RETRY)
+
+
+def row_out(row: Literature) -> Dict[str, Any]:
+    """Serialize a row from stored fields only (no network)."""
+    oa_id = abstracts.work_key(row.openalex_id or row.link)
+    return {
+        "id": f"https://openalex.org/{oa_id}" if oa_id else row.link,
+        "title": row.title,
+        "year": row.year,
+        "venue": row.venue,
+        "doi": row.doi,
+        "url": row.link,
+        "relationship": row.rel_type,
+        "confidence": round(row.confidence, 4) if row.confidence is not None else None,
+        "verified": row.evidence or {},
+        "summary": row.summary or "",
+    }
+
+
+async def _fetch(row: Dict[str, Any], stored_abstract: Optional[str], sem: asyncio.Semaphore) -> Dict[str, Any]:
+    """
+    Resolve one row (given as a plain dict snapshot) and summarize it.
+    Returns the fields to write back; never touches the DB session.
+    """
+    async with sem:
+        work = None
+        try:
+            if stored_abstract is None or not row["title"]:
+                if row["openalex_id"]:
+                    try:
+                        work = await openalex.get_work(row["openalex_id"])
+                    except Exception as e:
+                        logger.warning("get_work failed for %s: %s", row["openalex_id"], e)
+                if not work and row["doi"]:
+                    work = await openalex.resolve_by_doi_or_title(row["doi"], row["link"])
+            abstract = (work or {}).get("abstract") or stored_abstract or ""
+            # The stored summary still describes an unchanged abstract; don't pay for another LLM call
+            unchanged = (
+                row["summary"] and stored_abstract is not None
+                and abstracts.abstract_hash(abstract) == abstracts.abstract_hash(stored_abstract)
+            )
+            summary = await llm.summarize_one_liner_cn(abstract) if abstract and not unchanged else None
+        except Exception as e:
+            # Still an attempt: the row is stamped and retried after LITERATURE_RETRY
+            logger.warning("refresh failed for literature %s: %s", row["id"], e)
+            summary = None
+    return {"id": row["id"], "work": work, "summary": summary}
+
+
+async def refresh_rows(db: AsyncSession, rows: Iterable[Literature]) -> int:
+    """
+    Refresh the given rows concurrently and write the results back in one commit.
+    Returns the number of rows updated.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    by_id = {row.id: row for row in rows}
+    snapshots = [
+        {
+            "id": row.id,
+            "openalex_id": abstracts.work_key(row.openalex_id or row.link),
+            "doi": doi_from_row(row),
+            "link": row.link,
+            "title": row.title,
+            "summary": row.summary,
+        }
+        for row in rows
+    ]
+    stored = await db.run_sync(abstracts.get_many, [s["openalex_id"] for s in snapshots if s["openalex_id"]])
+    sem = asyncio.Semaphore(ENRICH_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_fetch(s, stored.get(s["openalex_id"]), sem) for s in snapshots),
+        return_exceptions=True,
+    )
+
+    now = datetime.now(timezone.utc)
+    works = []
+    updated = 0
+    for res in results:
+        if isinstance(res, Exception):
+            logger.warning("row refresh failed: %s", res)
+            continue
+        row = by_id[res["id"]]
+        w = res["work"]
+        if w:
+            works.append(w)
+            row.openalex_id = row.openalex_id or abstracts.work_key(w.get("id"))
+            row.title = w.get("title") or row.title
+            row.venue = w.get("venue") or row.venue
+            row.year = w.get("year") or row.year
+            row.doi = openalex.normalize_doi(w.get("doi")) or row.doi
+        row.summary = res["summary"] or row.summary
+        row.enriched_at = now
+        updated += 1
+    try:
+        await db.run_sync(abstracts.remember, works)
+        await db.run_sync(literature_store.rekey, rows)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error("failed to write back %d rows: %s", updated, e)
+        return 0
+    return updated
+
+
+async def refresh_in_background(row_ids: List[int]) -> None:
+    """
+    Background entry point: refresh rows by id with a session of its own.
+    Rows already being refreshed by another task are skipped.
+    """
+    ids = [i for i in row_ids if i not in _in_flight]
+    if not ids:
+        return
+    _in_flight.update(ids)
+    try:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.scalars(select(Literature).where(Literature.id.in_(ids)))).all()
+            n = await refresh_rows(db, rows)
+        logger.info("background refresh updated %d/%d rows", n, len(ids))
+    except Exception as e:
+        logger.exception("background refresh failed: %s", e)
+    finally:
+        _in_flight.difference_update(ids)
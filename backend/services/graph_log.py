@@ -0,0 +1,268 @@
+# backend/services/graph_log.py
+"""
+Graph versioning and history on top of the graph_changes log.
+
+Endpoints that mutate nodes or edges call record() / record_upserts() before
+committing, so the log rows land in the same transaction as the change. The
+current version is max(version); clients holding an older version ask for
+changes_since() and get only the entities touched after it, including
+deletions (tombstones).
+
+Upserts also log the entity's fields, which makes the log replayable. Every
+SNAPSHOT_INTERVAL versions a compacted snapshot of the whole graph is stored
+as part of the committing transaction, so state_at() rebuilds any past graph
+from one snapshot plus at most SNAPSHOT_INTERVAL changes.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.experiment import Experiment, ExperimentRelationship
+from app.models.graph_change import GraphChange, GraphSnapshot
+
+NODE, EDGE = "node", "edge"
+UPSERT, DELETE = "upsert", "delete"
+
+SNAPSHOT_INTERVAL = int(os.getenv("GRAPH_SNAPSHOT_INTERVAL", "500"))
+SNAPSHOT_CACHE_SIZE = 4
+
+NODE_FIELDS = ("title", "description", "motivation", "expectations", "status", "hypothesis", "result", "extra_data")
+EDGE_FIELDS = ("from_experiment_id", "to_experiment_id", "relationship_type", "label", "extra_data")
+
+_PENDING = "graph_log.pending"   # session.info flag: this transaction logged changes
+
+State = Dict[str, Dict[int, Dict[str, Any]]]
+
+
+class HistoryUnavailable(ValueError):
+    """Raised when the requested time is older than the first snapshot."""
+
+    def __init__(self, earliest: Optional[datetime]):
+        self.earliest = earliest
+        super().__init__(
+            f"Graph history starts at {earliest.isoformat()}" if earliest else "No graph history recorded yet"
+        )
+
+
+def _plain(value):
+    return value.value if hasattr(value, "value") else value
+
+
+def _fields(row, names: Tuple[str, ...]) -> Dict[str, Any]:
+    return {name: _plain(getattr(row, name)) for name in names}
+
+
+def record(db: Session, entity: str, ids: Iterable[int], op: str) -> None:
+    """Queue change rows on the session; they commit with the caller's transaction."""
+    db.add_all([GraphChange(entity=entity, entity_id=i, op=op) for i in ids])
+    db.info[_PENDING] = True
+
+
+def record_upserts(db: Session, entity: str, rows: Iterable[Any]) -> None:
+    """Like record(..., UPSERT) for ORM rows, logging each row's current fields."""
+    names = NODE_FIELDS if entity == NODE else EDGE_FIELDS
+    db.add_all([
+        GraphChange(entity=entity, entity_id=row.id, op=UPSERT, data=_fields(row, names))
+        for row in rows
+    ])
+    db.info[_PENDING] = True
+
+
+def current_version(db: Session) -> int:
+    return db.query(func.max(GraphChange.version)).scalar() or 0
+
+
+def etag(version: int, variant: Optional[str] = None) -> str:
+    """Weak ETag for a response derived from the graph at `version`; `variant` tells apart differently shaped responses."""
+    return f'W/"graph-{version}-{variant}"' if variant else f'W/"graph-{version}"'
+
+
+def changes_since(db: Session, since: int) -> Tuple[int, Dict[str, Dict[str, List[int]]]]:
+    """
+    Net changes after `since`: for each entity type, ids whose last op was an
+    upsert and ids that were deleted. Returns (version, changes).
+    """
+    rows = (
+        db.query(GraphChange.version, GraphChange.entity, GraphChange.entity_id, GraphChange.op)
+        .filter(GraphChange.version > since)
+        .order_by(GraphChange.version)
+        .all()
+    )
+    last_op: Dict[Tuple[str, int], str] = {}
+    for _, entity, entity_id, op in rows:
+        last_op[(entity, entity_id)] = op
+    changes = {e: {"upserted": [], "deleted": []} for e in (NODE, EDGE)}
+    for (entity, entity_id), op in last_op.items():
+        changes[entity]["upserted" if op == UPSERT else "deleted"].append(entity_id)
+    version = rows[-1].version if rows else current_version(db)
+    return version, changes
+
+
+# ----------------- snapshots -----------------
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _encode(state: State) -> bytes:
+    return zlib.compress(json.dumps(state, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(data: bytes) -> State:
+    raw = json.loads(zlib.decompress(data))
+    return {kind: {int(k): v for k, v in raw[kind].items()} for kind in (NODE, EDGE)}
+
+
+def _current_state(db: Session) -> State:
+    """Every node and edge as stored right now (including this transaction's flushed changes)."""
+    node_cols = [getattr(Experiment, n) for n in ("id",) + NODE_FIELDS + ("created_at", "updated_at")]
+    edge_cols = [getattr(ExperimentRelationship, n) for n in ("id",) + EDGE_FIELDS + ("created_at",)]
+    nodes = {}
+    for row in db.query(*node_cols).all():
+        m = row._asdict()
+        nodes[m.pop("id")] = {
+            **{n: _plain(m[n]) for n in NODE_FIELDS},
+            "created_at": _iso(m["created_at"]),
+            "updated_at": _iso(m["updated_at"]),
+        }
+    edges = {}
+    for row in db.query(*edge_cols).all():
+        m = row._asdict()
+        edges[m.pop("id")] = {**{n: _plain(m[n]) for n in EDGE_FIELDS}, "created_at": _iso(m["created_at"])}
+    return {NODE: nodes, EDGE: edges}
+
+
+def take_snapshot(db: Session, version: Optional[int] = None) -> GraphSnapshot:
+    """Store the current state as the snapshot of `version` (default: the current version). Does not commit."""
+    if version is None:
+        version = current_version(db)
+    state = _current_state(db)
+    snap = GraphSnapshot(
+        version=version,
+        node_count=len(state[NODE]),
+        edge_count=len(state[EDGE]),
+        data=_encode(state),
+    )
+    return db.merge(snap)
+
+
+@event.listens_for(Session, "before_commit")
+def _snapshot_if_due(session: Session):
+    """Once per committing transaction that logged changes: snapshot every SNAPSHOT_INTERVAL versions."""
+    if not session.info.pop(_PENDING, False) or SNAPSHOT_INTERVAL <= 0:
+        return
+    session.flush()
+    version = current_version(session)
+    last = session.query(func.max(GraphSnapshot.version)).scalar() or 0
+    if version - last >= SNAPSHOT_INTERVAL:
+        take_snapshot(session, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_pending(session: Session):
+    session.info.pop(_PENDING, None)
+
+
+class _SnapshotCache:
+    """Decoded snapshots by version; snapshots never change once written."""
+
+    def __init__(self, size: int = SNAPSHOT_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._size = size
+        self._items: "OrderedDict[int, State]" = OrderedDict()
+
+    def get(self, db: Session, version: int) -> State:
+        with self._lock:
+            state = self._items.get(version)
+            if state is not None:
+                self._items.move_to_end(version)
+                return state
+        data = db.query(GraphSnapshot.data).filter(GraphSnapshot.version == version).scalar()
+        state = _decode(data)
+        with self._lock:
+            self._items[version] = state
+            while len(self._items) > self._size:
+                self._items.popitem(last=False)
+        return state
+
+
+_snapshots = _SnapshotCache()
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    """changed_at is stored as naive UTC (CURRENT_TIMESTAMP); naive inputs are taken as UTC."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def state_at(db: Session, moment: datetime) -> Tuple[int, State]:
+    """
+    The graph as it was at `moment`: (version, {"node": {id: fields}, "edge": {id: fields}}).
+    Reads the last change at or before `moment` and the nearest snapshot
+    below it (both index lookups), then replays the changes in between.
+    """
+    moment = _naive_utc(moment)
+    cut = (
+        db.query(GraphChange.version)
+        .filter(GraphChange.changed_at <= moment)
+        .order_by(GraphChange.changed_at.desc(), GraphChange.version.desc())
+        .limit(1)
+        .scalar()
+    ) or 0
+    base = (
+        db.query(GraphSnapshot.version)
+        .filter(GraphSnapshot.version <= cut)
+        .order_by(GraphSnapshot.version.desc())
+        .limit(1)
+        .scalar()
+    )
+    if base is None:
+        earliest = db.query(func.min(GraphSnapshot.taken_at)).scalar()
+        raise HistoryUnavailable(earliest)
+
+    snapshot = _snapshots.get(db, base)
+    nodes, edges = dict(snapshot[NODE]), dict(snapshot[EDGE])
+    changes = (
+        db.query(GraphChange.entity, GraphChange.entity_id, GraphChange.op, GraphChange.data, GraphChange.changed_at)
+        .filter(GraphChange.version > base, GraphChange.version <= cut)
+        .order_by(GraphChange.version)
+        .all()
+    )
+    for entity, entity_id, op, data, changed_at in changes:
+        target = nodes if entity == NODE else edges
+        if op == DELETE:
+            target.pop(entity_id, None)
+        elif data is not None:
+            previous = target.get(entity_id)
+            ts = _iso(changed_at)
+            entry = {**data, "created_at": previous["created_at"] if previous else ts}
+            if entity == NODE:
+                entry["updated_at"] = ts
+            target[entity_id] = entry
+    return cut, {NODE: nodes, EDGE: edges}
+
+
+def install(engine: Engine) -> None:
+    """
+    Store the baseline snapshot history starts from. The data column and the
+    changed_at index on older databases come from migration 0002.
+    """
+    db = Session(bind=engine)
+    try:
+        if db.query(GraphSnapshot.version).first() is None:
+            take_snapshot(db)
+            db.commit()
+    finally:
+        db.close()
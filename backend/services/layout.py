@@ -0,0 +1,313 @@
+# backend/services/layout.py
+"""
+Layered (Sugiyama-style) layout of the experiment graph.
+
+1. Layers are the longest-path levels kept by the topological order index.
+2. Edges spanning several layers are split by dummy nodes, one per layer.
+3. Crossings are reduced by barycenter sweeps (down and up), keeping the best
+   ordering seen; barycenters for a whole layer are one bincount.
+4. Coordinates along each layer pull every node toward its neighbours'
+   average and are then packed to respect node widths, both as array passes.
+
+Results are cached per graph version; a new version whose structure (node
+and edge ids and endpoints) is unchanged reuses the cached layout, so only
+structural edits trigger a recomputation.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from bisect import bisect_right, insort
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DIRECTIONS = ("TB", "LR")
+
+# Defaults match the frontend's node size and spacing
+NODE_WIDTH = 280
+NODE_HEIGHT = 80
+RANK_SEP = 120
+NODE_SEP = 60
+DUMMY_WIDTH = 20
+
+ORDER_SWEEPS = 12
+COORD_SWEEPS = 8
+CACHE_SIZE = 8
+
+Edges = Dict[int, Tuple[int, int]]
+
+
+def _inversions(seq: np.ndarray) -> int:
+    """Number of pairs i < j with seq[i] > seq[j]."""
+    seen: List[int] = []
+    count = 0
+    for x in seq.tolist():
+        count += len(seen) - bisect_right(seen, x)
+        insort(seen, x)
+    return count
+
+
+class _Layered:
+    """Proper layered graph: real nodes plus dummies, unit-span segments between adjacent layers."""
+
+    def __init__(self, order: List[int], levels: Dict[int, int], edges: Edges):
+        self.node_ids = list(order)
+        index = {n: i for i, n in enumerate(self.node_ids)}
+        layer = [levels.get(n, 0) for n in self.node_ids]
+        src: List[int] = []
+        dst: List[int] = []
+        # edge id -> chain of vertices from its upper to its lower end
+        self.chains: Dict[int, List[int]] = {}
+        self.reversed: Dict[int, bool] = {}
+        for eid, (u, v) in sorted(edges.items()):
+            if u not in index or v not in index:
+                continue
+            a, b = index[u], index[v]
+            flipped = layer[a] > layer[b]
+            if flipped:
+                a, b = b, a
+            chain = [a]
+            for lvl in range(layer[a] + 1, layer[b]):
+                layer.append(lvl)
+                chain.append(len(layer) - 1)
+            chain.append(b)
+            for p, q in zip(chain, chain[1:]):
+                if layer[p] != layer[q]:
+                    src.append(p)
+                    dst.append(q)
+            self.chains[eid] = chain
+            self.reversed[eid] = flipped
+        self.n_real = len(self.node_ids)
+        self.layer = np.array(layer, dtype=np.int64)
+        self.src = np.array(src, dtype=np.int64)
+        self.dst = np.array(dst, dtype=np.int64)
+        n_layers = int(self.layer.max()) + 1 if len(layer) else 0
+        # Vertices of each layer, initially in topological (then creation) order
+        self.layers = [np.nonzero(self.layer == lvl)[0] for lvl in range(n_layers)]
+        seg_layer = self.layer[self.src] if self.src.size else self.src
+        # Segments leaving each layer downward
+        self.segments = [np.nonzero(seg_layer == lvl)[0] for lvl in range(n_layers)]
+
+    def positions(self) -> np.ndarray:
+        pos = np.zeros(len(self.layer), dtype=np.float64)
+        for vertices in self.layers:
+            pos[vertices] = np.arange(len(vertices))
+        return pos
+
+    def crossings(self, pos: np.ndarray) -> int:
+        total = 0
+        for segs in self.segments:
+            if segs.size < 2:
+                continue
+            a, b = pos[self.src[segs]], pos[self.dst[segs]]
+            order = np.lexsort((b, a))
+            total += _inversions(b[order].astype(np.int64))
+        return total
+
+    def _sweep(self, pos: np.ndarray, downward: bool):
+        n = len(self.layer)
+        rng = range(1, len(self.layers)) if downward else range(len(self.layers) - 2, -1, -1)
+        for lvl in rng:
+            segs = self.segments[lvl - 1] if downward else self.segments[lvl]
+            fixed, moving = (self.src, self.dst) if downward else (self.dst, self.src)
+            weight = np.bincount(moving[segs], minlength=n)
+            total = np.bincount(moving[segs], weights=pos[fixed[segs]], minlength=n)
+            vertices = self.layers[lvl]
+            bary = np.where(weight[vertices] > 0, total[vertices] / np.maximum(weight[vertices], 1), pos[vertices])
+            vertices = vertices[np.lexsort((pos[vertices], bary))]
+            self.layers[lvl] = vertices
+            pos[vertices] = np.arange(len(vertices))
+
+    def minimize_crossings(self, sweeps: int = ORDER_SWEEPS) -> int:
+        pos = self.positions()
+        best = self.crossings(pos)
+        best_layers = [v.copy() for v in self.layers]
+        for i in range(sweeps):
+            if best == 0:
+                break
+            self._sweep(pos, downward=(i % 2 == 0))
+            c = self.crossings(pos)
+            if c < best:
+                best = c
+                best_layers = [v.copy() for v in self.layers]
+        self.layers = best_layers
+        return best
+
+    def assign_coordinates(self, width: float, sep: float, sweeps: int = COORD_SWEEPS) -> np.ndarray:
+        """Position along the layer axis (centres); order within layers is preserved."""
+        n = len(self.layer)
+        size = np.full(n, float(DUMMY_WIDTH))
+        size[:self.n_real] = width
+        # Minimum centre distance between each vertex and its successor in the layer
+        offsets = []
+        for vertices in self.layers:
+            gaps = (size[vertices][:-1] + size[vertices][1:]) / 2 + sep
+            offsets.append(np.concatenate([[0.0], np.cumsum(gaps)])[:len(vertices)])
+        x = np.zeros(n)
+        for vertices, c in zip(self.layers, offsets):
+            if len(c):
+                x[vertices] = c - c[-1] / 2
+        for i in range(sweeps):
+            downward = i % 2 == 0
+            fixed, moving = (self.src, self.dst) if downward else (self.dst, self.src)
+            weight = np.bincount(moving, minlength=n)
+            total = np.bincount(moving, weights=x[fixed], minlength=n)
+            desired = np.where(weight > 0, total / np.maximum(weight, 1), x)
+            for vertices, c in zip(self.layers, offsets):
+                if not len(vertices):
+                    continue
+                d = desired[vertices] - c
+                # Two feasible packings (pushing right / pushing left); their mean is feasible too
+                right = np.maximum.accumulate(d)
+                left = np.minimum.accumulate(d[::-1])[::-1]
+                x[vertices] = (right + left) / 2 + c
+        return x - (x - size / 2).min() if n else x
+
+
+def compute(
+    order: List[int],
+    levels: Dict[int, int],
+    edges: Edges,
+    direction: str = "TB",
+    node_width: float = NODE_WIDTH,
+    node_height: float = NODE_HEIGHT,
+    rank_sep: float = RANK_SEP,
+    node_sep: float = NODE_SEP,
+) -> Dict[str, Any]:
+    """
+    Layout of the given nodes/edges. Node x/y are top-left corners (as React
+    Flow positions nodes); edge points run from source to target through
+    the dummy nodes.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of: {', '.join(DIRECTIONS)}")
+    horizontal = direction == "LR"
+    along, across = (node_height, node_width) if horizontal else (node_width, node_height)
+
+    g = _Layered(order, levels, edges)
+    crossings = g.minimize_crossings()
+    u = g.assign_coordinates(along, node_sep)
+    v = g.layer * (across + rank_sep) + across / 2  # centre across the layers
+
+    def point(x_along: float, y_across: float) -> List[float]:
+        return [round(float(y_across), 1), round(float(x_along), 1)] if horizontal else \
+               [round(float(x_along), 1), round(float(y_across), 1)]
+
+    w, h = (node_width, node_height)
+    nodes = []
+    order_in_layer = {}
+    for vertices in g.layers:
+        for i, vertex in enumerate(vertices.tolist()):
+            order_in_layer[vertex] = i
+    for i, node_id in enumerate(g.node_ids):
+        cx, cy = point(u[i], v[i])
+        nodes.append({
+            "id": node_id,
+            "x": round(cx - w / 2, 1),
+            "y": round(cy - h / 2, 1),
+            "width": w,
+            "height": h,
+            "layer": int(g.layer[i]),
+            "order": order_in_layer[i],
+        })
+
+    routes = []
+    for eid, chain in g.chains.items():
+        top, bottom = chain[0], chain[-1]
+        pts = [point(u[top], v[top] + across / 2)]
+        pts += [point(u[d], v[d]) for d in chain[1:-1]]
+        pts.append(point(u[bottom], v[bottom] - across / 2))
+        if g.reversed[eid]:
+            pts.reverse()
+        from_id, to_id = edges[eid]
+        routes.append({
+            "id": eid,
+            "from_experiment_id": from_id,
+            "to_experiment_id": to_id,
+            "points": pts,
+        })
+
+    # Dummy nodes (edge bends) can sit outside the outermost real nodes
+    sizes = np.where(np.arange(len(u)) < g.n_real, along, DUMMY_WIDTH)
+    extent_along = float((u + sizes / 2).max()) if g.n_real else 0.0
+    extent_across = float(g.layer.max() * (across + rank_sep) + across) if g.n_real else 0.0
+    width, height = (extent_across, extent_along) if horizontal else (extent_along, extent_across)
+    return {
+        "direction": direction,
+        "width": round(width, 1),
+        "height": round(height, 1),
+        "crossings": crossings,
+        "nodes": nodes,
+        "edges": routes,
+    }
+
+
+def _digest(value: Any) -> str:
+    return hashlib.blake2b(repr(value).encode(), digest_size=16).hexdigest()
+
+
+def options_digest(options: Dict[str, Any]) -> str:
+    """Short stable id of a set of layout options (part of the endpoint's ETag)."""
+    return _digest(tuple(sorted(options.items())))[:12]
+
+
+class LayoutCache:
+    """Layouts by (graph version, options), falling back to the graph's structure."""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._size = size
+        self._by_version: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._by_structure: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def _put(cache: OrderedDict, key: tuple, value: Dict[str, Any], size: int):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > size:
+            cache.popitem(last=False)
+
+    def get(self, version: int, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The layout cached for this graph version and options, if any."""
+        key = (version, tuple(sorted(options.items())))
+        with self._lock:
+            hit = self._by_version.get(key)
+            if hit is not None:
+                self._by_version.move_to_end(key)
+            return hit
+
+    def layout(
+        self,
+        options: Dict[str, Any],
+        snapshot: Callable[[], Tuple[List[int], Dict[int, int], Edges]],
+    ) -> Dict[str, Any]:
+        """
+        Layout of the graph as `snapshot` returns it, reusing one computed for
+        the same structure. Not filed under a version: the snapshot is taken
+        here, so only the caller can tell which version it belongs to (put()).
+        """
+        opts = tuple(sorted(options.items()))
+        order, levels, edges = snapshot()
+        # A digest rather than hash(): a collision must not hand back another graph's layout
+        structure = (_digest((sorted(order), sorted(edges.items()))), opts)
+        with self._lock:
+            layout = self._by_structure.get(structure)
+        if layout is None:
+            layout = compute(order, levels, edges, **options)
+            with self._lock:
+                self._put(self._by_structure, structure, layout, self._size)
+        return layout
+
+    def put(self, version: int, options: Dict[str, Any], result: Dict[str, Any]):
+        with self._lock:
+            self._put(self._by_version, (version, tuple(sorted(options.items()))), result, self._size)
+
+    def clear(self):
+        with self._lock:
+            self._by_version.clear()
+            self._by_structure.clear()
+
+
+cache = LayoutCache()
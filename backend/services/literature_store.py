@@ -0,0 +1,218 @@
+# backend/services/literature_store.py
+"""
+Canonical paper keys and idempotent Literature inserts.
+
+Every Literature row carries a canonical_key with a unique
+(experiment_id, canonical_key) index, so the same paper added as an OpenAlex
+link, a DOI link or a mixed-case DOI lands on one row:
+
+    W-id when known (from the id/link, or a DOI already mapped in work_abstracts)
+    "doi:<normalized doi>" otherwise
+    normalized URL as a last resort
+
+Inserts go through INSERT .. ON CONFLICT, so duplicates are resolved by the
+index rather than by a lookup query per row.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from . import openalex, abstracts
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.literature import Literature, WorkAbstract
+
+CONFLICT_COLUMNS = ["experiment_id", "canonical_key"]
+
+
+def _doi_of(doi: Optional[str], link: Optional[str]) -> Optional[str]:
+    if doi:
+        return openalex.normalize_doi(doi)
+    if link and "doi.org/" in link:
+        return openalex.normalize_doi(link.split("doi.org/", 1)[-1])
+    return None
+
+
+def _wid_of(openalex_id: Optional[str], link: Optional[str]) -> Optional[str]:
+    if openalex_id:
+        return abstracts.work_key(openalex_id)
+    if link and "openalex.org/" in link:
+        return abstracts.work_key(link)
+    return None
+
+
+def normalize_url(link: str) -> str:
+    """Lowercase scheme/host, https, no fragment or trailing slash."""
+    parts = urlsplit(link.strip())
+    scheme = "https" if parts.scheme in ("http", "https") else parts.scheme.lower()
+    return urlunsplit((scheme, parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+
+def canonical_key(
+    openalex_id: Optional[str] = None,
+    doi: Optional[str] = None,
+    link: Optional[str] = None,
+    doi_to_wid: Optional[Dict[str, str]] = None,
+) -> Optional[str]:
+    wid = _wid_of(openalex_id, link)
+    if wid:
+        return wid
+    d = _doi_of(doi, link)
+    if d:
+        return (doi_to_wid or {}).get(d) or f"doi:{d}"
+    return normalize_url(link) if link else None
+
+
+def known_wids(db: Session, dois: Iterable[str]) -> Dict[str, str]:
+    """{normalized_doi: W-id} for DOIs already resolved into the abstract store (one query)."""
+    wanted = {d for d in dois if d}
+    if not wanted:
+        return {}
+    rows = db.query(WorkAbstract.doi, WorkAbstract.openalex_id).filter(WorkAbstract.doi.in_(wanted)).all()
+    return {doi: wid for doi, wid in rows}
+
+
+def assign_keys(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Set row["canonical_key"] on each Literature value dict in place."""
+    pending = [r for r in rows if not _wid_of(r.get("openalex_id"), r.get("link"))]
+    doi_to_wid = known_wids(db, (_doi_of(r.get("doi"), r.get("link")) for r in pending))
+    for r in rows:
+        r["canonical_key"] = canonical_key(r.get("openalex_id"), r.get("doi"), r.get("link"), doi_to_wid)
+    return rows
+
+
+def known_dois(db: Session, wids: Iterable[str]) -> Dict[str, str]:
+    """{W-id: normalized_doi} for works in the abstract store (one query)."""
+    wanted = {w for w in wids if w}
+    if not wanted:
+        return {}
+    rows = db.query(WorkAbstract.openalex_id, WorkAbstract.doi).filter(
+        WorkAbstract.openalex_id.in_(wanted), WorkAbstract.doi.isnot(None)
+    ).all()
+    return {wid: doi for wid, doi in rows}
+
+
+def _invalidate_indexes() -> None:
+    # The in-memory indexes hold paper keys; rebuild them on next use
+    from . import similarity, cooccurrence
+    similarity.index.invalidate()
+    cooccurrence.index.invalidate()
+
+
+def _promote_doi_keys(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Rows stored before their DOI was resolved are keyed "doi:..". When a new row
+    brings the W-id for that DOI, rekey the stored row so the conflict is detected.
+    The DOI comes from the new row, or from the stored row itself: the abstract
+    store's DOI for the W-id, or a W-id already set on the stored row.
+    """
+    promote: Dict[Tuple[int, str], str] = {}
+    by_wid: Dict[Tuple[int, str], str] = {}
+    for r in rows:
+        key = r["canonical_key"]
+        d = _doi_of(r.get("doi"), r.get("link"))
+        if d and key != f"doi:{d}":
+            promote[(r["experiment_id"], f"doi:{d}")] = key
+        if abstracts.work_key(key) == key:
+            by_wid[(r["experiment_id"], key)] = key
+    wid_to_doi = known_dois(db, {wid for _, wid in by_wid})
+    for exp, wid in by_wid:
+        if wid in wid_to_doi:
+            promote.setdefault((exp, f"doi:{wid_to_doi[wid]}"), wid)
+    if not promote and not by_wid:
+        return
+    exps = {exp for exp, _ in promote} | {exp for exp, _ in by_wid}
+    stored = db.query(Literature).filter(
+        Literature.experiment_id.in_(exps),
+        or_(
+            Literature.canonical_key.in_({key for _, key in promote} | set(promote.values()) | set(by_wid.values())),
+            Literature.openalex_id.in_(set(by_wid.values())),
+        ),
+    ).all()
+    taken = {(lit.experiment_id, lit.canonical_key) for lit in stored}
+    rekeyed = False
+    for lit in stored:
+        new_key = promote.get((lit.experiment_id, lit.canonical_key))
+        if new_key is None and (lit.canonical_key or "").startswith("doi:"):
+            new_key = by_wid.get((lit.experiment_id, abstracts.work_key(lit.openalex_id)))
+        if new_key and (lit.experiment_id, new_key) not in taken:
+            lit.canonical_key = new_key
+            lit.openalex_id = lit.openalex_id or new_key
+            taken.add((lit.experiment_id, new_key))
+            rekeyed = True
+    if rekeyed:
+        db.flush()
+        _invalidate_indexes()
+
+
+def rekey(db: Session, rows: Iterable[Literature]) -> int:
+    """
+    Recompute canonical_key on stored rows after enrichment set their W-id or
+    DOI, so a later insert of the same paper under its other link conflicts.
+    A row whose new key is already taken on its node keeps the old one.
+    Flushes, does not commit; returns the number of rows rekeyed.
+    """
+    changes = [(lit, canonical_key(lit.openalex_id, lit.doi, lit.link)) for lit in rows]
+    changes = [(lit, key) for lit, key in changes if key and key != lit.canonical_key]
+    if not changes:
+        return 0
+    taken = set(db.query(Literature.experiment_id, Literature.canonical_key).filter(
+        Literature.experiment_id.in_({lit.experiment_id for lit, _ in changes}),
+        Literature.canonical_key.in_({key for _, key in changes}),
+    ).all())
+    rekeyed = 0
+    for lit, key in changes:
+        if (lit.experiment_id, key) in taken:
+            continue
+        lit.canonical_key = key
+        taken.add((lit.experiment_id, key))
+        rekeyed += 1
+    if rekeyed:
+        db.flush()
+        _invalidate_indexes()
+    return rekeyed
+
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(Literature)
+
+
+def upsert(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    update: Iterable[str] = (),
+) -> List[Tuple[int, str]]:
+    """
+    Insert Literature value dicts keyed on (experiment_id, canonical_key).
+    With no `update` columns existing rows are left alone; otherwise those
+    columns are overwritten from the new values. Returns (id, canonical_key)
+    for every row inserted or updated. Does not commit.
+    """
+    if not rows:
+        return []
+    assign_keys(db, rows)
+    _promote_doi_keys(db, rows)
+    # Homogeneous parameter sets let the dialect batch the statement
+    columns = sorted({k for r in rows for k in r})
+    params = [{c: r.get(c) for c in columns} for r in rows]
+
+    stmt = _insert(db)
+    update = list(update)
+    if update:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=CONFLICT_COLUMNS,
+            set_={c: stmt.excluded[c] for c in update},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=CONFLICT_COLUMNS)
+    result = db.execute(stmt.returning(Literature.id, Literature.canonical_key), params)
+    return [(row_id, key) for row_id, key in result.all()]
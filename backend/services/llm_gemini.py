@@ -1,7 +1,7 @@
 # backend/services/llm_gemini.py
-import os, json
+import os, json, logging
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 import google.generativeai as genai
@@ -10,6 +10,8 @@ import dotenv
 
 dotenv.load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configure Gemini once
 API_KEY = os.getenv("GEMINI_API_KEY")
 if API_KEY:
@@ -75,8 +77,8 @@ async def generate_candidates(ctx: Dict[str, Any], relationship: str, k: int = 1
         k=k,
     )
     
-    print(f"[llm] Generating candidates with relationship: {relationship}")
-    print(f"[llm] Prompt preview: {prompt[:200]}...")
+    logger.info("generating candidates", extra={"relationship": relationship})
+    logger.debug("prompt", extra={"relationship": relationship, "payload": prompt})
     try:
         # Use different temperature based on relationship type to encourage diversity
         temperature = 0.2
@@ -91,18 +93,16 @@ async def generate_candidates(ctx: Dict[str, Any], relationship: str, k: int = 1
             prompt,
             generation_config={"response_mime_type": "application/json", "temperature": temperature},
         )
-        print(f"[llm] got response for relationship {relationship}")
         txt = _resp_text(resp)
-        print(f"[llm] raw response for {relationship}: {txt}")
+        logger.debug("raw response", extra={"relationship": relationship, "payload": txt})
         data = json.loads(txt or "{}")
         papers = data.get("papers", [])
         out = []
         for p in papers:
             if "title" in p and "relationship" in p:
-                print(f"[llm] candidate for {relationship}:", {"title": p["title"], "doi": p.get("doi"), "relationship": p["relationship"], "why": p.get("why","")})
                 out.append({"title": p["title"], "doi": p.get("doi"), "relationship": p["relationship"], "why": p.get("why","")})
         if not out:
-            print("[llm] empty or invalid JSON; using fallback")
+            logger.warning("empty or invalid JSON; using fallback", extra={"relationship": relationship})
             return [{
                 "title": f"{ctx.get('problem','Experiment topic')} — survey and baselines",
                 "doi": None,
@@ -111,7 +111,7 @@ async def generate_candidates(ctx: Dict[str, Any], relationship: str, k: int = 1
             }]
         return out[:k]
     except Exception as e:
-        print(f"[llm] exception during generation: {e}; using fallback")
+        logger.warning("generation failed; using fallback: %s", e, extra={"relationship": relationship})
         return [{
             "title": f"{ctx.get('problem','Experiment topic')} — survey and baselines",
             "doi": None,
@@ -156,17 +156,16 @@ async def generate_candidates_from_base(ctx: Dict[str, Any], base_work: Dict[str
             prompt,
             generation_config={"response_mime_type": "application/json", "temperature": 0.2},
         )
-        print("[llm] got response (from_base)")
         txt = _resp_text(resp)
+        logger.debug("raw response (from_base)", extra={"relationship": relationship, "payload": txt})
         data = json.loads(txt or "{}")
         papers = data.get("papers", [])
         out = []
         for p in papers:
             if "title" in p and "relationship" in p:
-                print("[llm] candidate (from_base)", {"title": p["title"], "doi": p.get("doi"), "relationship": p["relationship"], "why": p.get("why","")})
                 out.append({"title": p["title"], "doi": p.get("doi"), "relationship": p["relationship"], "why": p.get("why","")})
         if not out:
-            print("[llm] empty/invalid JSON (from_base); using fallback")
+            logger.warning("empty or invalid JSON (from_base); using fallback", extra={"relationship": relationship})
             return [{
                 "title": f"Works related to {base_work.get('title','base paper')}",
                 "doi": None,
@@ -175,7 +174,7 @@ async def generate_candidates_from_base(ctx: Dict[str, Any], base_work: Dict[str
             }]
         return out[:k]
     except Exception as e:
-        print(f"[llm] exception during generation (from_base): {e}; using fallback")
+        logger.warning("generation failed (from_base); using fallback: %s", e, extra={"relationship": relationship})
         return [{
             "title": f"Works related to {base_work.get('title','base paper')}",
             "doi": None,
@@ -183,6 +182,17 @@ async def generate_candidates_from_base(ctx: Dict[str, Any], base_work: Dict[str
             "why": "Related to the base paper and node."
         }]
 
+STANCE_BATCH_SIZE = 16
+STANCE_MAX_CHARS = 1500
+
+def _norm_stance(ans: str) -> str:
+    ans = (ans or "").strip().lower()
+    if "contrad" in ans:
+        return "contradict"
+    if "support" in ans:
+        return "support"
+    return "neutral"
+
 async def stance(seed_abs: str, cand_abs: str) -> str:
     """
     Return one of: 'support' | 'neutral' | 'contradict'.
@@ -191,14 +201,46 @@ async def stance(seed_abs: str, cand_abs: str) -> str:
         return "neutral"
     model = genai.GenerativeModel("gemini-2.5-flash")
     prompt = _render("stance_contrast.j2", seed_abs=seed_abs or "", cand_abs=cand_abs or "")
-    resp = model.generate_content(prompt, generation_config={"temperature": 0.0})
-    ans = _resp_text(resp).strip().lower()
-    # Normalize
-    if "contrad" in ans:
-        return "contradict"
-    if "support" in ans:
-        return "support"
-    return "neutral"
+    resp = await model.generate_content_async(prompt, generation_config={"temperature": 0.0})
+    return _norm_stance(_resp_text(resp))
+
+async def stance_batch(pairs: List[Tuple[str, str]]) -> List[Optional[str]]:
+    """
+    Classify many (seed_abs, cand_abs) pairs with one prompt per STANCE_BATCH_SIZE pairs.
+    Returns one of 'support' | 'neutral' | 'contradict' per pair, in input order,
+    or None for pairs the model gave no usable verdict for.
+    """
+    if not pairs:
+        return []
+    if not API_KEY:
+        # No model, no verdict: leave the pairs unverified (and uncached)
+        return [None] * len(pairs)
+    model = genai.GenerativeModel("gemini-2.5-flash")
+    out: List[Optional[str]] = []
+    for start in range(0, len(pairs), STANCE_BATCH_SIZE):
+        chunk = pairs[start:start + STANCE_BATCH_SIZE]
+        prompt = _render(
+            "stance_contrast_batch.j2",
+            pairs=[
+                {"i": i, "seed_abs": (seed or "")[:STANCE_MAX_CHARS], "cand_abs": (cand or "")[:STANCE_MAX_CHARS]}
+                for i, (seed, cand) in enumerate(chunk)
+            ],
+        )
+        verdicts: List[Optional[str]] = [None] * len(chunk)
+        try:
+            resp = await model.generate_content_async(
+                prompt,
+                generation_config={"response_mime_type": "application/json", "temperature": 0.0},
+            )
+            data = json.loads(_resp_text(resp) or "{}")
+            for v in data.get("verdicts", []):
+                i = v.get("i")
+                if isinstance(i, int) and 0 <= i < len(chunk):
+                    verdicts[i] = _norm_stance(v.get("stance", ""))
+        except Exception as e:
+            logger.warning("stance batch failed; leaving pairs unverified: %s", e)
+        out.extend(verdicts)
+    return out
 
 async def summarize_one_liner_cn(cand_abs: str) -> str:
     """
@@ -208,7 +250,8 @@ async def summarize_one_liner_cn(cand_abs: str) -> str:
         return (cand_abs or "Related work and summary").strip()[:34] + ("…" if len(cand_abs or "") > 35 else "")
     model = genai.GenerativeModel("gemini-2.5-flash")
     prompt = _render("summary_one_liner_cn.j2", cand_abs=cand_abs or "")
-    resp = model.generate_content(prompt, generation_config={"temperature": 0.3})
+    # Async call so concurrent enrichment actually overlaps LLM round trips
+    resp = await model.generate_content_async(prompt, generation_config={"temperature": 0.3})
     return _resp_text(resp).strip() or "Related work and summary"
 
 async def relevance_score(ctx: Dict[str, Any], work: Dict[str, Any]) -> float:
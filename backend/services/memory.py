@@ -1,19 +1,23 @@
 # backend/services/memory.py
 import os
 from typing import Dict, Any, Optional, List
-import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from app.models.experiment import Experiment, ExperimentRelationship
+from app.models.experiment import Experiment
+from . import adjacency
 
-RA_BASE_URL = os.getenv("RA_BASE_URL", "http://127.0.0.1:8000")
+async def _get_node_info_db(node_id: int, db: AsyncSession, with_parents: bool = True, with_children: bool = True) -> Dict[str, Any]:
+    return await db.run_sync(_node_info, node_id, with_parents, with_children)
 
-async def _get_node_info_db(node_id: int, db: Session, with_parents: bool = True, with_children: bool = True) -> Dict[str, Any]:
+def _node_info(db: Session, node_id: int, with_parents: bool, with_children: bool) -> Dict[str, Any]:
     """
-    Fallback: direct DB query to assemble node info similar to GET /nodes/{id}.
+    Assemble node info similar to GET /nodes/{id}: the node row plus its
+    neighbours from the shared adjacency index (one query for their titles).
     """
+    adjacency.index.ensure_loaded(db)
     node = db.get(Experiment, node_id)
     if not node:
         raise ValueError("Node not found")
@@ -34,45 +38,29 @@ async def _get_node_info_db(node_id: int, db: Session, with_parents: bool = True
         "children": [],
     }
 
+    links = []
     if with_parents:
-        rels = db.query(ExperimentRelationship).filter(ExperimentRelationship.to_experiment_id == node.id).all()
-        for rel in rels:
-            p = db.get(Experiment, rel.from_experiment_id)
-            if p:
-                info["parents"].append({
-                    "id": p.id,
-                    "title": p.title,
-                    "description": p.description,
-                    "relationship": rel.relationship_type,
-                })
-
+        links += [("parents", link) for link in adjacency.index.parents(node.id)]
     if with_children:
-        rels = db.query(ExperimentRelationship).filter(ExperimentRelationship.from_experiment_id == node.id).all()
-        for rel in rels:
-            ch = db.get(Experiment, rel.to_experiment_id)
-            if ch:
-                info["children"].append({
-                    "id": ch.id,
-                    "title": ch.title,
-                    "description": ch.description,
-                    "relationship": rel.relationship_type,
-                })
+        links += [("children", link) for link in adjacency.index.children(node.id)]
+    ids = {other for _, (_, other, _) in links}
+    rows = {
+        exp.id: exp for exp in db.query(Experiment.id, Experiment.title, Experiment.description)
+        .filter(Experiment.id.in_(ids)).all()
+    } if ids else {}
+    for key, (_, other, rel_type) in links:
+        exp = rows.get(other)
+        if exp:
+            info[key].append({
+                "id": exp.id,
+                "title": exp.title,
+                "description": exp.description,
+                "relationship": rel_type.value,
+            })
 
     return info
 
-async def _fetch_node_info_api(node_id: int) -> Dict[str, Any]:
-    """
-    Call the backend API GET /nodes/{node_id}?with_parents=true&with_children=true
-    """
-    url = f"{RA_BASE_URL}/nodes/{node_id}"
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.get(url, params={"with_parents": "true", "with_children": "true"})
-        r.raise_for_status()
-        data = r.json()
-        # The endpoint currently returns { node, parents, children }
-        return data
-
-async def get_node_context(node_id: int, db: Session) -> Dict[str, Any]:
+async def get_node_context(node_id: int, db: AsyncSession) -> Dict[str, Any]:
     """
     Build LLM-ready context from node info (seedless).
     - problem: Experiment.title
@@ -80,12 +68,8 @@ async def get_node_context(node_id: int, db: Session) -> Dict[str, Any]:
     - parents/children: brief titles with relationship
     - methods_aliases / datasets_metrics: left empty for now
     """
-    # Prefer calling the public API to keep one source of truth.
-    try:
-        info = await _fetch_node_info_api(node_id)
-    except Exception as e:
-        print(f"[memory] API get_node_info failed: {e}; falling back to DB")
-        info = await _get_node_info_db(node_id, db, with_parents=True, with_children=True)
+    # Same adjacency index as GET /nodes/{id}, without an HTTP round trip to ourselves
+    info = await _get_node_info_db(node_id, db, with_parents=True, with_children=True)
 
     def _brief(items):
         out = []
@@ -1,10 +1,12 @@
 # backend/services/openalex.py
-import os, httpx
+import os, httpx, logging
 from typing import Dict, Any, Optional, List
 
 OPENALEX_BASE = "https://api.openalex.org"
 MAILTO = os.getenv("OPENALEX_MAILTO", "cqian17@jh.edu")
 
+logger = logging.getLogger(__name__)
+
 _client: Optional[httpx.AsyncClient] = None
 
 def get_client() -> httpx.AsyncClient:
@@ -13,6 +15,20 @@ def get_client() -> httpx.AsyncClient:
         _client = httpx.AsyncClient(base_url=OPENALEX_BASE, timeout=20.0)
     return _client
 
+def normalize_doi(doi: str | None) -> str | None:
+    """
+    Canonical DOI: lowercase, without resolver/`doi:` prefixes.
+    'https://doi.org/10.1145/ABC' -> '10.1145/abc'
+    """
+    if not doi:
+        return None
+    d = doi.strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/", "doi.org/", "doi:"):
+        if d.startswith(prefix):
+            d = d[len(prefix):]
+            break
+    return d.strip() or None
+
 def _flatten_abstract(inv_idx: dict | None) -> str:
     if not inv_idx:
         return ""
@@ -71,9 +87,9 @@ async def resolve_by_doi_or_title(doi: str | None, title_or_link: str | None) ->
             w["_resolved_via"] = "doi"
             return w
         except httpx.HTTPStatusError as e:
-            print(f"[openalex] DOI not found: {doi} ({e})")
+            logger.debug("DOI not found: %s (%s)", doi, e)
         except Exception as e:
-            print(f"[openalex] DOI lookup error: {doi} ({e})")
+            logger.warning("DOI lookup error: %s (%s)", doi, e)
     # Title or link path
     q = title_or_link or ""
     if q:
@@ -84,11 +100,46 @@ async def resolve_by_doi_or_title(doi: str | None, title_or_link: str | None) ->
                 w = _norm_work(res[0])
                 w["_resolved_via"] = "title"
                 return w
-            print(f"[openalex] title search returned no results for query: {q!r}")
+            logger.debug("title search returned no results for query: %r", q)
         except Exception as e:
-            print(f"[openalex] title search error for {q!r}: {e}")
+            logger.warning("title search error for %r: %s", q, e)
     return None
 
+# OpenAlex accepts up to 50 OR-ed values per filter
+FILTER_BATCH = 50
+
+async def _get_works_filtered(key: str, values: List[str]) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for start in range(0, len(values), FILTER_BATCH):
+        chunk = values[start:start + FILTER_BATCH]
+        data = await _get("/works", {"filter": f"{key}:{'|'.join(chunk)}", "per-page": FILTER_BATCH})
+        out.extend(_norm_work(w) for w in data.get("results", []))
+    return out
+
+async def get_works_by_dois(dois: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolve many DOIs with batched filter requests (50 per call).
+    Returns {normalized_doi: work}; DOIs OpenAlex doesn't know are absent.
+    """
+    wanted = sorted({d for d in (normalize_doi(x) for x in dois) if d})
+    works = await _get_works_filtered("doi", wanted)
+    out = {}
+    for w in works:
+        d = normalize_doi(w.get("doi"))
+        if d:
+            w["_resolved_via"] = "doi"
+            out[d] = w
+    return out
+
+async def get_works_by_ids(work_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch many works by W-id (or OpenAlex URL) with batched filter requests.
+    Returns {W-id: work}.
+    """
+    wanted = sorted({w.strip().rstrip("/").split("/")[-1] for w in work_ids if w})
+    works = await _get_works_filtered("openalex", wanted)
+    return {w["id"].split("/")[-1]: w for w in works}
+
 async def get_abstract(work_id_or_url: str) -> str:
     w = await get_work(work_id_or_url)
     return w.get("abstract", "")
@@ -1,22 +1,50 @@
 # backend/services/orchestrator.py
+import logging
 from typing import List, Optional, Dict, Any
-from . import memory, llm_gemini as llm, openalex, scorer
+from . import memory, llm_gemini as llm, openalex, scorer, stance, abstracts
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from app.models.experiment import Experiment
 from app.models.literature import Literature
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
 
 
 class NoCandidateError(Exception):
     ...
 
+def _node_abstract(ctx: Dict[str, Any]) -> str:
+    """Stand-in 'abstract' for a node: the text fields a stance check can compare against."""
+    parts = [ctx.get("problem"), ctx.get("description"), ctx.get("hypothesis")]
+    return "\n".join(p for p in parts if p)
+
+async def _verify_contrast(seed_abs: str, verified: List[Dict[str, Any]], db: AsyncSession = None) -> None:
+    """
+    Contrast verification stage: classify every 'contrast' candidate against the
+    seed in one batched, cached stance call and fold the verdict into its score.
+    Mutates the verified entries in place.
+    """
+    contrast = [v for v in verified if v.get("cand_relationship") == "contrast"]
+    if not contrast or not (seed_abs or "").strip():
+        return
+    pairs = [(seed_abs, v["work"].get("abstract") or "") for v in contrast]
+    verdicts = await stance.classify_pairs(pairs, db)
+    for v, verdict in zip(contrast, verdicts):
+        if verdict is None:
+            continue
+        w = v["work"]
+        v["vrf"] = {**v["vrf"], "stance": verdict}
+        v["score"] = scorer.mix(rel_llm=v["rel_score"], verify_strength=v["vrf"]["strength"],
+                                year=w.get("year"), is_oa=w.get("is_oa", False), stance=verdict)
+        logger.debug("contrast stance for %s: %s -> score=%.3f", w.get("id"), verdict, v["score"])
+
 async def suggest_one(
     node_id: str,
     relationship: str = "auto",
     exclude_ids: Optional[List[str]] = None,
-    db: Session = None,     
+    db: AsyncSession = None,     
    
 ) -> Dict[str, Any]:
     """
@@ -29,7 +57,7 @@ async def suggest_one(
     ctx = await memory.get_node_context(int(node_id), db)
 
     # 2) LLM candidates
-    print(f"[orch] generating candidates for node {node_id} with relationship: {relationship}")
+    logger.info("generating candidates", extra={"node_id": node_id, "relationship": relationship})
     
     # Try different strategies based on relationship type
     if relationship == "prior":
@@ -37,7 +65,7 @@ async def suggest_one(
         cands = await llm.generate_candidates(ctx, relationship="prior", k=12)
         # If we get the same results, try with a different approach
         if len(cands) > 0 and any("Salient Object Detection" in c.get("title", "") for c in cands):
-            print("[orch] Got same results for prior, trying with different context")
+            logger.debug("got same results for prior, trying with different context")
             # Modify context to emphasize older work
             modified_ctx = ctx.copy()
             modified_ctx["problem"] = f"Foundational work for {ctx.get('problem', 'this topic')} - focus on classic papers"
@@ -46,7 +74,7 @@ async def suggest_one(
         # For builds_on, try with emphasis on recent work
         cands = await llm.generate_candidates(ctx, relationship="builds_on", k=12)
         if len(cands) > 0 and any("Salient Object Detection" in c.get("title", "") for c in cands):
-            print("[orch] Got same results for builds_on, trying with different context")
+            logger.debug("got same results for builds_on, trying with different context")
             # Modify context to emphasize recent work
             modified_ctx = ctx.copy()
             modified_ctx["problem"] = f"Recent advances in {ctx.get('problem', 'this topic')} - focus on 2020+ papers"
@@ -55,30 +83,29 @@ async def suggest_one(
         # For similar work, use standard approach
         cands = await llm.generate_candidates(ctx, relationship=relationship, k=12)
     
-    print(f"[orch] LLM candidates count: {len(cands) if isinstance(cands, list) else 'N/A'}")
-    print(f"[orch] First few candidates: {cands[:3] if isinstance(cands, list) and len(cands) > 0 else 'None'}")
     if callable(cands):
         raise TypeError("BUG: cands is a function; did you forget to CALL llm.generate_candidates?")
     if not isinstance(cands, list):
         raise TypeError(f"BUG: cands should be list, got {type(cands).__name__}")
+    logger.debug("LLM candidates", extra={"count": len(cands), "payload": cands})
 
     verified: List[Dict[str, Any]] = []
     for idx, c in enumerate(cands):
-        print(f"[orch] cand[{idx}] doi={c.get('doi')} title={c.get('title')}")
+        logger.debug("cand[%d] doi=%s title=%s", idx, c.get("doi"), c.get("title"))
         work = await openalex.resolve_by_doi_or_title(c.get("doi"), c.get("title"))
         if callable(work):
             raise TypeError("BUG: work is a function; did you forget to CALL resolve_by_doi_or_title?")
         if not work:
-            print(f"[orch] cand[{idx}] unresolved by OpenAlex; skipping")
+            logger.debug("cand[%d] unresolved by OpenAlex; skipping", idx)
             continue
         if work["id"] in exclude_ids:
-            print(f"[orch] cand[{idx}] excluded by id {work['id']}")
+            logger.debug("cand[%d] excluded by id %s", idx, work["id"])
             continue
 
         # 3) Verify validity in OpenAlex (seedless)
         vrf = await openalex.verify_validity(work)
         if not vrf["ok"]:
-            print(f"[orch] cand[{idx}] failed validity: {vrf}")
+            logger.debug("cand[%d] failed validity", idx, extra={"payload": vrf})
             continue
 
         # Carry over LLM-suggested relationship as a hint
@@ -86,14 +113,20 @@ async def suggest_one(
 
         # 4) Score
         rel_score = await llm.relevance_score(ctx, work)
-        print(f"[orch] cand[{idx}] rel_score={rel_score:.3f} verify_strength={vrf['strength']}")
+        logger.debug("cand[%d] rel_score=%.3f verify_strength=%s", idx, rel_score, vrf["strength"])
         score = scorer.mix(rel_llm=rel_score, verify_strength=vrf["strength"],
                            year=work.get("year"), is_oa=work.get("is_oa", False))
 
-        verified.append({"work": work, "why": c.get("why",""), "vrf": vrf, "score": score, "cand_relationship": cand_rel})
+        verified.append({"work": work, "why": c.get("why",""), "vrf": vrf, "score": score, "rel_score": rel_score, "cand_relationship": cand_rel})
+
+    # Keep the resolved abstracts locally so later reads need no OpenAlex call
+    await db.run_sync(abstracts.remember, [v["work"] for v in verified])
+
+    # 4b) Contrast candidates must actually contradict the node
+    await _verify_contrast(_node_abstract(ctx), verified, db)
 
     if not verified:
-        print("[orch] no verified candidates after filtering")
+        logger.info("no verified candidates after filtering", extra={"node_id": node_id, "relationship": relationship})
         raise NoCandidateError("No verified candidate")
 
     best = max(verified, key=lambda x: x["score"])
@@ -117,7 +150,7 @@ async def suggest_one(
         "why_relevant": best["why"],
     }
     
-    print(f"[orch] Final result for relationship {relationship}: {result['title']} (relationship: {result['relationship']})")
+    logger.info("suggested %r", result["title"], extra={"node_id": node_id, "relationship": result["relationship"]})
     return result
 
 def _parse_doi_from_link(link: str) -> Optional[str]:
@@ -136,7 +169,7 @@ async def suggest_one_from_literature(
     base_openalex_id: Optional[str] = None,
     relationship: str = "auto",
     exclude_ids: Optional[List[str]] = None,
-    db: Session = None,
+    db: AsyncSession = None,
 ) -> Dict[str, Any]:
     """
     Suggest one paper based on a base literature item plus node context.
@@ -153,7 +186,7 @@ async def suggest_one_from_literature(
         try:
             base_work = await openalex.get_work(base_openalex_id)
         except Exception as e:
-            print(f"[orch] failed to get base by openalex id {base_openalex_id}: {e}")
+            logger.warning("failed to get base by openalex id %s: %s", base_openalex_id, e)
     if base_work is None and base_link:
         doi = _parse_doi_from_link(base_link)
         base_work = await openalex.resolve_by_doi_or_title(doi, base_link)
@@ -161,24 +194,24 @@ async def suggest_one_from_literature(
         raise ValueError("Base literature cannot be resolved via OpenAlex (provide openalex_id or DOI/link)")
 
     # Generate candidates conditioned on base
-    print("[orch] generating candidates (from_base) for node", node_id)
+    logger.info("generating candidates (from_base)", extra={"node_id": node_id, "relationship": relationship})
     cands = await llm.generate_candidates_from_base(ctx, base_work, relationship=relationship, k=12)
-    print(f"[orch] LLM candidates count (from_base): {len(cands) if isinstance(cands, list) else 'N/A'}")
+    logger.debug("LLM candidates (from_base)", extra={"count": len(cands), "payload": cands})
 
     verified: List[Dict[str, Any]] = []
     for idx, c in enumerate(cands):
-        print(f"[orch] (from_base) cand[{idx}] doi={c.get('doi')} title={c.get('title')}")
+        logger.debug("(from_base) cand[%d] doi=%s title=%s", idx, c.get("doi"), c.get("title"))
         work = await openalex.resolve_by_doi_or_title(c.get("doi"), c.get("title"))
         if not work:
-            print(f"[orch] (from_base) cand[{idx}] unresolved by OpenAlex; skipping")
+            logger.debug("(from_base) cand[%d] unresolved by OpenAlex; skipping", idx)
             continue
         if work["id"] in exclude_ids:
-            print(f"[orch] (from_base) cand[{idx}] excluded by id {work['id']}")
+            logger.debug("(from_base) cand[%d] excluded by id %s", idx, work["id"])
             continue
 
         vrf = await openalex.verify_validity(work)
         if not vrf["ok"]:
-            print(f"[orch] (from_base) cand[{idx}] failed validity: {vrf}")
+            logger.debug("(from_base) cand[%d] failed validity", idx, extra={"payload": vrf})
             continue
 
         cand_rel = c.get("relationship", relationship)
@@ -190,20 +223,23 @@ async def suggest_one_from_literature(
             base_year, cand_year = 0, 0
         if base_year and cand_year:
             if cand_rel == "prior" and not (cand_year < base_year):
-                print(f"[orch] (from_base) cand[{idx}] violates prior year constraint: cand {cand_year} !< base {base_year}")
+                logger.debug("(from_base) cand[%d] violates prior year constraint: cand %s !< base %s", idx, cand_year, base_year)
                 continue
             if cand_rel == "builds_on" and not (cand_year >= base_year):
-                print(f"[orch] (from_base) cand[{idx}] violates builds_on year constraint: cand {cand_year} !>= base {base_year}")
+                logger.debug("(from_base) cand[%d] violates builds_on year constraint: cand %s !>= base %s", idx, cand_year, base_year)
                 continue
         rel_score = await llm.relevance_score(ctx, work)
-        print(f"[orch] (from_base) cand[{idx}] rel_score={rel_score:.3f} verify_strength={vrf['strength']}")
+        logger.debug("(from_base) cand[%d] rel_score=%.3f verify_strength=%s", idx, rel_score, vrf["strength"])
         score = scorer.mix(rel_llm=rel_score, verify_strength=vrf["strength"],
                            year=work.get("year"), is_oa=work.get("is_oa", False))
 
-        verified.append({"work": work, "why": c.get("why",""), "vrf": vrf, "score": score, "cand_relationship": cand_rel})
+        verified.append({"work": work, "why": c.get("why",""), "vrf": vrf, "score": score, "rel_score": rel_score, "cand_relationship": cand_rel})
+
+    await db.run_sync(abstracts.remember, [base_work] + [v["work"] for v in verified])
+    await _verify_contrast(base_work.get("abstract") or "", verified, db)
 
     if not verified:
-        print("[orch] (from_base) no verified candidates after filtering")
+        logger.info("no verified candidates after filtering (from_base)", extra={"node_id": node_id, "relationship": relationship})
         raise NoCandidateError("No verified candidate")
 
     best = max(verified, key=lambda x: x["score"])
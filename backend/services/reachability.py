@@ -0,0 +1,406 @@
+# backend/services/reachability.py
+"""
+Transitive closure of the experiment graph as packed bitsets.
+
+Every node owns a row in two bit matrices (NumPy uint8, one bit per node):
+its descendants and its ancestors. Inserting u -> v ORs v's descendants into
+the rows of u and all its ancestors (and symmetrically for ancestors), so the
+closure is updated with a handful of vectorized ORs. Deleting an edge
+recomputes only the rows of the nodes that could have lost reachability (the
+ancestors of u and the descendants of v), children first. "What depends on
+X", "how many downstream nodes" and "who feeds into X" are then a row read
+and a popcount.
+
+The closure over all edges is kept current; closures restricted to some
+relationship types are built on first use and maintained the same way.
+Edges the topological order leaves out (cycles stored before they were
+rejected) are ignored here as well.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import topo_order
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.experiment import Experiment, ExperimentRelationship, ExperimentStatus, RelationshipType
+
+INITIAL_CAPACITY = 256
+FILTERED_CACHE_SIZE = 4
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+def _bit(row: int) -> Tuple[int, int]:
+    """(byte index, mask) of a row's bit, in np.packbits' big-endian bit order."""
+    return row >> 3, 0x80 >> (row & 7)
+
+
+class _Closure:
+    """Descendant/ancestor bit matrices over the edges of some relationship types (None = all)."""
+
+    def __init__(self, types: Optional[FrozenSet[RelationshipType]], capacity: int):
+        self.types = types
+        self.desc = np.zeros((capacity, capacity // 8), dtype=np.uint8)
+        self.anc = np.zeros((capacity, capacity // 8), dtype=np.uint8)
+        self.out: Dict[int, Dict[int, int]] = {}    # row -> {child row: parallel edge count}
+        self.inn: Dict[int, Dict[int, int]] = {}
+
+    def accepts(self, rel_type: RelationshipType) -> bool:
+        return self.types is None or rel_type in self.types
+
+    def grow(self, capacity: int):
+        for name in ("desc", "anc"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, capacity // 8), dtype=np.uint8)
+            new[:old.shape[0], :old.shape[1]] = old
+            setattr(self, name, new)
+
+    @staticmethod
+    def members(bits: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(bits))
+
+    def _link(self, a: int, b: int):
+        self.out.setdefault(a, {})[b] = self.out.get(a, {}).get(b, 0) + 1
+        self.inn.setdefault(b, {})[a] = self.inn.get(b, {}).get(a, 0) + 1
+
+    def _unlink(self, a: int, b: int) -> bool:
+        """Drop one a -> b edge; True if no parallel edge remains."""
+        for adj, x, y in ((self.out, a, b), (self.inn, b, a)):
+            n = adj[x][y] - 1
+            if n:
+                adj[x][y] = n
+            else:
+                del adj[x][y]
+        return b not in self.out[a]
+
+    def build(self, order: List[int], edges: Iterable[Tuple[int, int]]):
+        """Full closure; `order` is a topological order of rows."""
+        for a, b in edges:
+            self._link(a, b)
+        self._recompute(self.desc, self.out, list(reversed(order)))
+        self._recompute(self.anc, self.inn, order)
+
+    def _recompute(self, matrix: np.ndarray, adj: Dict[int, Dict[int, int]], rows: List[int]):
+        """Rebuild rows from their neighbours; `rows` must list neighbours before dependents."""
+        for r in rows:
+            nbrs = list(adj.get(r, ()))
+            if not nbrs:
+                matrix[r] = 0
+                continue
+            acc = np.bitwise_or.reduce(matrix[nbrs], axis=0)
+            for n in nbrs:
+                byte, mask = _bit(n)
+                acc[byte] |= mask
+            matrix[r] = acc
+
+    def add_edge(self, a: int, b: int):
+        self._link(a, b)
+        byte, mask = _bit(b)
+        if self.desc[a, byte] & mask:
+            return  # b was already reachable from a: closure unchanged
+        down = self.desc[b].copy()
+        down[byte] |= mask
+        up = self.anc[a].copy()
+        byte_a, mask_a = _bit(a)
+        up[byte_a] |= mask_a
+        sources = np.append(self.members(self.anc[a]), a)
+        targets = np.append(self.members(self.desc[b]), b)
+        self.desc[sources] |= down
+        self.anc[targets] |= up
+
+    def remove_edges(self, pairs: Iterable[Tuple[int, int]], dropped: Iterable[int] = ()):
+        """Unlink edges (and clear dropped rows), then recompute the rows that may have lost bits."""
+        dropped = set(dropped)
+        lost_desc: Set[int] = set()
+        lost_anc: Set[int] = set()
+        for a, b in pairs:
+            if self._unlink(a, b):
+                lost_desc.add(a)
+                lost_desc.update(self.members(self.anc[a]).tolist())
+                lost_anc.add(b)
+                lost_anc.update(self.members(self.desc[b]).tolist())
+        for r in dropped:
+            lost_desc.update(self.members(self.anc[r]).tolist())
+            lost_anc.update(self.members(self.desc[r]).tolist())
+            self.desc[r] = 0
+            self.anc[r] = 0
+            self.out.pop(r, None)
+            self.inn.pop(r, None)
+        lost_desc -= dropped
+        lost_anc -= dropped
+        self._recompute(self.desc, self.out, self._local_order(lost_desc, self.out))
+        self._recompute(self.anc, self.inn, self._local_order(lost_anc, self.inn))
+
+    @staticmethod
+    def _local_order(rows: Set[int], adj: Dict[int, Dict[int, int]]) -> List[int]:
+        """Rows ordered so that each comes after its neighbours (via adj) within the set."""
+        done: Set[int] = set()
+        post: List[int] = []
+        for root in rows:
+            if root in done:
+                continue
+            done.add(root)
+            stack = [(root, iter(adj.get(root, ())))]
+            while stack:
+                node, it = stack[-1]
+                for nxt in it:
+                    if nxt in rows and nxt not in done:
+                        done.add(nxt)
+                        stack.append((nxt, iter(adj.get(nxt, ()))))
+                        break
+                else:
+                    post.append(node)
+                    stack.pop()
+        return post
+
+
+class ReachabilityIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._capacity = INITIAL_CAPACITY
+        self._row: Dict[int, int] = {}                  # node id -> row
+        self._ids = np.full(self._capacity, -1, dtype=np.int64)  # row -> node id
+        self._free: List[int] = []
+        self._status: Dict[int, ExperimentStatus] = {}
+        self._edges: Dict[int, Tuple[int, int, RelationshipType]] = {}  # edge id -> (from, to, type)
+        self._all = _Closure(None, self._capacity)
+        self._filtered: "OrderedDict[FrozenSet[RelationshipType], _Closure]" = OrderedDict()
+        self._revision = 0
+        self._critical: Dict[Tuple[ExperimentStatus, ...], Tuple[int, List[int]]] = {}
+
+    # ----------------- building / incremental updates -----------------
+    def load(self, db: Session):
+        topo_order.index.ensure_loaded(db)
+        with self._lock:
+            self._reset()
+            cyclic = set(topo_order.index.cyclic_edges())
+            for node_id, status in db.query(Experiment.id, Experiment.status).all():
+                self._add_node(node_id, status)
+            for eid, u, v, rel in db.query(
+                ExperimentRelationship.id,
+                ExperimentRelationship.from_experiment_id,
+                ExperimentRelationship.to_experiment_id,
+                ExperimentRelationship.relationship_type,
+            ).all():
+                if eid not in cyclic and u in self._row and v in self._row:
+                    self._edges[eid] = (u, v, RelationshipType(rel))
+            self._build(self._all)
+            self._loaded = True
+
+    def ensure_loaded(self, db: Session):
+        if not self._loaded:
+            self.load(db)
+
+    def _topological_rows(self) -> List[int]:
+        order = topo_order.index.order()
+        return [self._row[n] for n in order if n in self._row]
+
+    def _build(self, closure: _Closure):
+        closure.build(
+            self._topological_rows(),
+            ((self._row[u], self._row[v]) for u, v, rel in self._edges.values() if closure.accepts(rel)),
+        )
+
+    def _closures(self) -> List[_Closure]:
+        return [self._all, *self._filtered.values()]
+
+    def _changed(self):
+        self._revision += 1
+        self._critical.clear()
+
+    def _add_node(self, node_id: int, status) -> int:
+        row = self._row.get(node_id)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                row = len(self._row)
+                if row >= self._capacity:
+                    self._capacity *= 2
+                    for closure in self._closures():
+                        closure.grow(self._capacity)
+                    ids = np.full(self._capacity, -1, dtype=np.int64)
+                    ids[:len(self._ids)] = self._ids
+                    self._ids = ids
+            self._row[node_id] = row
+            self._ids[row] = node_id
+        self._status[node_id] = ExperimentStatus(status) if status is not None else ExperimentStatus.PLANNED
+        return row
+
+    def add_node(self, node_id: int, status=None):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._add_node(node_id, status)
+            self._changed()
+
+    def set_status(self, node_id: int, status):
+        if not self._loaded or node_id not in self._row:
+            return
+        with self._lock:
+            self._status[node_id] = ExperimentStatus(status)
+            self._changed()
+
+    def upsert_edge(self, edge_id: int, from_id: int, to_id: int, rel_type):
+        """Add an edge, or move/retype an existing one."""
+        if not self._loaded:
+            return
+        rel_type = RelationshipType(rel_type)
+        with self._lock:
+            if self._edges.get(edge_id) == (from_id, to_id, rel_type):
+                return
+            self._remove_edges([edge_id])
+            for n in (from_id, to_id):
+                if n not in self._row:
+                    self._add_node(n, None)
+            self._edges[edge_id] = (from_id, to_id, rel_type)
+            a, b = self._row[from_id], self._row[to_id]
+            for closure in self._closures():
+                if closure.accepts(rel_type):
+                    closure.add_edge(a, b)
+            self._changed()
+
+    def remove_edges(self, edge_ids: Iterable[int]):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._remove_edges(edge_ids)
+            self._changed()
+
+    def _remove_edges(self, edge_ids: Iterable[int]):
+        gone = [self._edges.pop(eid) for eid in edge_ids if eid in self._edges]
+        if not gone:
+            return
+        for closure in self._closures():
+            closure.remove_edges(
+                (self._row[u], self._row[v]) for u, v, rel in gone if closure.accepts(rel)
+            )
+
+    def remove_nodes(self, node_ids: Iterable[int]):
+        """Drop nodes and every edge touching them."""
+        if not self._loaded:
+            return
+        with self._lock:
+            gone = {n for n in node_ids if n in self._row}
+            if not gone:
+                return
+            dead = [eid for eid, (u, v, _) in self._edges.items() if u in gone or v in gone]
+            edges = [self._edges.pop(eid) for eid in dead]
+            rows = [self._row[n] for n in gone]
+            for closure in self._closures():
+                closure.remove_edges(
+                    ((self._row[u], self._row[v]) for u, v, rel in edges if closure.accepts(rel)),
+                    dropped=rows,
+                )
+            for n in gone:
+                row = self._row.pop(n)
+                self._ids[row] = -1
+                self._free.append(row)
+                self._status.pop(n, None)
+            self._changed()
+
+    # ----------------- queries -----------------
+    def _closure(self, types: Optional[Iterable[RelationshipType]]) -> _Closure:
+        """Closure over the given relationship types (all when None), built on first use."""
+        if not types:
+            return self._all
+        key = frozenset(RelationshipType(t) for t in types)
+        if key == frozenset(RelationshipType):
+            return self._all
+        closure = self._filtered.get(key)
+        if closure is None:
+            closure = _Closure(key, self._capacity)
+            self._build(closure)
+            self._filtered[key] = closure
+            while len(self._filtered) > FILTERED_CACHE_SIZE:
+                self._filtered.popitem(last=False)
+        self._filtered.move_to_end(key)
+        return closure
+
+    def has_node(self, node_id: int) -> bool:
+        return node_id in self._row
+
+    def descendants(self, node_id: int, types: Optional[Iterable[RelationshipType]] = None) -> List[int]:
+        with self._lock:
+            bits = self._closure(types).desc[self._row[node_id]]
+            return sorted(self._ids[_Closure.members(bits)].tolist())
+
+    def ancestors(self, node_id: int, types: Optional[Iterable[RelationshipType]] = None) -> List[int]:
+        with self._lock:
+            bits = self._closure(types).anc[self._row[node_id]]
+            return sorted(self._ids[_Closure.members(bits)].tolist())
+
+    def reaches(self, from_id: int, to_id: int) -> bool:
+        with self._lock:
+            byte, mask = _bit(self._row[to_id])
+            return bool(self._all.desc[self._row[from_id], byte] & mask)
+
+    def counts(self, types: Optional[Iterable[RelationshipType]] = None) -> Dict[int, Tuple[int, int]]:
+        """node id -> (descendant count, ancestor count), one popcount over each matrix."""
+        with self._lock:
+            closure = self._closure(types)
+            rows = np.fromiter(self._row.values(), dtype=np.int64, count=len(self._row))
+            desc = _POPCOUNT[closure.desc[rows]].sum(axis=1)
+            anc = _POPCOUNT[closure.anc[rows]].sum(axis=1)
+            return {
+                int(node_id): (int(d), int(a))
+                for node_id, d, a in zip(self._ids[rows].tolist(), desc, anc)
+            }
+
+    def impact(self, node_id: int, types: Optional[Iterable[RelationshipType]] = None) -> Dict[str, List[int]]:
+        """Descendants reachable through the given relationship types, grouped by status."""
+        with self._lock:
+            grouped: Dict[str, List[int]] = {s.value: [] for s in ExperimentStatus}
+            for n in self.descendants(node_id, types):
+                grouped[self._status[n].value].append(n)
+            return grouped
+
+    def critical_path(self, statuses: Iterable[ExperimentStatus] = (ExperimentStatus.PLANNED,)) -> Tuple[int, List[int]]:
+        """
+        Longest chain of edges whose nodes all have one of `statuses`, as
+        (number of nodes, node ids in order). Cached until the graph changes.
+        """
+        key = tuple(sorted(ExperimentStatus(s) for s in statuses))
+        with self._lock:
+            hit = self._critical.get(key)
+            if hit is not None:
+                return hit
+            allowed = set(key)
+            best: Dict[int, int] = {}
+            prev: Dict[int, Optional[int]] = {}
+            inn = self._all.inn
+            for node_id in topo_order.index.order():
+                if node_id not in self._row or self._status.get(node_id) not in allowed:
+                    continue
+                length, parent = 1, None
+                for p_row in inn.get(self._row[node_id], ()):
+                    p = int(self._ids[p_row])
+                    if p in best and best[p] + 1 > length:
+                        length, parent = best[p] + 1, p
+                best[node_id] = length
+                prev[node_id] = parent
+            if not best:
+                result = (0, [])
+            else:
+                end = max(best, key=lambda n: (best[n], -n))
+                path = [end]
+                while prev[path[-1]] is not None:
+                    path.append(prev[path[-1]])
+                result = (best[end], path[::-1])
+            self._critical[key] = result
+            return result
+
+
+index = ReachabilityIndex()
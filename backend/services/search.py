@@ -0,0 +1,196 @@
+# backend/services/search.py
+"""
+Full-text search over experiments and literature.
+
+On SQLite, FTS5 external-content tables mirror the searchable columns and are
+kept in sync by triggers, so writes need no application code and queries are
+a ranked (bm25) index lookup with highlighted snippets. Other databases fall
+back to an unranked LIKE scan.
+
+Highlights are HTML: the stored text is escaped and only the <mark> tags
+around matches are markup, so clients can insert them as-is.
+"""
+from __future__ import annotations
+
+import html
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import text, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.experiment import Experiment
+from app.models.literature import Literature
+
+EXPERIMENT_COLUMNS = ("title", "description", "hypothesis", "result", "motivation")
+LITERATURE_COLUMNS = ("title", "venue")
+# bm25 column weights, in column order
+EXPERIMENT_WEIGHTS = (10.0, 2.0, 2.0, 1.0, 1.0)
+LITERATURE_WEIGHTS = (5.0, 1.0)
+
+MARK_OPEN, MARK_CLOSE = "<mark>", "</mark>"
+# What FTS5 puts around matches: private-use characters, swapped for the tags after escaping
+_SENTINEL_OPEN, _SENTINEL_CLOSE = "\ue000", "\ue001"
+SNIPPET_TOKENS = 12
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _marked(fragment: str | None) -> str | None:
+    """HTML-escape highlighter output and turn its sentinels into <mark> tags."""
+    if fragment is None:
+        return None
+    return html.escape(fragment).replace(_SENTINEL_OPEN, MARK_OPEN).replace(_SENTINEL_CLOSE, MARK_CLOSE)
+
+
+def _fts_ddl(table: str, source: str, columns: tuple) -> List[str]:
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in columns)
+    old_vals = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+        f"{cols}, content='{source}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {cols} ON {source} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+    ]
+
+
+FTS_TABLES = {
+    "experiments_fts": ("experiments", EXPERIMENT_COLUMNS),
+    "literature_fts": ("literature", LITERATURE_COLUMNS),
+}
+
+
+def install(engine: Engine) -> None:
+    """Create the FTS tables and triggers (SQLite only); index existing rows on first install."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        existing = {
+            name for (name,) in conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%_fts'")
+            )
+        }
+        for table, (source, columns) in FTS_TABLES.items():
+            for stmt in _fts_ddl(table, source, columns):
+                conn.execute(text(stmt))
+            if table not in existing:
+                conn.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
+
+
+def fts_query(q: str, prefix: bool = True) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word quoted and ANDed, and
+    prefix-matched so partial input ("pcr optim") and plurals find results.
+    """
+    terms = _TERM_RE.findall(q or "")
+    star = "*" if prefix else ""
+    return " AND ".join(f'"{t}"{star}' for t in terms)
+
+
+def _bm25(table: str, weights: tuple) -> str:
+    return f"bm25({table}, {', '.join(str(w) for w in weights)})"
+
+
+def _search_experiments_fts(db: Session, match: str, limit: int) -> List[Dict[str, Any]]:
+    rows = db.execute(text(f"""
+        SELECT e.id, e.title, e.status,
+               highlight(experiments_fts, 0, :open, :close) AS title_highlight,
+               snippet(experiments_fts, -1, :open, :close, '…', :tokens) AS snippet,
+               {_bm25('experiments_fts', EXPERIMENT_WEIGHTS)} AS rank
+        FROM experiments_fts
+        JOIN experiments e ON e.id = experiments_fts.rowid
+        WHERE experiments_fts MATCH :match
+        ORDER BY rank
+        LIMIT :limit
+    """), {"match": match, "open": _SENTINEL_OPEN, "close": _SENTINEL_CLOSE, "tokens": SNIPPET_TOKENS, "limit": limit})
+    return [
+        {
+            "id": r.id,
+            "title": r.title,
+            "status": r.status.lower() if r.status else None,
+            "title_highlight": _marked(r.title_highlight),
+            "snippet": _marked(r.snippet),
+            "score": round(-r.rank, 6),
+        }
+        for r in rows
+    ]
+
+
+def _search_literature_fts(db: Session, match: str, limit: int) -> List[Dict[str, Any]]:
+    rows = db.execute(text(f"""
+        SELECT l.id, l.experiment_id, l.title, l.venue, l.year, l.link,
+               highlight(literature_fts, 0, :open, :close) AS title_highlight,
+               snippet(literature_fts, -1, :open, :close, '…', :tokens) AS snippet,
+               {_bm25('literature_fts', LITERATURE_WEIGHTS)} AS rank
+        FROM literature_fts
+        JOIN literature l ON l.id = literature_fts.rowid
+        JOIN experiments e ON e.id = l.experiment_id
+        WHERE literature_fts MATCH :match
+        ORDER BY rank
+        LIMIT :limit
+    """), {"match": match, "open": _SENTINEL_OPEN, "close": _SENTINEL_CLOSE, "tokens": SNIPPET_TOKENS, "limit": limit})
+    return [
+        {
+            "id": r.id,
+            "node_id": r.experiment_id,
+            "title": r.title,
+            "venue": r.venue,
+            "year": r.year,
+            "link": r.link,
+            "title_highlight": _marked(r.title_highlight),
+            "snippet": _marked(r.snippet),
+            "score": round(-r.rank, 6),
+        }
+        for r in rows
+    ]
+
+
+def _search_like(db: Session, q: str, types: List[str], limit: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Unranked fallback for databases without FTS5."""
+    terms = _TERM_RE.findall(q or "")
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    if "experiments" in types:
+        query = db.query(Experiment.id, Experiment.title, Experiment.status)
+        for t in terms:
+            query = query.filter(or_(*(getattr(Experiment, c).ilike(f"%{t}%") for c in EXPERIMENT_COLUMNS)))
+        out["experiments"] = [
+            {"id": i, "title": title, "status": status, "title_highlight": html.escape(title) if title else title, "snippet": None, "score": None}
+            for i, title, status in query.limit(limit).all()
+        ]
+    if "literature" in types:
+        query = db.query(
+            Literature.id, Literature.experiment_id, Literature.title, Literature.venue, Literature.year, Literature.link,
+        ).join(Experiment, Experiment.id == Literature.experiment_id)
+        for t in terms:
+            query = query.filter(or_(*(getattr(Literature, c).ilike(f"%{t}%") for c in LITERATURE_COLUMNS)))
+        out["literature"] = [
+            {"id": i, "node_id": node_id, "title": title, "venue": venue, "year": year, "link": link,
+             "title_highlight": html.escape(title) if title else title, "snippet": None, "score": None}
+            for i, node_id, title, venue, year, link in query.limit(limit).all()
+        ]
+    return out
+
+
+def search(db: Session, q: str, types: List[str], limit: int = 20, prefix: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+    """Ranked matches per type ("experiments", "literature"), best first."""
+    if db.get_bind().dialect.name != "sqlite":
+        return _search_like(db, q, types, limit)
+    match = fts_query(q, prefix)
+    if not match:
+        return {t: [] for t in types}
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    if "experiments" in types:
+        out["experiments"] = _search_experiments_fts(db, match, limit)
+    if "literature" in types:
+        out["literature"] = _search_literature_fts(db, match, limit)
+    return out
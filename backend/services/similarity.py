@@ -0,0 +1,324 @@
+# backend/services/similarity.py
+"""
+In-memory similarity index over experiments.
+
+Each experiment is embedded as a hashed bag-of-words vector over its text
+fields (title, description, hypothesis, result) and scored against the rest of
+the graph with one vectorized TF-IDF cosine pass. Shared literature adds a
+Jaccard bonus. The index is built lazily from the DB and kept current by the
+node/literature endpoints, so no LLM call is needed to rank candidates.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Set, Iterable
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import literature_store, reachability
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.experiment import (
+    Experiment,
+    ExperimentRelationship,
+    ExperimentStatus,
+    RelationshipType,
+)
+from app.models.literature import Literature
+
+N_FEATURES = 1 << 11
+TEXT_WEIGHT = 0.8
+LIT_WEIGHT = 0.2
+
+# Finished work comes before work that is still planned (or postponed)
+_STATUS_STAGE = {ExperimentStatus.COMPLETED: 0, ExperimentStatus.PLANNED: 1, ExperimentStatus.POSTPONED: 1}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]{2,}")
+_STOP_WORDS = {
+    "the", "and", "for", "with", "from", "this", "that", "these", "those", "are",
+    "was", "were", "been", "being", "have", "has", "had", "will", "would", "could",
+    "should", "into", "onto", "over", "under", "than", "then", "when", "which",
+    "while", "our", "its", "their", "not", "but", "all", "any", "can", "may",
+    "of", "to", "in", "on", "at", "by", "an", "or", "is", "be", "as", "it", "we",
+}
+
+# Cue words looked up in the child's text to guess how it relates to its parent
+_REL_CUES = [
+    (RelationshipType.REFUTES, ("refute", "contradict", "disprove", "challenge")),
+    (RelationshipType.VALIDATES, ("validat", "replicat", "reproduc", "verif", "confirm")),
+    (RelationshipType.IMPLEMENTS, ("implement", "apply", "deploy", "prototype")),
+    (RelationshipType.EXTENDS, ("extend", "build on", "builds on", "improv", "follow-up", "follow up")),
+    (RelationshipType.SUPPORTS, ("support", "evidence for", "consistent with")),
+]
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOP_WORDS]
+
+
+def _text_vector(exp: Experiment) -> np.ndarray:
+    """Log-scaled hashed term frequencies; the title counts twice."""
+    vec = np.zeros(N_FEATURES, dtype=np.float32)
+    fields = [exp.title, exp.title, exp.description, exp.hypothesis, exp.result]
+    for field in fields:
+        for tok in _tokens(field):
+            vec[zlib.crc32(tok.encode()) % N_FEATURES] += 1.0
+    np.log1p(vec, out=vec)
+    return vec
+
+
+def literature_key(lit: Literature) -> Optional[str]:
+    """Stable per-paper key used for literature overlap."""
+    return lit.canonical_key or literature_store.canonical_key(lit.openalex_id, lit.doi, lit.link)
+
+
+def _child_text(exp: Dict[str, Any]) -> str:
+    return " ".join(filter(None, [exp.get("title"), exp.get("description"), exp.get("hypothesis")])).lower()
+
+
+def suggest_relationship(parent: Dict[str, Any], child: Dict[str, Any]) -> RelationshipType:
+    """
+    Guess the RelationshipType for a parent -> child edge from cue words in the
+    child and the status of both nodes.
+    """
+    text = _child_text(child)
+    for rel_type, cues in _REL_CUES:
+        if any(cue in text for cue in cues):
+            return rel_type
+    if parent.get("status") == ExperimentStatus.COMPLETED and child.get("status") == ExperimentStatus.PLANNED:
+        return RelationshipType.LEADS_TO
+    if parent.get("status") == ExperimentStatus.PLANNED and child.get("status") == ExperimentStatus.PLANNED:
+        return RelationshipType.REQUIRES
+    return RelationshipType.RELATED_TO
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def precedence(first: Dict[str, Any], then: Dict[str, Any]) -> float:
+    """
+    How likely `first` precedes `then` in the research flow, from 0 to 1:
+    a completed experiment precedes a planned one; with the same stage the
+    one created earlier leans first. 0.5 when nothing tells them apart.
+    """
+    a, b = _STATUS_STAGE.get(first.get("status")), _STATUS_STAGE.get(then.get("status"))
+    if a is not None and b is not None and a != b:
+        return 1.0 if a < b else 0.0
+    t1, t2 = _utc(first.get("created_at")), _utc(then.get("created_at"))
+    if t1 is None or t2 is None or t1 == t2:
+        return 0.5
+    return 0.75 if t1 < t2 else 0.25
+
+
+class SimilarityIndex:
+    """
+    Dense hashed TF matrix with one row per experiment.
+    Rows are swapped out on delete so the matrix stays compact.
+    """
+
+    def __init__(self, n_features: int = N_FEATURES):
+        self._lock = threading.RLock()
+        self._n_features = n_features
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._tf = np.zeros((64, self._n_features), dtype=np.float32)
+        self._df = np.zeros(self._n_features, dtype=np.float32)
+        self._ids: List[int] = []
+        self._row: Dict[int, int] = {}
+        self._meta: Dict[int, Dict[str, Any]] = {}
+        self._lit: Dict[int, Set[str]] = {}
+
+    # ----------------- building / incremental updates -----------------
+    def ensure_loaded(self, db: Session):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._reset()
+            for exp in db.query(Experiment).all():
+                self._upsert(exp)
+            for lit in db.query(Literature).all():
+                key = literature_key(lit)
+                if key:
+                    self._lit.setdefault(lit.experiment_id, set()).add(key)
+            self._loaded = True
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+
+    def upsert(self, exp: Experiment):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._upsert(exp)
+
+    def _upsert(self, exp: Experiment):
+        vec = _text_vector(exp)
+        row = self._row.get(exp.id)
+        if row is None:
+            row = len(self._ids)
+            if row >= self._tf.shape[0]:
+                grown = np.zeros((self._tf.shape[0] * 2, self._n_features), dtype=np.float32)
+                grown[:row] = self._tf[:row]
+                self._tf = grown
+            self._ids.append(exp.id)
+            self._row[exp.id] = row
+        else:
+            self._df -= self._tf[row] > 0
+        self._tf[row] = vec
+        self._df += vec > 0
+        self._meta[exp.id] = {
+            "id": exp.id,
+            "title": exp.title,
+            "description": exp.description,
+            "hypothesis": exp.hypothesis,
+            "status": exp.status,
+            "created_at": exp.created_at,
+        }
+
+    def remove(self, node_ids: Iterable[int]):
+        if not self._loaded:
+            return
+        with self._lock:
+            for node_id in node_ids:
+                row = self._row.pop(node_id, None)
+                self._meta.pop(node_id, None)
+                self._lit.pop(node_id, None)
+                if row is None:
+                    continue
+                self._df -= self._tf[row] > 0
+                last = len(self._ids) - 1
+                if row != last:
+                    moved = self._ids[last]
+                    self._tf[row] = self._tf[last]
+                    self._ids[row] = moved
+                    self._row[moved] = row
+                self._tf[last] = 0
+                self._ids.pop()
+
+    def add_literature(self, node_id: int, key: Optional[str]):
+        if not self._loaded or not key:
+            return
+        with self._lock:
+            self._lit.setdefault(node_id, set()).add(key)
+
+    def remove_literature(self, node_id: int, key: Optional[str]):
+        if not self._loaded or not key:
+            return
+        with self._lock:
+            self._lit.get(node_id, set()).discard(key)
+
+    # ----------------- queries -----------------
+    def scores(self, node_id: int) -> Dict[int, Dict[str, float]]:
+        """
+        Score every other experiment against node_id.
+        Returns {other_id: {"score", "text", "literature"}}.
+        """
+        with self._lock:
+            row = self._row.get(node_id)
+            if row is None:
+                return {}
+            n = len(self._ids)
+            idf = np.log((1.0 + n) / (1.0 + self._df)) + 1.0
+            weighted = self._tf[:n] * idf
+            norms = np.linalg.norm(weighted, axis=1)
+            norms[norms == 0] = 1.0
+            text = (weighted @ weighted[row]) / (norms * norms[row])
+
+            own_lit = self._lit.get(node_id, set())
+            out: Dict[int, Dict[str, float]] = {}
+            for i, other in enumerate(self._ids):
+                if other == node_id:
+                    continue
+                other_lit = self._lit.get(other, set())
+                union = len(own_lit | other_lit)
+                jac = len(own_lit & other_lit) / union if union else 0.0
+                score = TEXT_WEIGHT * float(text[i]) + LIT_WEIGHT * jac
+                out[other] = {"score": score, "text": float(text[i]), "literature": jac}
+            return out
+
+    def meta(self, node_id: int) -> Optional[Dict[str, Any]]:
+        return self._meta.get(node_id)
+
+
+index = SimilarityIndex()
+
+
+def suggest_edges(node_id: int, db: Session, k: int = 5, direction: str = "both") -> Dict[str, Any]:
+    """
+    Return the top-k candidate parents and/or children for node_id with a
+    suggested RelationshipType.
+
+    Similarity is weighted by precedence(): parents are candidates that come
+    before the node (finished earlier, or created earlier), children those
+    that come after it; a candidate that clearly belongs on one side is left
+    off the other. Existing neighbours are skipped, as are the node's
+    descendants as parents and its ancestors as children, since those edges
+    would close a cycle.
+    """
+    index.ensure_loaded(db)
+    node = index.meta(node_id)
+    if node is None:
+        raise ValueError("Node not found")
+
+    scored = index.scores(node_id)
+    reachability.index.ensure_loaded(db)
+    if reachability.index.has_node(node_id):
+        descendants = set(reachability.index.descendants(node_id))
+        ancestors = set(reachability.index.ancestors(node_id))
+    else:
+        descendants, ancestors = set(), set()
+    rels = db.query(
+        ExperimentRelationship.from_experiment_id,
+        ExperimentRelationship.to_experiment_id,
+    ).filter(
+        (ExperimentRelationship.from_experiment_id == node_id) |
+        (ExperimentRelationship.to_experiment_id == node_id)
+    ).all()
+    existing_parents = {f for f, t in rels if t == node_id}
+    existing_children = {t for f, t in rels if f == node_id}
+
+    def _rank(skip: Set[int], as_parent: bool) -> List[Dict[str, Any]]:
+        candidates = []
+        for oid, s in scored.items():
+            if oid in skip or s["score"] <= 0:
+                continue
+            other = index.meta(oid) or {}
+            parent, child = (other, node) if as_parent else (node, other)
+            order = precedence(parent, child)
+            if order < 0.5:
+                continue
+            candidates.append((s["score"] * order, oid, s, parent, child, order))
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        return [
+            {
+                "id": oid,
+                "title": (parent if as_parent else child).get("title"),
+                "score": round(score, 4),
+                "text_similarity": round(s["text"], 4),
+                "literature_overlap": round(s["literature"], 4),
+                "precedence": order,
+                "relationship_type": suggest_relationship(parent, child),
+            }
+            for score, oid, s, parent, child, order in candidates[:k]
+        ]
+
+    neighbours = existing_parents | existing_children
+    result: Dict[str, Any] = {"node_id": node_id}
+    if direction in ("both", "parents"):
+        result["parents"] = _rank(neighbours | descendants, as_parent=True)
+    if direction in ("both", "children"):
+        result["children"] = _rank(neighbours | ancestors, as_parent=False)
+    return result
@@ -0,0 +1,78 @@
+# backend/services/stance.py
+"""
+Contrast verification stage: batched stance classification with a DB cache.
+Verdicts are cached by (seed hash, candidate hash) so a pair of abstracts is
+only ever sent to the LLM once. New verdicts are written in a savepoint of the
+caller's session; committing it is left to the caller.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import llm_gemini as llm
+from .abstracts import abstract_hash
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.literature import StanceVerdict
+
+logger = logging.getLogger(__name__)
+
+
+def _insert(db: AsyncSession):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(StanceVerdict)
+
+
+async def classify_pairs(pairs: List[Tuple[str, str]], db: Optional[AsyncSession] = None) -> List[Optional[str]]:
+    """
+    Return a stance verdict per (seed_abs, cand_abs) pair, in input order.
+    Cached verdicts are read in one query; the rest go to the LLM in one
+    batched prompt and are written back (flushed, not committed). Pairs with an
+    empty side are skipped (None).
+    """
+    keys = [
+        (abstract_hash(seed), abstract_hash(cand)) if (seed or "").strip() and (cand or "").strip() else None
+        for seed, cand in pairs
+    ]
+    verdicts: Dict[Tuple[str, str], str] = {}
+
+    wanted = {k for k in keys if k}
+    if db is not None and wanted:
+        cand_hashes = {c for _, c in wanted}
+        rows = (await db.scalars(select(StanceVerdict).where(StanceVerdict.cand_hash.in_(cand_hashes)))).all()
+        verdicts.update({(r.seed_hash, r.cand_hash): r.verdict for r in rows if (r.seed_hash, r.cand_hash) in wanted})
+
+    missing: List[Tuple[str, str]] = []
+    missing_pairs: List[Tuple[str, str]] = []
+    for key, pair in zip(keys, pairs):
+        if key and key not in verdicts and key not in missing:
+            missing.append(key)
+            missing_pairs.append(pair)
+
+    if missing:
+        logger.debug("%d cached, classifying %d pairs", len(verdicts), len(missing))
+        fresh = await llm.stance_batch(missing_pairs)
+        new_rows = []
+        for key, verdict in zip(missing, fresh):
+            if verdict is None:
+                continue
+            verdicts[key] = verdict
+            new_rows.append({"seed_hash": key[0], "cand_hash": key[1], "verdict": verdict})
+        if db is not None and new_rows:
+            # A pair another request cached first keeps its verdict; it is as good as ours
+            stmt = _insert(db).on_conflict_do_nothing(index_elements=["seed_hash", "cand_hash"])
+            try:
+                async with db.begin_nested():
+                    await db.execute(stmt, new_rows)
+            except Exception as e:
+                logger.warning("failed to cache %d stance verdicts: %s", len(new_rows), e)
+
+    return [verdicts.get(k) if k else None for k in keys]
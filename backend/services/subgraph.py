@@ -0,0 +1,111 @@
+# backend/services/subgraph.py
+"""
+Subgraph traversal as a single recursive CTE.
+
+Descendants, ancestors or the undirected neighbourhood of a node are computed
+in the database with WITH RECURSIVE, so fetching or deleting a large branch
+is a fixed number of statements regardless of its size. Works on SQLite and
+PostgreSQL.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, Table, delete, func, insert, literal, select, text, union_all
+from sqlalchemy.orm import Session
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.experiment import Experiment, ExperimentRelationship
+from app.models.literature import Literature
+
+DIRECTIONS = ("descendants", "ancestors", "both")
+
+_rel = ExperimentRelationship.__table__
+# Per-connection scratch table holding the ids of a branch being deleted
+_branch = Table("branch_delete_ids", MetaData(), Column("id", Integer, primary_key=True))
+
+
+def _edges(direction: str):
+    """(src, dst) pairs to follow for the given direction."""
+    down = select(_rel.c.from_experiment_id.label("src"), _rel.c.to_experiment_id.label("dst"))
+    up = select(_rel.c.to_experiment_id.label("src"), _rel.c.from_experiment_id.label("dst"))
+    if direction == "descendants":
+        return down.subquery("edges")
+    if direction == "ancestors":
+        return up.subquery("edges")
+    return union_all(down, up).subquery("edges")
+
+
+def reachable_cte(node_id: int, direction: str = "descendants", depth: Optional[int] = None):
+    """
+    CTE of (id, depth) rows reachable from node_id, the node itself at depth 0.
+    Without a depth bound only ids are tracked (UNION dedupes, so cycles end);
+    with one, a node may appear once per distinct hop count up to `depth`.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of: {', '.join(DIRECTIONS)}")
+    edges = _edges(direction)
+    if depth is None:
+        sub = select(literal(node_id).label("id")).cte("sub", recursive=True)
+        step = select(edges.c.dst).join(sub, edges.c.src == sub.c.id)
+        sub = sub.union(step)
+        return select(sub.c.id, literal(0).label("depth")).subquery("reach")
+    sub = select(literal(node_id).label("id"), literal(0).label("depth")).cte("sub", recursive=True)
+    step = select(edges.c.dst, sub.c.depth + 1).join(sub, edges.c.src == sub.c.id).where(sub.c.depth < depth)
+    sub = sub.union(step)
+    return select(sub.c.id, func.min(sub.c.depth).label("depth")).group_by(sub.c.id).subquery("reach")
+
+
+def fetch(db: Session, node_id: int, depth: int, direction: str = "descendants") -> Tuple[List[Tuple[Experiment, int]], List[ExperimentRelationship]]:
+    """
+    Nodes within `depth` hops (with their hop count) and the edges among them.
+    Two statements: one for the nodes, one for the edges.
+    """
+    reach = reachable_cte(node_id, direction, depth)
+    nodes = (
+        db.query(Experiment, reach.c.depth)
+        .join(reach, reach.c.id == Experiment.id)
+        .order_by(reach.c.depth, Experiment.id)
+        .all()
+    )
+    ids = select(reach.c.id)
+    edges = (
+        db.query(ExperimentRelationship)
+        .filter(
+            ExperimentRelationship.from_experiment_id.in_(ids),
+            ExperimentRelationship.to_experiment_id.in_(ids),
+        )
+        .all()
+    )
+    return nodes, edges
+
+
+def delete_branch(db: Session, node_id: int, cascade: bool = True) -> Tuple[List[int], List[int]]:
+    """
+    Delete node_id (and, with cascade, every descendant) together with their
+    edges and literature. Runs in the caller's transaction; does not commit.
+    Returns (deleted node ids, deleted edge ids).
+
+    The branch is written once into a temporary table that every DELETE
+    reads, so no statement binds the ids as parameters and the edges can go
+    before the nodes they reference. Seven statements for any branch size.
+    """
+    db.execute(text(f"CREATE TEMPORARY TABLE IF NOT EXISTS {_branch.name} (id INTEGER PRIMARY KEY)"))
+    db.execute(delete(_branch))
+    source = select(reachable_cte(node_id).c.id) if cascade else select(literal(node_id))
+    db.execute(insert(_branch).from_select(["id"], source))
+    ids = select(_branch.c.id)
+
+    lit = Literature.__table__
+    exp = Experiment.__table__
+    db.execute(delete(lit).where(lit.c.experiment_id.in_(ids)))
+    edge_ids = db.execute(
+        delete(_rel)
+        .where(_rel.c.from_experiment_id.in_(ids) | _rel.c.to_experiment_id.in_(ids))
+        .returning(_rel.c.id)
+    ).scalars().all()
+    node_ids = db.execute(delete(exp).where(exp.c.id.in_(ids)).returning(exp.c.id)).scalars().all()
+    db.execute(delete(_branch))
+    return sorted(node_ids), sorted(edge_ids)
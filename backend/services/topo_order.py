@@ -0,0 +1,330 @@
+# backend/services/topo_order.py
+"""
+Dynamic topological order of the experiment graph (Pearce-Kelly).
+
+Every node holds a position such that each edge points from a lower to a
+higher position. Inserting u -> v where v already sits after u costs nothing;
+otherwise only the nodes between the two positions are searched: a forward
+walk from v (which finds a cycle if it reaches u) and a backward walk from u,
+whose positions are then reshuffled among themselves. Deletions never break the
+order. Longest-path levels (sources at 0) are kept alongside and re-propagated
+only from the nodes an update touches, so layered and critical-path views read
+the current order instead of re-sorting the graph.
+
+Graphs stored before cycles were rejected may already contain some. Loading
+keeps every edge but leaves the ones that close a cycle out of the order and
+reports them through `cyclic_edges()`.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.models.experiment import Experiment, ExperimentRelationship
+
+logger = logging.getLogger(__name__)
+
+
+class CycleError(ValueError):
+    """Raised when an edge would close a cycle; `cycle` is the node path v ... u, v."""
+
+    def __init__(self, from_id: int, to_id: int, cycle: List[int]):
+        self.from_id = from_id
+        self.to_id = to_id
+        self.cycle = cycle
+        super().__init__(
+            f"Edge {from_id} -> {to_id} would create a cycle: {' -> '.join(str(n) for n in cycle)}"
+        )
+
+
+class TopologicalOrder:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._ord: Dict[int, int] = {}                  # node -> position
+        self._level: Dict[int, int] = {}                # node -> longest path from a source
+        self._out: Dict[int, Dict[int, int]] = {}       # node -> {child: parallel edge count}
+        self._in: Dict[int, Dict[int, int]] = {}        # node -> {parent: parallel edge count}
+        self._edges: Dict[int, Tuple[int, int]] = {}    # ordered edge id -> (from, to)
+        self._cyclic: Dict[int, Tuple[int, int]] = {}   # edge ids left out of the order
+        self._next = 0
+        self._sorted: Optional[List[int]] = None
+
+    # ----------------- building -----------------
+    def load(self, db: Session):
+        """Order all nodes with one DFS; edges closing a cycle are set aside."""
+        with self._lock:
+            self._reset()
+            node_ids = [i for (i,) in db.query(Experiment.id).order_by(Experiment.id).all()]
+            rows = db.query(
+                ExperimentRelationship.id,
+                ExperimentRelationship.from_experiment_id,
+                ExperimentRelationship.to_experiment_id,
+            ).order_by(ExperimentRelationship.id).all()
+
+            out: Dict[int, List[Tuple[int, int]]] = {n: [] for n in node_ids}
+            for eid, u, v in rows:
+                out.setdefault(u, []).append((eid, v))
+                out.setdefault(v, [])
+
+            # Iterative DFS; reverse post-order is a topological order of the
+            # graph minus its back edges.
+            state: Dict[int, int] = {}      # 1 = on stack, 2 = done
+            post: List[int] = []
+            back: Set[int] = set()
+            for root in out:
+                if root in state:
+                    continue
+                state[root] = 1
+                stack = [(root, iter(out[root]))]
+                while stack:
+                    node, it = stack[-1]
+                    for eid, child in it:
+                        s = state.get(child)
+                        if s is None:
+                            state[child] = 1
+                            stack.append((child, iter(out[child])))
+                            break
+                        if s == 1:
+                            back.add(eid)
+                    else:
+                        state[node] = 2
+                        post.append(node)
+                        stack.pop()
+
+            for pos, node in enumerate(reversed(post)):
+                self._ord[node] = pos
+                self._out[node] = {}
+                self._in[node] = {}
+            self._next = len(post)
+            for eid, u, v in rows:
+                if eid in back:
+                    self._cyclic[eid] = (u, v)
+                else:
+                    self._link(eid, u, v)
+            for node in reversed(post):
+                self._level[node] = max((self._level[p] + 1 for p in self._in[node]), default=0)
+            self._loaded = True
+            if back:
+                logger.warning("%d existing edge(s) close a cycle and are left out of the order", len(back))
+
+    def ensure_loaded(self, db: Session):
+        if not self._loaded:
+            self.load(db)
+
+    def invalidate(self):
+        """Rebuild from the database on next use (after a write that did not commit)."""
+        with self._lock:
+            self._loaded = False
+
+    # ----------------- incremental updates -----------------
+    def add_node(self, node_id: int):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._add_node(node_id)
+
+    def _add_node(self, node_id: int):
+        if node_id in self._ord:
+            return
+        self._ord[node_id] = self._next
+        self._next += 1
+        self._level[node_id] = 0
+        self._out[node_id] = {}
+        self._in[node_id] = {}
+        self._sorted = None
+
+    def check_edge(self, from_id: int, to_id: int) -> Optional[List[int]]:
+        """The cycle u -> v would close (as a node path), or None if it is safe."""
+        with self._lock:
+            if from_id == to_id:
+                return [from_id, from_id]
+            if from_id not in self._ord or to_id not in self._ord:
+                return None
+            if self._ord[to_id] > self._ord[from_id]:
+                return None
+            _, path = self._forward(to_id, from_id, self._ord[from_id])
+            return path
+
+    def add_edge(self, edge_id: int, from_id: int, to_id: int):
+        """Insert an edge, reordering the affected region; raises CycleError."""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._insert(edge_id, from_id, to_id)
+
+    def replace_edge(self, edge_id: int, from_id: int, to_id: int):
+        """Move an edge to new endpoints; on CycleError the old edge is kept."""
+        if not self._loaded:
+            return
+        with self._lock:
+            old = self._edges.get(edge_id)
+            legacy = self._cyclic.get(edge_id)
+            if (from_id, to_id) in (old, legacy):
+                return
+            self._cyclic.pop(edge_id, None)
+            self._remove(edge_id)
+            try:
+                self._insert(edge_id, from_id, to_id)
+            except CycleError:
+                if old:
+                    self._insert(edge_id, *old)
+                elif legacy:
+                    self._cyclic[edge_id] = legacy
+                raise
+
+    def remove_edges(self, edge_ids: Iterable[int]):
+        if not self._loaded:
+            return
+        with self._lock:
+            for eid in edge_ids:
+                self._cyclic.pop(eid, None)
+                self._remove(eid)
+
+    def remove_nodes(self, node_ids: Iterable[int]):
+        """Drop nodes and every edge touching them."""
+        if not self._loaded:
+            return
+        gone = set(node_ids)
+        with self._lock:
+            dead = [eid for eid, (u, v) in self._edges.items() if u in gone or v in gone]
+            for eid in dead:
+                self._remove(eid)
+            self._cyclic = {eid: e for eid, e in self._cyclic.items() if e[0] not in gone and e[1] not in gone}
+            for node in gone:
+                self._ord.pop(node, None)
+                self._level.pop(node, None)
+                self._out.pop(node, None)
+                self._in.pop(node, None)
+            self._sorted = None
+
+    def _link(self, edge_id: int, u: int, v: int):
+        self._edges[edge_id] = (u, v)
+        self._out[u][v] = self._out[u].get(v, 0) + 1
+        self._in[v][u] = self._in[v].get(u, 0) + 1
+
+    def _insert(self, edge_id: int, u: int, v: int):
+        if edge_id in self._edges:
+            self._remove(edge_id)
+        self._add_node(u)
+        self._add_node(v)
+        if u == v:
+            raise CycleError(u, v, [u, u])
+        lb, ub = self._ord[v], self._ord[u]
+        if lb < ub:
+            # Only nodes positioned in [lb, ub] can be affected
+            forward, cycle = self._forward(v, u, ub)
+            if cycle:
+                raise CycleError(u, v, cycle)
+            backward = self._backward(u, lb)
+            self._reorder(backward, forward)
+        self._link(edge_id, u, v)
+        self._relevel([v])
+
+    def _remove(self, edge_id: int):
+        e = self._edges.pop(edge_id, None)
+        if e is None:
+            return
+        u, v = e
+        for adj, a, b in ((self._out, u, v), (self._in, v, u)):
+            n = adj[a][b] - 1
+            if n:
+                adj[a][b] = n
+            else:
+                del adj[a][b]
+        self._relevel([v])
+
+    # ----------------- Pearce-Kelly search and reorder -----------------
+    def _forward(self, start: int, target: int, ub: int) -> Tuple[List[int], Optional[List[int]]]:
+        """Nodes reachable from start with position <= ub; the path if target is among them."""
+        seen = {start: None}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for child in self._out[node]:
+                if child == target:
+                    path = [target, node]
+                    while seen[path[-1]] is not None:
+                        path.append(seen[path[-1]])
+                    path.reverse()
+                    return [], path + [start]
+                if child not in seen and self._ord[child] < ub:
+                    seen[child] = node
+                    stack.append(child)
+        return list(seen), None
+
+    def _backward(self, start: int, lb: int) -> List[int]:
+        """Nodes reaching start with position >= lb."""
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for parent in self._in[node]:
+                if parent not in seen and self._ord[parent] > lb:
+                    seen.add(parent)
+                    stack.append(parent)
+        return list(seen)
+
+    def _reorder(self, backward: List[int], forward: List[int]):
+        """Reuse the affected positions: ancestors of u first, then descendants of v."""
+        key = self._ord.__getitem__
+        nodes = sorted(backward, key=key) + sorted(forward, key=key)
+        for node, pos in zip(nodes, sorted(self._ord[n] for n in nodes)):
+            self._ord[node] = pos
+        self._sorted = None
+
+    def _relevel(self, seeds: Iterable[int]):
+        """Recompute levels from seeds onward, in topological order, stopping where nothing changes."""
+        heap = [(self._ord[n], n) for n in set(seeds) if n in self._ord]
+        heapq.heapify(heap)
+        queued = {n for _, n in heap}
+        while heap:
+            _, node = heapq.heappop(heap)
+            queued.discard(node)
+            level = max((self._level[p] + 1 for p in self._in[node]), default=0)
+            if level == self._level.get(node):
+                continue
+            self._level[node] = level
+            for child in self._out[node]:
+                if child not in queued:
+                    queued.add(child)
+                    heapq.heappush(heap, (self._ord[child], child))
+
+    # ----------------- queries -----------------
+    def order(self) -> List[int]:
+        """Node ids in topological order."""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(self._ord, key=self._ord.__getitem__)
+            return list(self._sorted)
+
+    def level(self, node_id: int) -> Optional[int]:
+        with self._lock:
+            return self._level.get(node_id)
+
+    def levels(self) -> Dict[int, int]:
+        with self._lock:
+            return dict(self._level)
+
+    def cyclic_edges(self) -> List[int]:
+        with self._lock:
+            return sorted(self._cyclic)
+
+    def snapshot(self) -> Tuple[List[int], Dict[int, int], Dict[int, Tuple[int, int]]]:
+        """Consistent (order, levels, all edges incl. cyclic ones as id -> (from, to))."""
+        with self._lock:
+            return self.order(), dict(self._level), {**self._edges, **self._cyclic}
+
+
+index = TopologicalOrder()
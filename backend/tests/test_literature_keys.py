@@ -0,0 +1,94 @@
+# backend/tests/test_literature_keys.py
+"""
+Canonical keys stay unique per paper when enrichment resolves a stored row.
+
+A row added by DOI is keyed "doi:..". Once enrichment finds its OpenAlex
+work, the same paper added by its OpenAlex link must hit the unique index
+instead of becoming a second row.
+
+Run from backend/:  python -m pytest -q tests
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app import schema
+from app.database import Base, create_async_db_engine, create_db_engine
+from app.models import context_keywords, graph_change  # noqa: F401  (register tables)
+from app.models.experiment import Experiment
+from app.models.literature import Literature
+from services import enrichment, literature_store, openalex, llm_gemini
+
+WORK = {"id": "https://openalex.org/W999", "doi": "https://doi.org/10.1000/ABC", "title": "Resolved", "abstract": ""}
+
+
+@pytest.fixture
+def db_url(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'keys.db'}"
+    engine = create_db_engine(url)
+    Base.metadata.create_all(engine)
+    schema.upgrade(engine)
+    with Session(engine) as db:
+        db.add(Experiment(id=1, title="Node one", status="planned"))
+        db.commit()
+    engine.dispose()
+
+    async def resolve(doi, title):
+        return dict(WORK)
+
+    async def summarize(text):
+        return None
+
+    monkeypatch.setattr(openalex, "resolve_by_doi_or_title", resolve)
+    monkeypatch.setattr(llm_gemini, "summarize_one_liner_cn", summarize)
+    return url
+
+
+def _add(engine, link, **fields):
+    with Session(engine) as db:
+        inserted = literature_store.upsert(db, [{"experiment_id": 1, "link": link, "rel_type": "similar", **fields}])
+        db.commit()
+    return inserted
+
+
+def _keys(engine):
+    with Session(engine) as db:
+        return db.scalars(select(Literature.canonical_key).order_by(Literature.id)).all()
+
+
+def test_enriched_doi_row_is_rekeyed(db_url):
+    engine = create_db_engine(db_url)
+    _add(engine, "https://doi.org/10.1000/abc", doi="10.1000/abc")
+
+    async def enrich():
+        async_engine = create_async_db_engine(db_url)
+        async with async_sessionmaker(async_engine, expire_on_commit=False)() as db:
+            rows = (await db.scalars(select(Literature))).all()
+            await enrichment.refresh_rows(db, rows)
+        await async_engine.dispose()
+
+    asyncio.run(enrich())
+    assert _keys(engine) == ["W999"]
+    assert _add(engine, "https://openalex.org/W999") == []
+    assert _keys(engine) == ["W999"]
+    engine.dispose()
+
+
+def test_stored_row_with_wid_is_promoted_on_insert(db_url):
+    # Row enriched before rekeying existed: W-id set, still keyed by its DOI
+    engine = create_db_engine(db_url)
+    _add(engine, "https://doi.org/10.1000/abc", doi="10.1000/abc")
+    with Session(engine) as db:
+        db.query(Literature).update({Literature.openalex_id: "W999"})
+        db.commit()
+    assert _keys(engine) == ["doi:10.1000/abc"]
+
+    assert _add(engine, "https://openalex.org/W999") == []
+    assert _keys(engine) == ["W999"]
+    engine.dispose()
@@ -0,0 +1,123 @@
+# backend/tests/test_migrations.py
+"""
+Upgrade checks from the baseline schema.
+
+The database starts as the first release's create_all left it, with a few
+literature rows (two of them the same paper), and is brought up either the
+way the app does it at startup (create_all, then the migrations) or with
+the migrations alone (`alembic upgrade head`). Either way the result must
+match the models and serve the literature queries.
+
+Run from backend/:  python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app import schema
+from app.database import Base, create_db_engine
+from app.models import context_keywords, graph_change  # noqa: F401  (register tables)
+from app.models.literature import Literature
+from services import literature_store
+
+# Schema of the first release, as its create_all made it on SQLite
+BASELINE_SCHEMA = """
+CREATE TABLE experiments (
+    id INTEGER NOT NULL, title VARCHAR(255) NOT NULL, description TEXT, motivation TEXT,
+    expectations TEXT, status VARCHAR(9) NOT NULL, hypothesis TEXT, result TEXT, extra_data JSON,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP), updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_experiments_id ON experiments (id);
+CREATE TABLE context_keywords (
+    id INTEGER NOT NULL, keyword VARCHAR NOT NULL, PRIMARY KEY (id), UNIQUE (keyword)
+);
+CREATE INDEX ix_context_keywords_id ON context_keywords (id);
+CREATE TABLE experiment_relationships (
+    id INTEGER NOT NULL, from_experiment_id INTEGER NOT NULL, to_experiment_id INTEGER NOT NULL,
+    relationship_type VARCHAR(10) NOT NULL, label TEXT, extra_data JSON,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP), updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id),
+    FOREIGN KEY(from_experiment_id) REFERENCES experiments (id),
+    FOREIGN KEY(to_experiment_id) REFERENCES experiments (id)
+);
+CREATE INDEX ix_experiment_relationships_id ON experiment_relationships (id);
+CREATE TABLE literature (
+    id INTEGER NOT NULL, experiment_id INTEGER NOT NULL, openalex_id VARCHAR, doi VARCHAR,
+    link VARCHAR NOT NULL, title VARCHAR, venue VARCHAR, year INTEGER, rel_type VARCHAR NOT NULL,
+    confidence FLOAT, evidence JSON, why VARCHAR,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP) NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(experiment_id) REFERENCES experiments (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_literature_id ON literature (id);
+CREATE INDEX ix_literature_doi ON literature (doi);
+CREATE INDEX ix_literature_openalex_id ON literature (openalex_id);
+"""
+
+BASELINE_ROWS = """
+INSERT INTO experiments (id, title, status) VALUES (1, 'Node one', 'PLANNED');
+INSERT INTO literature (experiment_id, link, rel_type, created_at) VALUES
+    (1, 'https://openalex.org/W100', 'similar', '2024-01-01 00:00:00'),
+    (1, 'https://doi.org/10.1000/ABC', 'similar', '2024-01-02 00:00:00');
+INSERT INTO literature (experiment_id, link, rel_type, title, created_at) VALUES
+    (1, 'https://doi.org/10.1000/abc', 'prior', 'Same paper, later copy', '2024-01-03 00:00:00');
+"""
+
+
+@pytest.fixture(params=["startup", "alembic"])
+def engine(request, tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        for statement in (BASELINE_SCHEMA + BASELINE_ROWS).split(";"):
+            if statement.strip():
+                conn.execute(text(statement))
+    if request.param == "startup":
+        Base.metadata.create_all(engine)
+    schema.upgrade(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_upgraded_schema_matches_models(engine):
+    with engine.connect() as conn:
+        diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    assert diff == []
+
+
+def test_existing_rows_are_keyed_and_deduplicated(engine):
+    with Session(engine) as db:
+        rows = db.scalars(select(Literature).order_by(Literature.id)).all()
+    assert [(r.link, r.canonical_key) for r in rows] == [
+        ("https://openalex.org/W100", "W100"),
+        ("https://doi.org/10.1000/ABC", "doi:10.1000/abc"),
+    ]
+    # The surviving copy keeps fields only the duplicate had
+    assert rows[1].title == "Same paper, later copy"
+
+
+def test_literature_queries_after_upgrade(engine):
+    with Session(engine) as db:
+        page = db.scalars(
+            select(Literature)
+            .where(Literature.experiment_id == 1)
+            .order_by(Literature.created_at.desc(), Literature.id.desc())
+            .limit(100)
+        ).all()
+        assert len(page) == 2 and all(r.enriched_at is None for r in page)
+
+        # Same papers under other links hit the unique index instead of adding rows
+        inserted = literature_store.upsert(db, [
+            {"experiment_id": 1, "link": "http://openalex.org/W100/", "rel_type": "similar"},
+            {"experiment_id": 1, "doi": "10.1000/Abc", "link": "https://dx.doi.org/10.1000/abc", "rel_type": "similar"},
+            {"experiment_id": 1, "link": "https://openalex.org/W200", "rel_type": "similar"},
+        ])
+        db.commit()
+        assert [key for _, key in inserted] == ["W200"]
+        assert db.scalar(select(Literature.id).where(Literature.canonical_key == "W200")) is not None
@@ -0,0 +1,104 @@
+# backend/tests/test_query_plans.py
+"""
+EXPLAIN QUERY PLAN checks for the hot edge and literature queries.
+
+The schema is built the way an existing database gets it: tables from
+create_all with the hot-path indexes missing, then the Alembic migrations.
+Each query below mirrors one in the endpoints or services and must be
+answered from an index rather than a full scan of its table.
+
+Run from backend/:  python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+from sqlalchemy import desc, or_, select, text
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app import schema
+from app.database import Base, create_db_engine
+from app.models import context_keywords, graph_change  # noqa: F401  (register tables)
+from app.models.experiment import Experiment, ExperimentRelationship
+from app.models.literature import Literature
+
+rel = ExperimentRelationship
+HOT_PATH_INDEXES = {
+    "experiment_relationships": {"ix_relationships_from_to", "ix_relationships_to_from"},
+    "literature": {"ix_literature_experiment_rel_created"},
+}
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    path = tmp_path_factory.mktemp("plans") / "plans.db"
+    engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for names in HOT_PATH_INDEXES.values():
+            for name in names:
+                conn.execute(text(f"DROP INDEX {name}"))
+    schema.upgrade(engine)
+    yield engine
+    engine.dispose()
+
+
+def plan(engine, stmt) -> str:
+    sql = stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_migrations_create_hot_path_indexes(engine):
+    with engine.connect() as conn:
+        for table, names in HOT_PATH_INDEXES.items():
+            existing = {row[1] for row in conn.execute(text(f"PRAGMA index_list({table})"))}
+            assert names <= existing
+
+
+@pytest.mark.parametrize("name, stmt, index", [
+    (
+        "children of a node",
+        select(rel.id, rel.to_experiment_id).where(rel.from_experiment_id == 1),
+        "ix_relationships_from_to",
+    ),
+    (
+        "parents of a node",
+        select(rel.id, rel.from_experiment_id).where(rel.to_experiment_id == 1),
+        "ix_relationships_to_from",
+    ),
+    (
+        "duplicate edge check",
+        select(rel).where(rel.from_experiment_id == 1, rel.to_experiment_id == 2).limit(1),
+        ("ix_relationships_from_to", "ix_relationships_to_from"),   # both cover the pair
+    ),
+    (
+        "batch parents (GET /nodes?ids=)",
+        select(rel.id, rel.to_experiment_id, Experiment.title)
+        .join(Experiment, Experiment.id == rel.from_experiment_id)
+        .where(rel.to_experiment_id.in_([1, 2, 3])),
+        "ix_relationships_to_from",
+    ),
+    (
+        "cached suggestion for a node and relationship",
+        select(Literature)
+        .where(Literature.experiment_id == 1, Literature.rel_type == "similar")
+        .order_by(desc(Literature.created_at))
+        .limit(1),
+        "ix_literature_experiment_rel_created",
+    ),
+])
+def test_hot_query_uses_index(engine, name, stmt, index):
+    query_plan = plan(engine, stmt)
+    accepted = index if isinstance(index, tuple) else (index,)
+    assert any(i in query_plan for i in accepted), f"{name}:\n{query_plan}"
+    assert "USE TEMP B-TREE FOR ORDER BY" not in query_plan, f"{name}:\n{query_plan}"
+
+
+def test_branch_delete_edges_use_both_indexes(engine):
+    touching = or_(rel.from_experiment_id.in_([1, 2]), rel.to_experiment_id.in_([1, 2]))
+    query_plan = plan(engine, select(rel.id).where(touching))
+    assert "ix_relationships_from_to" in query_plan
+    assert "ix_relationships_to_from" in query_plan
+    assert "SCAN experiment_relationships" not in query_plan
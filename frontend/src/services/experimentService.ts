@@ -24,6 +24,7 @@ const RETRY_OPTIONS = {
 };
 
 const API_BASE_URL = "http://127.0.0.1:8000";
+const PAGE_SIZE = 500;
 
 class ExperimentService {
   private async handleResponse<T>(response: Response): Promise<T> {
@@ -53,6 +54,30 @@ class ExperimentService {
     }, customRetryOptions || RETRY_OPTIONS);
   }
 
+  // Paginated list endpoints return one page per request and the next page's
+  // cursor in X-Next-Cursor; collect all pages.
+  private async makePagedRequest<T>(url: string): Promise<T[]> {
+    const items: T[] = [];
+    let cursor: string | null = null;
+    do {
+      const pageUrl: string = cursor
+        ? `${url}?limit=${PAGE_SIZE}&cursor=${encodeURIComponent(cursor)}`
+        : `${url}?limit=${PAGE_SIZE}`;
+      const page: { data: T[]; next: string | null } = await withRetry(async () => {
+        const response = await fetch(pageUrl, {
+          headers: { "Content-Type": "application/json" },
+        });
+        return {
+          data: await this.handleResponse<T[]>(response),
+          next: response.headers.get("X-Next-Cursor"),
+        };
+      }, RETRY_OPTIONS);
+      items.push(...page.data);
+      cursor = page.next;
+    } while (cursor);
+    return items;
+  }
+
   // Node operations
   async createNode(data: CreateNodeRequest): Promise<ResearchNode> {
     return this.makeRequest<ResearchNode>(`${API_BASE_URL}/nodes`, {
@@ -149,7 +174,7 @@ class ExperimentService {
   }
 
   async getNodeLiterature(nodeId: number): Promise<LiteratureReference[]> {
-    return this.makeRequest<LiteratureReference[]>(
+    return this.makePagedRequest<LiteratureReference>(
       `${API_BASE_URL}/nodes/${nodeId}/literature`
     );
   }
@@ -186,8 +186,18 @@ export interface LiteratureItem {
 export async function getNodeLiterature(
   nodeId: number
 ): Promise<LiteratureItem[]> {
-  const response = await api.get(`/nodes/${nodeId}/literature`);
-  return response.data;
+  // Paginated: follow X-Next-Cursor until the last page
+  const items: LiteratureItem[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get<LiteratureItem[]>(`/nodes/${nodeId}/literature`, {
+      params: { limit: 500, cursor },
+    });
+    items.push(...response.data);
+    const next = response.headers["x-next-cursor"];
+    cursor = typeof next === "string" && next ? next : undefined;
+  } while (cursor);
+  return items;
 }
 
 export async function getLiteratureSuggestion(